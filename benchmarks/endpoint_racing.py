@@ -0,0 +1,136 @@
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.types import TxOpts
+from solders.hash import Hash
+from solders.signature import Signature
+
+from zetamarkets_py.endpoints import EndpointPool
+
+# This benchmark compares ways of sending a transaction to several RPC endpoints, and of choosing the
+# endpoint to read from, against local JSON-RPC stubs with different latencies and error rates.
+#
+# Each stub sleeps for its latency times a random jitter between 0.5 and 1.5 per request, and fails a
+# share of requests with a JSON-RPC error. Endpoints are given as latency_ms:error_rate pairs:
+#   python benchmarks/endpoint_racing.py --endpoints 30:0 60:0.1 120:0 15:0.5
+
+
+class RpcStub(ThreadingHTTPServer):
+    def __init__(self, latency: float, error_rate: float):
+        super().__init__(("127.0.0.1", 0), _RpcStubHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+
+    @property
+    def endpoint(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _RpcStubHandler(BaseHTTPRequestHandler):
+    server: RpcStub
+
+    def do_POST(self):
+        self.server.requests += 1
+        req = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if random.random() < self.server.error_rate:
+            resp = {"jsonrpc": "2.0", "error": {"code": -32603, "message": "Internal error"}, "id": req["id"]}
+        elif req["method"] == "sendTransaction":
+            resp = {"jsonrpc": "2.0", "result": str(Signature.default()), "id": req["id"]}
+        elif req["method"] == "getLatestBlockhash":
+            value = {"blockhash": str(Hash.default()), "lastValidBlockHeight": 1}
+            resp = {"jsonrpc": "2.0", "result": {"context": {"slot": 1}, "value": value}, "id": req["id"]}
+        else:
+            resp = {"jsonrpc": "2.0", "error": {"code": -32601, "message": "unsupported"}, "id": req["id"]}
+        payload = json.dumps(resp).encode()
+        time.sleep(self.server.latency * random.uniform(0.5, 1.5))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+async def bench(stubs: list[RpcStub], repeat: int):
+    connections = [AsyncClient(stub.endpoint) for stub in stubs]
+    pool = EndpointPool(connections)
+    opts = TxOpts(skip_preflight=True)
+    raw = bytes(200)
+
+    def send(connection: AsyncClient):
+        return connection.send_raw_transaction(raw, opts=opts)
+
+    def read(connection: AsyncClient):
+        return connection.get_latest_blockhash()
+
+    async def timed(name: str, fn):
+        times, failures = [], 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            try:
+                await fn()
+            except Exception:
+                failures += 1
+            times.append(time.perf_counter() - start)
+        print(
+            f"{name:<36} {statistics.median(times) * 1e3:>8.1f} ms median {max(times) * 1e3:>8.1f} ms max"
+            f" {failures:>5} failed"
+        )
+
+    # Gather returns once every endpoint answered and fails if any did, as sends without racing do
+    await timed("send, gather all endpoints", lambda: asyncio.gather(*[pool.measure(c, send) for c in connections]))
+    await timed("send, race all endpoints", lambda: pool.race(send))
+    await timed("read, first endpoint", lambda: read(connections[0]))
+    await timed("read, best endpoint with failover", lambda: pool.call(read))
+
+    # Let detached sends finish before closing the connections
+    await asyncio.sleep(max(stub.latency for stub in stubs) * 2)
+    print()
+    for stub, score in zip(stubs, pool.scores):
+        # An endpoint the pool never called has no weighted latency yet
+        weighted = "-" if score.latency is None else f"{score.latency * 1e3:.1f}"
+        print(
+            f"{stub.latency * 1e3:>6.0f} ms {stub.error_rate:>5.0%} errors:"
+            f" weighted {weighted:>6} ms {score.error_rate:>5.0%} errors"
+            f" score {score.score * 1e3:>7.1f} {stub.requests:>6} requests"
+        )
+    for connection in connections:
+        await connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark endpoint racing and selection against local RPC stubs.")
+    parser.add_argument(
+        "--endpoints",
+        nargs="+",
+        default=["30:0", "60:0.1", "120:0", "15:0.5"],
+        help="Stub latency_ms:error_rate pairs. Defaults to %(default)s.",
+    )
+    parser.add_argument("--repeat", type=int, default=50, help="Runs per measurement. Defaults to %(default)s.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the stub jitter and errors.")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    stubs = []
+    for spec in args.endpoints:
+        latency_ms, error_rate = spec.split(":")
+        stub = RpcStub(float(latency_ms) / 1e3, float(error_rate))
+        threading.Thread(target=stub.serve_forever, daemon=True).start()
+        stubs.append(stub)
+    asyncio.run(bench(stubs, args.repeat))
+    for stub in stubs:
+        stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
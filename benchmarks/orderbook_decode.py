@@ -0,0 +1,84 @@
+import argparse
+import asyncio
+import os
+import timeit
+
+from solana.rpc.async_api import AsyncClient
+
+from zetamarkets_py import constants, pda
+from zetamarkets_py.serum_client.accounts.market_state import MarketState
+from zetamarkets_py.serum_client.accounts.orderbook import OrderbookAccount
+from zetamarkets_py.types import Asset, Network, Side
+from zetamarkets_py.zeta_client.accounts.pricing import Pricing
+
+# This benchmark compares the construct based OrderbookAccount.decode against the zero-copy
+# OrderbookAccount.decode_lazy on recorded orderbook account bytes.
+#
+# Record a snapshot first (needs an RPC), then benchmark offline against the file:
+#   python benchmarks/orderbook_decode.py --record bids.bin --asset SOL --side Bid
+#   python benchmarks/orderbook_decode.py --file bids.bin
+
+
+async def record(path: str, endpoint: str, asset: Asset, side: Side, network: Network):
+    connection = AsyncClient(endpoint)
+    program_id = constants.ZETA_PID[network]
+    pricing = await Pricing.fetch(connection, pda.get_pricing_address(program_id), program_id=program_id)
+    if pricing is None:
+        raise Exception("Pricing account not found")
+    market_state = await MarketState.fetch(
+        connection, pricing.markets[asset.to_index()], program_id=constants.MATCHING_ENGINE_PID[network]
+    )
+    if market_state is None:
+        raise Exception("Market state not found")
+    address = market_state.bids if side == Side.Bid else market_state.asks
+    resp = await connection.get_account_info(address)
+    await connection.close()
+    if resp.value is None:
+        raise Exception(f"Orderbook account not found at {address}")
+    with open(path, "wb") as f:
+        f.write(resp.value.data)
+    print(f"Recorded {len(resp.value.data)} bytes from {address} to {path}")
+
+
+def bench(path: str, number: int):
+    with open(path, "rb") as f:
+        data = f.read()
+
+    eager = OrderbookAccount.decode(data)
+    lazy = OrderbookAccount.decode_lazy(data)
+    for descending in (False, True):
+        if list(eager.slab.items(descending)) != list(lazy.slab.items(descending)):
+            raise Exception("Decoders disagree on slab leaves")
+    print(f"Leaves: {eager.slab.header.leaf_count}, nodes: {eager.slab.header.bump_index}")
+
+    cases = {
+        "construct decode + items": lambda: list(OrderbookAccount.decode(data).slab.items()),
+        "lazy decode + items": lambda: list(OrderbookAccount.decode_lazy(data).slab.items()),
+        "lazy decode + best level": lambda: next(iter(OrderbookAccount.decode_lazy(data).slab.items()), None),
+    }
+    for name, fn in cases.items():
+        seconds = min(timeit.repeat(fn, number=number, repeat=5)) / number
+        print(f"{name:<28} {seconds * 1e6:>12.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark orderbook account decoding.")
+    parser.add_argument("-f", "--file", type=str, help="Recorded orderbook account bytes to benchmark.")
+    parser.add_argument("-r", "--record", type=str, help="Record orderbook account bytes to this file and exit.")
+    parser.add_argument("-u", "--url", type=str, default=os.getenv("ENDPOINT", "https://api.mainnet-beta.solana.com"))
+    parser.add_argument("-n", "--network", type=Network, choices=list(Network), default=Network.MAINNET)
+    parser.add_argument("-a", "--asset", type=Asset, choices=list(Asset), default=Asset.SOL)
+    parser.add_argument("-s", "--side", type=lambda s: Side[s], choices=[Side.Bid, Side.Ask], default=Side.Bid)
+    parser.add_argument("--number", type=int, default=20, help="Decodes per timing run. Defaults to %(default)s.")
+    args = parser.parse_args()
+
+    if args.record:
+        asyncio.run(record(args.record, args.url, args.asset, args.side, args.network))
+    elif args.file:
+        bench(args.file, args.number)
+    else:
+        parser.error("one of --file or --record is required")
+
+
+if __name__ == "__main__":
+    main()
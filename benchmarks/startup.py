@@ -0,0 +1,128 @@
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from zetamarkets_py import constants, pda
+from zetamarkets_py.client import Client
+from zetamarkets_py.serum_client.accounts.market_state import MarketState
+from zetamarkets_py.types import Network
+from zetamarkets_py.zeta_client.accounts.pricing import Pricing
+from zetamarkets_py.zeta_client.accounts.state import State
+
+# This benchmark measures cold import time of zetamarkets_py.client and the time for a read-only
+# Client.load, with and without a snapshot file, against a local JSON-RPC stub.
+#
+# The stub answers getMultipleAccounts with zero-filled State, Pricing and MarketState accounts and
+# adds a fixed delay per HTTP request to stand in for the round trip to a real RPC:
+#   python benchmarks/startup.py --latency-ms 50
+
+
+class RpcStub(ThreadingHTTPServer):
+    def __init__(self, network: Network, latency: float):
+        super().__init__(("127.0.0.1", 0), _RpcStubHandler)
+        self.latency = latency
+        self.requests = 0
+        program_id = constants.ZETA_PID[network]
+        self.accounts = {
+            str(pda.get_state_address(program_id)): (program_id, State.discriminator + bytes(20000)),
+            str(pda.get_pricing_address(program_id)): (program_id, Pricing.discriminator + bytes(40000)),
+        }
+        self.default_account = (constants.MATCHING_ENGINE_PID[network], MarketState.discriminator + bytes(2000))
+
+    @property
+    def endpoint(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def account(self, address: str) -> dict:
+        owner, data = self.accounts.get(address, self.default_account)
+        return {
+            "data": [base64.b64encode(data).decode(), "base64"],
+            "executable": False,
+            "lamports": 1,
+            "owner": str(owner),
+            "rentEpoch": 0,
+            "space": len(data),
+        }
+
+
+class _RpcStubHandler(BaseHTTPRequestHandler):
+    server: RpcStub
+
+    def do_POST(self):
+        self.server.requests += 1
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        reqs = body if isinstance(body, list) else [body]
+        resps = []
+        for req in reqs:
+            if req["method"] != "getMultipleAccounts":
+                resps.append({"jsonrpc": "2.0", "error": {"code": -32601, "message": "unsupported"}, "id": req["id"]})
+                continue
+            value = [self.server.account(address) for address in req["params"][0]]
+            resps.append({"jsonrpc": "2.0", "result": {"context": {"slot": 1}, "value": value}, "id": req["id"]})
+        payload = json.dumps(resps if isinstance(body, list) else resps[0]).encode()
+        time.sleep(self.server.latency)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def bench_import(repeat: int):
+    code = "import time; t = time.perf_counter(); import zetamarkets_py.client; print(time.perf_counter() - t)"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    times = [float(subprocess.check_output([sys.executable, "-c", code], env=env)) for _ in range(repeat)]
+    print(f"{'import zetamarkets_py.client':<36} {min(times) * 1e3:>10.1f} ms")
+
+
+async def bench_load(stub: RpcStub, network: Network, snapshot_path: str, repeat: int):
+    async def timed(name: str, **kwargs):
+        times, requests = [], []
+        for _ in range(repeat):
+            if name.endswith("cold") and os.path.exists(snapshot_path):
+                os.remove(snapshot_path)
+            before = stub.requests
+            start = time.perf_counter()
+            client = await Client.load(endpoint=stub.endpoint, network=network, log_level=logging.ERROR, **kwargs)
+            times.append(time.perf_counter() - start)
+            requests.append(stub.requests - before)
+            if client.exchange._refresh_task is not None:
+                await client.exchange._refresh_task
+            await client.close()
+        print(f"{name:<36} {min(times) * 1e3:>10.1f} ms {max(requests):>6} RPC requests")
+
+    await timed("Client.load")
+    await timed("Client.load, snapshot cold", snapshot_path=snapshot_path)
+    await timed("Client.load, snapshot warm", snapshot_path=snapshot_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark import and Client.load time against a local RPC stub.")
+    parser.add_argument("-n", "--network", type=Network, choices=list(Network), default=Network.MAINNET)
+    parser.add_argument("--latency-ms", type=float, default=50, help="Stub delay per request. Defaults to %(default)s.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement. Defaults to %(default)s.")
+    args = parser.parse_args()
+
+    bench_import(args.repeat)
+
+    stub = RpcStub(args.network, args.latency_ms / 1e3)
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(bench_load(stub, args.network, os.path.join(tmp, "snapshot.json"), args.repeat))
+    stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -20,5 +20,9 @@ async def main():
     funding = client.exchange.pricing.latest_funding_rates[asset.to_index()]
     print(f"{asset} funding rate: {Decimal.from_anchor_decimal(funding).to_float()}")
 
+    # stream the funding accrued on our positions but not yet applied, recomputed on every pricing update
+    async for tracker, slot in client.subscribe_funding():
+        print(f"Slot {slot} unrealized funding: ${tracker.history[-1].total[0]:.6f}")
+
 
 asyncio.run(main())
@@ -72,6 +72,8 @@ class MarketMaker:
             tx_opts=tx_opts,
             network=network,
             log_level=logging.INFO,
+            # return from each requote once it is submitted, confirmations are polled in the background
+            confirm_in_background=True,
         )
         open_orders = await client.fetch_open_orders(asset)
         return cls(client, asset, size, edge, offset, open_orders)
@@ -113,18 +115,13 @@ class MarketMaker:
             finally:
                 await client.close_connection()
 
-    async def subscribe_zeta_bid(self):
-        async for orderbook, _ in self.client.subscribe_orderbook(self.asset, Side.Bid):
-            print(f"Best bid: {orderbook._get_l2(1)}")
-
-    async def subscribe_zeta_ask(self):
-        async for orderbook, _ in self.client.subscribe_orderbook(self.asset, Side.Ask):
-            print(f"Best ask: {orderbook._get_l2(1)}")
-
     async def subscribe_zeta_price(self):
-        bid_task = asyncio.create_task(self.subscribe_zeta_bid())
-        ask_task = asyncio.create_task(self.subscribe_zeta_ask())
-        await asyncio.gather(bid_task, ask_task)
+        # Both sides of the book are streamed over a single websocket
+        async for book, side, _ in self.client.subscribe_live_book(self.asset):
+            if side == Side.Bid:
+                print(f"Best bid: {book.best_bid}")
+            else:
+                print(f"Best ask: {book.best_ask}")
 
     async def update_quotes(self):
         if self._is_quoting:
@@ -0,0 +1,69 @@
+import decimal
+import random
+
+import pytest
+
+from zetamarkets_py.types import (
+    Decimal,
+    anchor_decimals_to_decimals,
+    anchor_decimals_to_floats,
+)
+from zetamarkets_py.zeta_client.types.anchor_decimal import AnchorDecimal
+
+SIGN = 0x80000000
+MAX_SCALE = 28
+U32_MAX = 2**32 - 1
+
+
+def anchor_decimal(scale: int, hi: int, mid: int, lo: int, negative: bool = False) -> AnchorDecimal:
+    return AnchorDecimal(flags=(scale << 16) | (SIGN if negative else 0), hi=hi, lo=lo, mid=mid)
+
+
+def random_decimals(n: int, seed: int = 0) -> list[AnchorDecimal]:
+    rng = random.Random(seed)
+    decimals = []
+    for _ in range(n):
+        # Cover small and full-width mantissas, not just ones dominated by hi
+        words = [rng.choice([0, rng.randrange(256), rng.randrange(U32_MAX + 1), U32_MAX]) for _ in range(3)]
+        decimals.append(anchor_decimal(rng.randint(1, MAX_SCALE), *words, negative=rng.random() < 0.5))
+    return decimals
+
+
+EDGE_CASES = [
+    anchor_decimal(1, 0, 0, 0),
+    anchor_decimal(1, 0, 0, 0, negative=True),
+    anchor_decimal(1, 0, 0, 1),
+    anchor_decimal(6, 0, 0, 1_234_567, negative=True),
+    anchor_decimal(MAX_SCALE, 0, 0, 1),
+    anchor_decimal(MAX_SCALE, U32_MAX, U32_MAX, U32_MAX),
+    anchor_decimal(MAX_SCALE, U32_MAX, U32_MAX, U32_MAX, negative=True),
+    anchor_decimal(1, U32_MAX, U32_MAX, U32_MAX),
+]
+
+
+@pytest.mark.parametrize("decimals", [EDGE_CASES, random_decimals(10_000)], ids=["edge", "random"])
+def test_anchor_decimals_to_floats_matches_to_float(decimals):
+    expected = [Decimal.from_anchor_decimal(d).to_float() for d in decimals]
+    assert anchor_decimals_to_floats(decimals) == expected
+
+
+@pytest.mark.parametrize("decimals", [EDGE_CASES, random_decimals(10_000)], ids=["edge", "random"])
+def test_anchor_decimals_to_decimals_matches_to_float(decimals):
+    converted = anchor_decimals_to_decimals(decimals)
+    assert [float(d) for d in converted] == [Decimal.from_anchor_decimal(d).to_float() for d in decimals]
+    for d, value in zip(decimals, converted):
+        # Built from its digits, so the expected value is exact rather than rounded to the context precision
+        digits = tuple(int(digit) for digit in str((d.hi << 64) | (d.mid << 32) | d.lo))
+        assert value == decimal.Decimal((int(bool(d.flags & SIGN)), digits, -((d.flags >> 16) & 0xFF)))
+
+
+def test_scale_zero_converts_to_integer():
+    d = anchor_decimal(0, 0, 0, 42, negative=True)
+    assert anchor_decimals_to_floats([d]) == [-42.0]
+    assert anchor_decimals_to_decimals([d]) == [decimal.Decimal(-42)]
+
+
+@pytest.mark.parametrize("convert", [anchor_decimals_to_floats, anchor_decimals_to_decimals])
+def test_scale_above_max_raises(convert):
+    with pytest.raises(ValueError, match="Scale 29"):
+        convert([anchor_decimal(MAX_SCALE + 1, 0, 0, 1)])
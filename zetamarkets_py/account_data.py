@@ -0,0 +1,185 @@
+import struct
+from itertools import islice
+from types import ModuleType, SimpleNamespace
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Iterator,
+    Literal,
+    Protocol,
+    Sequence,
+    Tuple,
+    cast,
+)
+
+from anchorpy.borsh_extension import BorshPubkeyAdapter, EnumForCodegen
+from anchorpy.coder.accounts import ACCOUNT_DISCRIMINATOR_SIZE
+from anchorpy.error import AccountInvalidDiscriminator
+from construct import (
+    Array,
+    BytesInteger,
+    Construct,
+    Container,
+    Flag,
+    FormatField,
+    Renamed,
+    Struct,
+)
+from solders.pubkey import Pubkey
+
+from zetamarkets_py.zeta_client import types
+from zetamarkets_py.zeta_client.accounts.cross_margin_account import CrossMarginAccount
+from zetamarkets_py.zeta_client.accounts.pricing import Pricing
+
+# Field-selective decoders for the large zeta accounts. The byte offset and struct format of every field are
+# compiled from the codegen construct layout once, so decoding a field is a single struct.unpack_from at a fixed
+# offset and the rest of the account is never touched. Decoded values are the same as the codegen decode gives.
+
+_Build = Callable[[Iterator[Any]], Any]
+
+
+class _CodegenLayout(Protocol):
+    layout: ClassVar[Any]
+
+
+class _CodegenType(_CodegenLayout, Protocol):
+    @classmethod
+    def from_decoded(cls, obj: Container) -> Any:
+        ...
+
+
+class _CodegenAccount(_CodegenLayout, Protocol):
+    discriminator: ClassVar[bytes]
+
+
+# Codegen types and enums by layout, to convert decoded fields the same way the codegen account decode does
+_FROM_DECODED: dict[int, Callable[[Any], Any]] = {}
+for _module in vars(types).values():
+    if not isinstance(_module, ModuleType):
+        continue
+    if isinstance(getattr(_module, "layout", None), EnumForCodegen):
+        _FROM_DECODED[id(_module.layout)] = _module.from_decoded
+    for _value in vars(_module).values():
+        if isinstance(_value, type) and _value.__module__ == _module.__name__ and hasattr(_value, "layout"):
+            _codegen_type = cast(type[_CodegenType], _value)
+            _FROM_DECODED[id(_codegen_type.layout)] = _codegen_type.from_decoded
+
+
+def _compile(subcon: Construct) -> Tuple[str, _Build]:
+    """Compile a fixed size construct into a struct format and a function building its value from the unpacked
+    values."""
+    if isinstance(subcon, Renamed):
+        return _compile(subcon.subcon)
+    if subcon is Flag:
+        return "?", next
+    if isinstance(subcon, FormatField):
+        return subcon.fmtstr[1:], next
+    if isinstance(subcon, BytesInteger) and isinstance(subcon.length, int):
+        length, signed = subcon.length, subcon.signed
+        byteorder: Literal["little", "big"] = "little" if subcon.swapped else "big"
+        return f"{length}s", lambda values: int.from_bytes(next(values), byteorder, signed=signed)
+    if isinstance(subcon, BorshPubkeyAdapter):
+        return "32s", lambda values: Pubkey(next(values))
+    if isinstance(subcon, EnumForCodegen):
+        # Only unit variants, which are a single index byte
+        variants = cast(Any, subcon.subcon).subcons[1].subcon.cases
+        if any(variant.sizeof() for variant in variants.values()):
+            raise ValueError(f"Unsupported enum with fields: {subcon}")
+        names = subcon.index_to_variant_name
+        return "B", lambda values: {names[next(values)]: Container()}
+    if isinstance(subcon, Array) and isinstance(subcon.count, int):
+        count = subcon.count
+        if isinstance(subcon.subcon, FormatField):
+            return f"{count}{subcon.subcon.fmtstr[1:]}", lambda values: list(islice(values, count))
+        fmt, build = _compile(subcon.subcon)
+        return fmt * count, lambda values: [build(values) for _ in range(count)]
+    if isinstance(subcon, Struct):
+        # The codegen from_decoded only reads attributes, and a namespace is much cheaper to build than a Container
+        fields = [(cast(str, field.name), *_compile(field)) for field in subcon.subcons]
+        return "".join(fmt for _, fmt, _ in fields), lambda values: SimpleNamespace(
+            **{name: build(values) for name, _, build in fields}
+        )
+    raise ValueError(f"Unsupported construct: {subcon}")
+
+
+def _from_decoded(subcon: Construct) -> Callable[[Any], Any]:
+    subcon = subcon.subcon if isinstance(subcon, Renamed) else subcon
+    if isinstance(subcon, Array):
+        convert = _FROM_DECODED.get(id(subcon.subcon))
+        if convert is not None:
+            convert_item: Callable[[Any], Any] = convert
+            return lambda items: [convert_item(item) for item in items]
+    return _FROM_DECODED.get(id(subcon), lambda value: value)
+
+
+class AccountFieldDecoder:
+    """Decodes a subset of the fields of an account.
+
+    Example:
+        Read the balance without decoding the rest of the margin account::
+
+            decoder = AccountFieldDecoder(CrossMarginAccount, ["balance"])
+            balance = decoder.decode(data).balance
+    """
+
+    def __init__(self, account_cls: type[_CodegenAccount], fields: Sequence[str]) -> None:
+        """Compiles the decoder.
+
+        Args:
+            account_cls (type[_CodegenAccount]): The codegen account class, e.g. ``CrossMarginAccount``.
+            fields (Sequence[str]): The fields to decode.
+
+        Raises:
+            ValueError: If a field is not in the account layout.
+        """
+        self.discriminator: bytes = account_cls.discriminator
+        offsets, offset = {}, ACCOUNT_DISCRIMINATOR_SIZE
+        subcons = {}
+        for subcon in account_cls.layout.subcons:
+            fmt, _ = _compile(subcon)
+            offsets[subcon.name] = offset
+            subcons[subcon.name] = subcon
+            offset += struct.calcsize("<" + fmt)
+        unknown = [name for name in fields if name not in subcons]
+        if unknown:
+            raise ValueError(f"Fields not in {account_cls.__name__}: {', '.join(unknown)}")
+        self._fields = []
+        for name in fields:
+            fmt, build = _compile(subcons[name])
+            self._fields.append((name, offsets[name], struct.Struct("<" + fmt), build, _from_decoded(subcons[name])))
+
+    def decode(self, data: bytes) -> Container:
+        """Decodes the fields from the account data.
+
+        Args:
+            data (bytes): The account data, including the discriminator.
+
+        Raises:
+            AccountInvalidDiscriminator: If the data is not of this account type.
+
+        Returns:
+            Container: The decoded fields, by name.
+        """
+        if data[:ACCOUNT_DISCRIMINATOR_SIZE] != self.discriminator:
+            raise AccountInvalidDiscriminator("The discriminator for this account is invalid")
+        return Container(
+            (name, convert(build(iter(layout.unpack_from(data, offset)))))
+            for name, offset, layout, build, convert in self._fields
+        )
+
+
+MARGIN_ACCOUNT_RISK_FIELDS = AccountFieldDecoder(CrossMarginAccount, ["balance", "product_ledgers"])
+"""The margin account fields read by the risk functions."""
+
+PRICING_RISK_FIELDS = AccountFieldDecoder(Pricing, ["mark_prices", "margin_parameters"])
+"""The pricing fields read by the risk functions."""
+
+PRICING_MARK_PRICES = AccountFieldDecoder(Pricing, ["mark_prices"])
+"""The mark prices of the pricing account."""
+
+MARGIN_ACCOUNT_FUNDING_FIELDS = AccountFieldDecoder(CrossMarginAccount, ["last_funding_deltas", "product_ledgers"])
+"""The margin account fields read by the funding tracker."""
+
+PRICING_FUNDING_DELTAS = AccountFieldDecoder(Pricing, ["funding_deltas"])
+"""The funding deltas of the pricing account."""
@@ -3,9 +3,9 @@ import json
 import logging
 import time
 import traceback
-from collections.abc import AsyncIterator
+from collections.abc import AsyncGenerator, AsyncIterator
 from dataclasses import dataclass, field
-from typing import List, Optional, Tuple, Union, cast
+from typing import Any, Awaitable, Callable, List, Optional, Tuple, TypeVar, Union, cast
 
 import anchorpy
 import based58
@@ -15,12 +15,6 @@ import websockets.legacy.client  # force eager imports
 from anchorpy import Event, Provider, Wallet
 from anchorpy.provider import DEFAULT_OPTIONS
 from construct import Container
-from jito_searcher_client import get_async_searcher_client  # type: ignore
-from jito_searcher_client.generated.bundle_pb2 import Bundle  # type: ignore
-from jito_searcher_client.generated.packet_pb2 import Meta, Packet  # type: ignore
-from jito_searcher_client.generated.searcher_pb2 import (
-    SendBundleRequest,  # type: ignore
-)
 from jsonrpcclient import request
 from solana.rpc.async_api import AsyncClient
 from solana.rpc.commitment import Commitment, Confirmed
@@ -28,14 +22,31 @@ from solana.rpc.core import RPCException
 from solana.rpc.types import TxOpts
 from solana.rpc.websocket_api import connect
 from solders.compute_budget import set_compute_unit_price
-from solders.instruction import Instruction
-from solders.message import MessageV0
+from solders.hash import Hash
+from solders.instruction import AccountMeta, CompiledInstruction, Instruction
+from solders.message import MessageHeader, MessageV0
 from solders.pubkey import Pubkey
 from solders.rpc.config import RpcTransactionLogsFilterMentions
+from solders.rpc.responses import GetLatestBlockhashResp
+from solders.signature import Signature
 from solders.system_program import TransferParams, transfer
 from solders.transaction import VersionedTransaction
-
-from zetamarkets_py import constants, pda, utils
+from solders.transaction_status import TransactionStatus
+
+from zetamarkets_py import constants, instruction_data, pda, utils
+from zetamarkets_py.account_data import (
+    MARGIN_ACCOUNT_FUNDING_FIELDS,
+    MARGIN_ACCOUNT_RISK_FIELDS,
+    PRICING_FUNDING_DELTAS,
+    PRICING_RISK_FIELDS,
+)
+from zetamarkets_py.confirmations import (
+    ConfirmationTracker,
+    EndpointStats,
+    TransactionConfirmation,
+    is_committed,
+)
+from zetamarkets_py.endpoints import EndpointPool
 from zetamarkets_py.events import (
     ApplyFundingEvent,
     CancelOrderEvent,
@@ -51,27 +62,32 @@ from zetamarkets_py.events import (
     ZetaEvent,
 )
 from zetamarkets_py.exchange import Exchange
-from zetamarkets_py.orderbook import Orderbook
-from zetamarkets_py.risk import AccountRiskSummary, Position
+from zetamarkets_py.funding import FundingTracker
+from zetamarkets_py.orderbook import LiveBook, Orderbook
+from zetamarkets_py.risk import AccountRiskSummary, LiveRisk, MarginSimulator, Position
+from zetamarkets_py.serum_client.accounts.open_orders import OpenOrders
 from zetamarkets_py.serum_client.accounts.orderbook import OrderbookAccount
+from zetamarkets_py.snapshot import ExchangeSnapshot
 from zetamarkets_py.solana_client.accounts.clock import CLOCK, Clock
+from zetamarkets_py.subscriptions import SubscriptionManager
 from zetamarkets_py.types import (
     Asset,
     MultiOrderArgs,
     Network,
+    Order,
     OrderArgs,
+    OrderbookDelta,
     OrderCompleteType,
     OrderOptions,
     OrderType,
+    PreparedTransaction,
     Side,
 )
 from zetamarkets_py.zeta_client.accounts.cross_margin_account import CrossMarginAccount
 from zetamarkets_py.zeta_client.accounts.pricing import Pricing
 from zetamarkets_py.zeta_client.errors import from_tx_error
 from zetamarkets_py.zeta_client.instructions import (
-    cancel_all_market_orders,
     cancel_order,
-    cancel_order_by_client_order_id,
     deposit_v2,
     initialize_cross_margin_account,
     initialize_cross_margin_account_manager_v2,
@@ -80,7 +96,8 @@ from zetamarkets_py.zeta_client.instructions import (
     place_perp_order_v5,
     withdraw_v2,
 )
-from zetamarkets_py.zeta_client.types import OrderArgs as ProgramOrderArgs
+
+T = TypeVar("T")
 
 # TODO: add docstrings for most methods
 # TODO: implement withdraw and liquidation
@@ -134,6 +151,35 @@ class Client:
     double_down_jito: bool = False
     jito_tip: int = 10000
 
+    subscription_manager: Optional[SubscriptionManager] = None
+    """Shared websocket multiplexer for subscriptions. If None, each subscription opens its own websocket."""
+
+    _account_templates: dict[Tuple[str, Asset, Optional[Side]], Tuple[object, object, List[AccountMeta]]] = field(
+        default_factory=dict
+    )
+
+    subaccount_index: int = 0
+    """The index of the margin account among the wallet's subaccounts."""
+
+    blockhash_feeder: Optional[utils.BlockhashFeeder] = None
+    """Keeps the blockhash cache warm in the background. None if the cache is filled by the caller only."""
+
+    confirmation_tracker: Optional[ConfirmationTracker] = None
+    """Confirms sent transactions in the background. If None, sends wait for confirmation as per the tx options."""
+
+    rebroadcast_stats: dict[str, EndpointStats] = field(default_factory=dict)
+    """Land rate and time to land of :func:`send_with_rebroadcast`, by RPC endpoint."""
+
+    endpoint_pool: Optional[EndpointPool] = None
+    """Ranks the primary and double-down connections by latency and errors. None without double-down endpoints."""
+
+    race_double_downs: bool = False
+    """Whether sends return on the first double-down endpoint to accept the transaction, instead of waiting for all."""
+
+    _message_templates: dict[tuple, Tuple[MessageHeader, list[Pubkey], list, list[Tuple[int, bytes]]]] = field(
+        default_factory=dict
+    )
+
     @classmethod
     async def load(
         cls,
@@ -148,6 +194,13 @@ class Client:
         log_level: int = logging.WARNING,
         blockhash_cache: Optional[utils.BlockhashCache] = None,
         delegator_pubkey: Optional[Pubkey] = None,
+        multiplex_subscriptions: bool = False,
+        ws_pool_size: int = 1,
+        snapshot_path: Optional[str] = None,
+        subaccount_index: int = 0,
+        blockhash_refresh_interval: Optional[float] = 0.5,
+        confirm_in_background: bool = False,
+        race_double_downs: bool = False,
     ):
         """
         Asynchronously load the Zeta Client.
@@ -165,10 +218,68 @@ class Client:
             blockhash_cache (Union[BlockhashCache, bool], optional): The blockhash cache. Disabled by default.
             delegator_pubkey (Pubkey, optional): If passing in a delegated wallet in the 'wallet' param, this
             is the delegator account itself so you can load positions/orders/balance/etc
+            multiplex_subscriptions (bool, optional): Share a small pool of websockets between all subscriptions
+                instead of opening one per subscription. Defaults to False.
+            ws_pool_size (int, optional): The maximum number of websockets in the shared pool. Defaults to 1.
+            snapshot_path (str, optional): A file to cache exchange metadata and derived addresses in between runs,
+                so that restarts skip most RPC calls and PDA derivation. Defaults to None.
+            subaccount_index (int, optional): The index of the margin account to trade from. Defaults to 0.
+            blockhash_refresh_interval (float, optional): Seconds between background refreshes of the blockhash cache,
+                if one is given. None leaves filling the cache to the caller. Defaults to 0.5.
+            confirm_in_background (bool, optional): Return from sends as soon as the transaction is submitted, and
+                confirm it with :attr:`confirmation_tracker` instead. Defaults to False.
+            race_double_downs (bool, optional): Return from sends as soon as the first double-down endpoint accepts the
+                transaction, leaving the others to finish in the background. Defaults to False.
 
         Returns:
             Client: An instance of the Client class.
         """
+        clients = await cls._load_many(
+            [subaccount_index],
+            endpoint=endpoint,
+            ws_endpoint=ws_endpoint,
+            double_down_endpoints=double_down_endpoints,
+            commitment=commitment,
+            wallet=wallet,
+            assets=assets,
+            tx_opts=tx_opts,
+            network=network,
+            log_level=log_level,
+            blockhash_cache=blockhash_cache,
+            delegator_pubkey=delegator_pubkey,
+            multiplex_subscriptions=multiplex_subscriptions,
+            ws_pool_size=ws_pool_size,
+            snapshot_path=snapshot_path,
+            blockhash_refresh_interval=blockhash_refresh_interval,
+            confirm_in_background=confirm_in_background,
+            race_double_downs=race_double_downs,
+        )
+        return clients[0]
+
+    @classmethod
+    async def _load_many(
+        cls,
+        subaccount_indices: list[int],
+        endpoint: Optional[str],
+        ws_endpoint: Optional[str],
+        double_down_endpoints: Optional[str],
+        commitment: Commitment,
+        wallet: Optional[Wallet],
+        assets: list[Asset],
+        tx_opts: TxOpts,
+        network: Network,
+        log_level: int,
+        blockhash_cache: Optional[utils.BlockhashCache],
+        delegator_pubkey: Optional[Pubkey],
+        multiplex_subscriptions: bool,
+        ws_pool_size: int,
+        snapshot_path: Optional[str],
+        blockhash_refresh_interval: Optional[float] = None,
+        confirm_in_background: bool = False,
+        race_double_downs: bool = False,
+    ) -> list["Client"]:
+        """Load one client per subaccount, all sharing one connection, exchange, set of providers and subscription
+        manager. The accounts of every subaccount are fetched together in one batched call."""
         logger = utils.create_logger(f"{__name__}.{cls.__name__}", log_level)
 
         if endpoint is None:
@@ -180,33 +291,66 @@ class Client:
             network=network,
             connection=connection,
             assets=assets,
+            snapshot_path=snapshot_path,
         )
+        snapshot = cast(ExchangeSnapshot, exchange._snapshot)
+        _margin_account_address: Optional[Pubkey]
+        _open_orders_addresses: Optional[dict[Asset, Pubkey]]
         if wallet is None:
             wallet = Wallet.dummy()
             logger.warning("Client in read-only mode, pass in `wallet` to enable transactions")
             _margin_account_manager_address = None
             _user_usdc_address = None
-            _margin_account_address = None
-            margin_account = None
-            _open_orders_addresses = None
+            accounts: list[Tuple[Optional[Pubkey], Optional[dict[Asset, Pubkey]]]] = [(None, None)]
         else:
             key = wallet.public_key if delegator_pubkey is None else delegator_pubkey
 
-            _margin_account_manager_address = pda.get_cross_margin_account_manager_address(exchange.program_id, key)
-            _user_usdc_address = pda.get_associated_token_address(key, constants.USDC_MINT[network])
-            _margin_account_address = pda.get_margin_account_address(exchange.program_id, key, 0)
-            margin_account = await CrossMarginAccount.fetch(
-                connection, _margin_account_address, connection.commitment, exchange.program_id
+            _margin_account_manager_address = snapshot.address(
+                f"margin_account_manager:{key}",
+                lambda: pda.get_cross_margin_account_manager_address(exchange.program_id, key),
+            )
+            _user_usdc_address = snapshot.address(
+                f"usdc_ata:{key}", lambda: pda.get_associated_token_address(key, constants.USDC_MINT[network])
             )
-            _open_orders_addresses = {}
-            for asset in assets:
-                open_orders_address = pda.get_open_orders_address(
-                    exchange.program_id,
-                    constants.MATCHING_ENGINE_PID[network],
-                    exchange.markets[asset].address,
-                    _margin_account_address,
+            accounts = []
+            for subaccount_index in subaccount_indices:
+                margin_account_address = snapshot.address(
+                    f"margin_account:{key}:{subaccount_index}",
+                    lambda: pda.get_margin_account_address(exchange.program_id, key, subaccount_index),
                 )
-                _open_orders_addresses[asset] = open_orders_address
+                open_orders_addresses: dict[Asset, Pubkey] = {}
+                for asset in assets:
+                    market_address = exchange.markets[asset].address
+                    open_orders_address = snapshot.address(
+                        f"open_orders:{market_address}:{margin_account_address}",
+                        lambda: pda.get_open_orders_address(
+                            exchange.program_id,
+                            constants.MATCHING_ENGINE_PID[network],
+                            market_address,
+                            margin_account_address,
+                        ),
+                    )
+                    open_orders_addresses[asset] = open_orders_address
+                accounts.append((margin_account_address, open_orders_addresses))
+
+        # Margin accounts, and whether the accounts checked before trading exist, for every subaccount at once
+        margin_accounts: dict[Pubkey, CrossMarginAccount] = {}
+        existing: set[Pubkey] = set()
+        if _margin_account_manager_address is not None and _user_usdc_address is not None:
+            addresses = [_margin_account_manager_address, _user_usdc_address]
+            for _margin_account_address, _open_orders_addresses in accounts:
+                addresses += [cast(Pubkey, _margin_account_address), *cast(dict, _open_orders_addresses).values()]
+            infos = await anchorpy.utils.rpc.get_multiple_accounts(connection, addresses, commitment=commitment)
+            infos_by_address = {info.pubkey: info for info in infos if info is not None}
+            existing = set(infos_by_address)
+            for _margin_account_address, _ in accounts:
+                info = infos_by_address.get(cast(Pubkey, _margin_account_address))
+                if info is None:
+                    continue
+                if info.account.owner != exchange.program_id:
+                    raise ValueError("Account does not belong to this program")
+                margin_accounts[info.pubkey] = CrossMarginAccount.decode(info.account.data)
+
         provider = Provider(
             connection,
             wallet,
@@ -224,29 +368,89 @@ class Client:
                     )
                 )
 
+        endpoint_pool = (
+            EndpointPool([connection, *[provider.connection for provider in double_down_providers]])
+            if double_down_providers
+            else None
+        )
+
         # additional addresses to cache
-        _combined_vault_address = pda.get_combined_vault_address(exchange.program_id)
-        _combined_socialized_loss_address = pda.get_combined_socialized_loss_address(exchange.program_id)
+        _combined_vault_address = snapshot.address(
+            "combined_vault", lambda: pda.get_combined_vault_address(exchange.program_id)
+        )
+        _combined_socialized_loss_address = snapshot.address(
+            "combined_socialized_loss", lambda: pda.get_combined_socialized_loss_address(exchange.program_id)
+        )
+        snapshot.save()
 
-        return cls(
-            provider,
-            double_down_providers,
-            network,
-            connection,
-            endpoint,
-            ws_endpoint,
-            exchange,
-            blockhash_cache,
-            margin_account,
-            _margin_account_address,
-            _open_orders_addresses,
-            _margin_account_manager_address,
-            _user_usdc_address,
-            _combined_vault_address,
-            _combined_socialized_loss_address,
-            logger,
+        subscription_manager = (
+            SubscriptionManager(ws_endpoint, ws_pool_size, logger=logger) if multiplex_subscriptions else None
         )
 
+        blockhash_feeder = None
+        if blockhash_cache is not None and blockhash_refresh_interval is not None:
+            blockhash_feeder = utils.BlockhashFeeder(
+                connection, blockhash_cache, blockhash_refresh_interval, commitment, logger
+            )
+            blockhash_feeder.start()
+
+        confirmation_tracker = (
+            ConfirmationTracker(connection, commitment, logger=logger) if confirm_in_background else None
+        )
+
+        instances = []
+        for subaccount_index, (_margin_account_address, _open_orders_addresses) in zip(subaccount_indices, accounts):
+            instance = cls(
+                provider,
+                double_down_providers,
+                network,
+                connection,
+                endpoint,
+                ws_endpoint,
+                exchange,
+                blockhash_cache,
+                margin_accounts.get(_margin_account_address) if _margin_account_address is not None else None,
+                _margin_account_address,
+                _open_orders_addresses,
+                _margin_account_manager_address,
+                _user_usdc_address,
+                _combined_vault_address,
+                _combined_socialized_loss_address,
+                logger,
+                _account_exists_cache={address: True for address in existing},
+                subscription_manager=subscription_manager,
+                subaccount_index=subaccount_index,
+                blockhash_feeder=blockhash_feeder,
+                confirmation_tracker=confirmation_tracker,
+                endpoint_pool=endpoint_pool,
+                race_double_downs=race_double_downs,
+            )
+            if _margin_account_address is not None:
+                # Build the order and cancel account lists up front so the first quote doesn't pay for them
+                instance._warm_account_templates()
+            instances.append(instance)
+
+        return instances
+
+    async def close(self):
+        """
+        Stop every background task of the client and close its connections.
+
+        This stops the blockhash feeder, closes the confirmation tracker and the subscription manager, cancels the
+        exchange snapshot refresh and closes the primary and double-down RPC connections. Clients loaded together by
+        :class:`MultiClient` share these, so closing one closes them for all.
+        """
+        if self.blockhash_feeder is not None:
+            await self.blockhash_feeder.stop()
+        if self.confirmation_tracker is not None:
+            await self.confirmation_tracker.close()
+        if self.subscription_manager is not None:
+            await self.subscription_manager.close()
+        await self.exchange.close()
+        for provider in self.double_down_providers:
+            await provider.connection.close()
+        await self.connection.close()
+
     async def _check_user_usdc_account_exists(self):
         """
         Check if the user's USDC account exists.
@@ -256,7 +460,7 @@ class Client:
         """
         if self._user_usdc_address in self._account_exists_cache:
             return self._account_exists_cache[self._user_usdc_address]
-        resp = await self.connection.get_account_info(self._user_usdc_address)
+        resp = await self._rpc(lambda connection: connection.get_account_info(self._user_usdc_address))
         exists = resp.value is not None
         if exists:
             self._account_exists_cache[self._user_usdc_address] = exists
@@ -271,7 +475,7 @@ class Client:
         """
         if self._margin_account_manager_address in self._account_exists_cache:
             return self._account_exists_cache[self._margin_account_manager_address]
-        resp = await self.connection.get_account_info(self._margin_account_address)
+        resp = await self._rpc(lambda connection: connection.get_account_info(self._margin_account_address))
         exists = resp.value is not None
         if exists:
             self._account_exists_cache[self._margin_account_manager_address] = exists
@@ -286,7 +490,7 @@ class Client:
         """
         if self._margin_account_address in self._account_exists_cache:
             return self._account_exists_cache[self._margin_account_address]
-        account = await CrossMarginAccount.fetch(self.connection, self._margin_account_address)
+        account = await self._rpc(lambda connection: CrossMarginAccount.fetch(connection, self._margin_account_address))
         exists = account is not None
         if exists:
             self._account_exists_cache[self._margin_account_address] = exists
@@ -311,7 +515,7 @@ class Client:
         open_orders_address = self._open_orders_addresses[asset]
         if open_orders_address in self._account_exists_cache:
             return self._account_exists_cache[open_orders_address]
-        resp = await self.connection.get_account_info(open_orders_address)
+        resp = await self._rpc(lambda connection: connection.get_account_info(open_orders_address))
         exists = resp.value is not None
         if exists:
             self._account_exists_cache[open_orders_address] = exists
@@ -329,11 +533,12 @@ class Client:
         """
         if self.margin_account is None or self._margin_account_address is None:
             raise Exception("Margin account not loaded, cannot fetch margin account state")
-        margin_account = await self.margin_account.fetch(
-            self.connection, self._margin_account_address, program_id=self.exchange.program_id
-        )
-        if margin_account is None:
+        resp = await self._rpc(lambda connection: connection.get_account_info(self._margin_account_address))
+        if resp.value is None:
             raise Exception("Margin account not found, cannot fetch margin state")
+        if resp.value.owner != self.exchange.program_id:
+            raise ValueError("Account does not belong to this program")
+        margin_account = cast(CrossMarginAccount, MARGIN_ACCOUNT_RISK_FIELDS.decode(resp.value.data))
         balance = utils.convert_fixed_int_to_decimal(margin_account.balance)
         positions = {
             Asset.from_index(i): Position.from_margin_account(margin_account, i)
@@ -348,17 +553,56 @@ class Client:
         This method fetches the margin state of the account, calculates the equity, margin parameters, margin usage,
         and leverage, and returns an AccountRiskSummary object.
 
+        Raises:
+            Exception: If the margin account is not loaded or does not exist.
+
         Returns:
             AccountRiskSummary: The risk summary of the account.
         """
+        margin_account_address = self._margin_account_address
+        if margin_account_address is None:
+            raise Exception("Margin account not loaded, cannot get risk summary")
         # Batched RPC call to margin acc and prices
-        account_infos = await anchorpy.utils.rpc.get_multiple_accounts(
-            self.connection, [self._margin_account_address, self.exchange._pricing_address]
+        account_infos = await self._rpc(
+            lambda connection: anchorpy.utils.rpc.get_multiple_accounts(
+                connection, [margin_account_address, self.exchange._pricing_address]
+            )
         )
-        margin_account = CrossMarginAccount.decode(account_infos[0].account.data)
-        pricing_account = Pricing.decode(account_infos[1].account.data)
+        margin_info, pricing_info = account_infos
+        if margin_info is None or pricing_info is None:
+            raise Exception("Margin account does not exist, cannot get risk summary")
+        margin_account = cast(CrossMarginAccount, MARGIN_ACCOUNT_RISK_FIELDS.decode(margin_info.account.data))
+        pricing_account = cast(Pricing, PRICING_RISK_FIELDS.decode(pricing_info.account.data))
         return AccountRiskSummary.from_margin_and_pricing_accounts(margin_account, pricing_account)
 
+    async def get_margin_simulator(self) -> MarginSimulator:
+        """
+        Get a margin simulator for the account.
+
+        This method fetches the margin and pricing accounts in one batched call. Proposed orders and price shocks can
+        then be evaluated against them locally, e.g. to check an order fits within the initial margin before sending it.
+
+        Raises:
+            Exception: If the margin account is not loaded or does not exist.
+
+        Returns:
+            MarginSimulator: The margin simulator of the account.
+        """
+        margin_account_address = self._margin_account_address
+        if margin_account_address is None:
+            raise Exception("Margin account not loaded, cannot get margin simulator")
+        account_infos = await self._rpc(
+            lambda connection: anchorpy.utils.rpc.get_multiple_accounts(
+                connection, [margin_account_address, self.exchange._pricing_address]
+            )
+        )
+        margin_info, pricing_info = account_infos
+        if margin_info is None or pricing_info is None:
+            raise Exception("Margin account does not exist, cannot get margin simulator")
+        margin_account = cast(CrossMarginAccount, MARGIN_ACCOUNT_RISK_FIELDS.decode(margin_info.account.data))
+        pricing_account = cast(Pricing, PRICING_RISK_FIELDS.decode(pricing_info.account.data))
+        return MarginSimulator(margin_account, pricing_account)
+
     async def fetch_open_orders(self, asset: Asset):
         """
         Fetch the open orders for a specific asset.
@@ -367,15 +611,60 @@ class Client:
             asset (Asset): The asset for which to fetch the open orders.
 
         Raises:
-            Exception: If the open orders accounts are not loaded.
+            Exception: If the open orders accounts are not loaded or the orderbook is not found.
 
         Returns:
             List[Order]: The open orders for the asset.
         """
+        open_orders = await self.fetch_all_open_orders([asset])
+        return open_orders[asset]
+
+    async def fetch_all_open_orders(self, assets: Optional[list[Asset]] = None) -> dict[Asset, list[Order]]:
+        """
+        Fetch the open orders for several assets at once, e.g. to reconcile state after a restart.
+
+        The open orders accounts and both orderbooks of every asset are fetched in one batched call. The occupied
+        slots of each open orders account say which orders to look for on which side, so books are never scanned for
+        assets without orders.
+
+        Args:
+            assets (list[Asset], optional): The assets for which to fetch the open orders. Defaults to all loaded
+                assets.
+
+        Raises:
+            Exception: If the open orders accounts are not loaded or an orderbook is not found.
+
+        Returns:
+            dict[Asset, list[Order]]: The open orders by asset, empty for assets without an open orders account.
+        """
         if self._open_orders_addresses is None:
             raise Exception("Open orders accounts not loaded, cannot fetch open orders")
-        oo = await self.exchange.markets[asset].load_orders_for_owner(self._open_orders_addresses[asset])
-        return oo
+        if assets is None:
+            assets = self.exchange.assets
+        markets = [self.exchange.markets[asset] for asset in assets]
+        addresses = [self._open_orders_addresses[asset] for asset in assets]
+        for market in markets:
+            addresses += [market._market_state.bids, market._market_state.asks]
+        infos = await self._rpc(lambda connection: anchorpy.utils.rpc.get_multiple_accounts(connection, addresses))
+
+        open_orders: dict[Asset, list[Order]] = {}
+        for asset, market, address, info, bids_info, asks_info in zip(
+            assets, markets, addresses, infos, infos[len(assets) :: 2], infos[len(assets) + 1 :: 2]
+        ):
+            if info is None:
+                open_orders[asset] = []
+                continue
+            if bids_info is None or asks_info is None:
+                raise Exception(f"Orderbook for {asset} not found, cannot fetch open orders")
+            for account_info in (info, bids_info, asks_info):
+                if account_info.account.owner != market.matching_engine_program_id:
+                    raise ValueError("Account does not belong to this program")
+            bids = Orderbook(Side.Bid, OrderbookAccount.decode_lazy(bids_info.account.data), market._market_state)
+            asks = Orderbook(Side.Ask, OrderbookAccount.decode_lazy(asks_info.account.data), market._market_state)
+            open_orders[asset] = market._parse_orders_from_open_orders(
+                bids, asks, address, OpenOrders.decode(info.account.data)
+            )
+        return open_orders
 
     async def fetch_clock(self):
         """
@@ -387,7 +676,7 @@ class Client:
         Returns:
             Clock: The clock.
         """
-        clock = await Clock.fetch(self.connection)
+        clock = await self._rpc(Clock.fetch)
         if clock is None:
             raise Exception("Clock not found, cannot fetch clock")
         return clock
@@ -397,7 +686,7 @@ class Client:
         address: Pubkey,
         commitment: Commitment,
         encoding: str = "base64+zstd",
-    ) -> AsyncIterator[Tuple[bytes, int]]:
+    ) -> AsyncGenerator[Tuple[bytes, int], None]:
         """
         Subscribe to an account and yield account data and slot.
 
@@ -407,8 +696,12 @@ class Client:
             encoding (str, optional): The encoding to use for the subscription. Defaults to "base64+zstd".
 
         Yields:
-            AsyncIterator[Tuple[bytes, int]]: An async iterator that yields tuples of account data and slot.
+            AsyncGenerator[Tuple[bytes, int], None]: An async generator that yields tuples of account data and slot.
         """
+        if self.subscription_manager is not None:
+            async for account_bytes, slot in self.subscription_manager.account_subscribe(address, commitment, encoding):
+                yield account_bytes, slot
+            return
         async for ws in connect(self.ws_endpoint):
             try:
                 await ws.account_subscribe(  # type: ignore
@@ -454,10 +747,192 @@ class Client:
 
         self._logger.info(f"Subscribing to Orderbook:{side}.")
         async for account_bytes, slot in self._account_subscribe(address, commitment):
-            account = OrderbookAccount.decode(account_bytes)
+            account = OrderbookAccount.decode_lazy(account_bytes)
             orderbook = Orderbook(side, account, self.exchange.markets[asset]._market_state)
             yield orderbook, slot
 
+    async def subscribe_orderbook_deltas(
+        self, asset: Asset, side: Side, commitment: Optional[Commitment] = None
+    ) -> AsyncIterator[Tuple[Orderbook, OrderbookDelta, int]]:
+        """
+        Subscribe to an orderbook and yield only the changes between consecutive snapshots.
+
+        The previous snapshot is kept and diffed against each notification. Notifications that leave the slab
+        header and every node slot unchanged are skipped without decoding any leaves. The first notification
+        yields every resting order as added.
+
+        Args:
+            asset (Asset): The asset for which to subscribe to the orderbook.
+            side (Side): The side of the orderbook to subscribe to.
+            commitment (Commitment, optional): The commitment level to use for the subscription. Defaults to None.
+
+        Yields:
+            AsyncIterator[Tuple[Orderbook, OrderbookDelta, int]]: An async iterator that yields tuples of the latest
+                orderbook, the order and level deltas from the previous snapshot, and slot.
+        """
+        previous: Optional[Orderbook] = None
+        async for orderbook, slot in self.subscribe_orderbook(asset, side, commitment):
+            delta = orderbook.diff(previous)
+            if previous is not None and delta.is_empty:
+                continue
+            previous = orderbook
+            yield orderbook, delta, slot
+
+    async def subscribe_live_book(
+        self, asset: Asset, commitment: Optional[Commitment] = None, tif_buffer: int = 10
+    ) -> AsyncIterator[Tuple[LiveBook, Side, int]]:
+        """
+        Subscribe to both sides of an orderbook over one websocket and yield a two-sided live book.
+
+        Args:
+            asset (Asset): The asset for which to subscribe to the orderbook.
+            commitment (Commitment, optional): The commitment level to use for the subscription. Defaults to None.
+            tif_buffer (int, optional): The TIF buffer in seconds used when masking expired orders. Defaults to 10.
+
+        Yields:
+            AsyncIterator[Tuple[LiveBook, Side, int]]: An async iterator that yields the live book, the side that was
+                updated and its slot.
+        """
+        commitment = commitment or self.connection.commitment
+
+        self._logger.info(f"Subscribing to LiveBook:{asset}.")
+        async for live_book, side, slot in self.exchange.markets[asset].subscribe_live_book(
+            self.ws_endpoint, commitment, tif_buffer, self.subscription_manager
+        ):
+            yield live_book, side, slot
+
+    async def subscribe_risk(self, commitment: Optional[Commitment] = None) -> AsyncIterator[Tuple[LiveRisk, int]]:
+        """
+        Subscribe to the margin and pricing accounts and yield a live risk summary.
+
+        Both accounts are fetched once in a single batched call so that risk is available straight away, after which
+        the risk is only updated from websocket notifications. Only the fields the risk is computed from are decoded on
+        each update. Reading ``LiveRisk.summary`` makes no RPC calls and only recomputes the assets whose ledger, mark
+        price or margin parameters changed since the last read.
+
+        Args:
+            commitment (Commitment, optional): The commitment level to use for the subscription. Defaults to None.
+
+        Raises:
+            Exception: If the margin account is not loaded or does not exist.
+
+        Yields:
+            AsyncIterator[Tuple[LiveRisk, int]]: An async iterator that yields the live risk and the slot of the
+                update.
+        """
+        if self._margin_account_address is None:
+            raise Exception("Margin account not loaded, cannot subscribe to risk")
+        commitment = commitment or self.connection.commitment
+        addresses = [self._margin_account_address, self.exchange._pricing_address]
+
+        self._logger.info("Subscribing to risk")
+        subscriptions = self.subscription_manager or SubscriptionManager(self.ws_endpoint, logger=self._logger)
+        updates = subscriptions.accounts_subscribe(addresses, commitment)
+        # Subscribe before fetching the initial accounts so that no update in between is missed, anything older
+        # than the fetched accounts is then dropped by slot
+        next_update = asyncio.ensure_future(updates.__anext__())
+        try:
+            resp = await self.connection.get_multiple_accounts(addresses, commitment, encoding="base64+zstd")
+            margin_info, pricing_info = resp.value
+            if margin_info is None or pricing_info is None:
+                raise Exception("Margin account does not exist, cannot subscribe to risk")
+            live_risk = LiveRisk()
+            margin_account = MARGIN_ACCOUNT_RISK_FIELDS.decode(margin_info.data)
+            live_risk.update_margin_account(cast(CrossMarginAccount, margin_account), resp.context.slot)
+            pricing = PRICING_RISK_FIELDS.decode(pricing_info.data)
+            live_risk.update_pricing(cast(Pricing, pricing), resp.context.slot)
+            yield live_risk, resp.context.slot
+
+            while True:
+                address, account_bytes, slot = await next_update
+                next_update = asyncio.ensure_future(updates.__anext__())
+                if address == self._margin_account_address:
+                    margin_account = MARGIN_ACCOUNT_RISK_FIELDS.decode(account_bytes)
+                    updated = live_risk.update_margin_account(cast(CrossMarginAccount, margin_account), slot)
+                else:
+                    pricing = PRICING_RISK_FIELDS.decode(account_bytes)
+                    updated = live_risk.update_pricing(cast(Pricing, pricing), slot)
+                if updated:
+                    yield live_risk, slot
+        finally:
+            next_update.cancel()
+            await asyncio.gather(next_update, return_exceptions=True)
+            await updates.aclose()
+            if self.subscription_manager is None:
+                await subscriptions.close()
+
+    async def subscribe_funding(
+        self,
+        margin_account_addresses: Optional[list[Pubkey]] = None,
+        commitment: Optional[Commitment] = None,
+        history_length: int = 1000,
+    ) -> AsyncIterator[Tuple[FundingTracker, int]]:
+        """
+        Subscribe to the pricing account and margin accounts and yield the funding accrued but not yet applied.
+
+        All accounts are fetched once in a single batched call, then followed over one websocket. Only the funding
+        deltas and product ledgers are decoded on each update.
+
+        Args:
+            margin_account_addresses (Optional[list[Pubkey]]): The margin accounts to track, e.g. several subaccounts.
+                Defaults to None, the client's margin account.
+            commitment (Commitment, optional): The commitment level to use for the subscription. Defaults to None.
+            history_length (int, optional): The number of funding snapshots to keep. Defaults to 1000.
+
+        Raises:
+            Exception: If no margin account is given or loaded, or a margin account does not exist.
+
+        Yields:
+            AsyncIterator[Tuple[FundingTracker, int]]: An async iterator that yields the funding tracker and the slot
+                of the update.
+        """
+        if margin_account_addresses is None:
+            if self._margin_account_address is None:
+                raise Exception("Margin account not loaded, cannot subscribe to funding")
+            margin_account_addresses = [self._margin_account_address]
+        commitment = commitment or self.connection.commitment
+        pricing_address = self.exchange._pricing_address
+        addresses = [*margin_account_addresses, pricing_address]
+
+        self._logger.info("Subscribing to funding")
+        subscriptions = self.subscription_manager or SubscriptionManager(self.ws_endpoint, logger=self._logger)
+        updates = subscriptions.accounts_subscribe(addresses, commitment)
+        # Subscribe before fetching the initial accounts so that no update in between is missed, anything older
+        # than the fetched accounts is then dropped by slot
+        next_update = asyncio.ensure_future(updates.__anext__())
+        try:
+            resp = await self.connection.get_multiple_accounts(addresses, commitment, encoding="base64+zstd")
+            datas = []
+            for info in resp.value:
+                if info is None:
+                    raise Exception("Margin account does not exist, cannot subscribe to funding")
+                datas.append(info.data)
+            tracker = FundingTracker(margin_account_addresses, history_length)
+            for address, data in zip(margin_account_addresses, datas):
+                margin_account = MARGIN_ACCOUNT_FUNDING_FIELDS.decode(data)
+                tracker.update_margin_account(address, cast(CrossMarginAccount, margin_account), resp.context.slot)
+            pricing = PRICING_FUNDING_DELTAS.decode(datas[-1])
+            tracker.update_pricing(cast(Pricing, pricing), resp.context.slot)
+            yield tracker, resp.context.slot
+
+            while True:
+                address, account_bytes, slot = await next_update
+                next_update = asyncio.ensure_future(updates.__anext__())
+                if address == pricing_address:
+                    pricing = PRICING_FUNDING_DELTAS.decode(account_bytes)
+                    updated = tracker.update_pricing(cast(Pricing, pricing), slot)
+                else:
+                    margin_account = MARGIN_ACCOUNT_FUNDING_FIELDS.decode(account_bytes)
+                    updated = tracker.update_margin_account(address, cast(CrossMarginAccount, margin_account), slot)
+                if updated:
+                    yield tracker, slot
+        finally:
+            next_update.cancel()
+            await asyncio.gather(next_update, return_exceptions=True)
+            await updates.aclose()
+            if self.subscription_manager is None:
+                await subscriptions.close()
+
     async def subscribe_clock(self, commitment: Optional[Commitment] = None) -> AsyncIterator[Tuple[Clock, int]]:
         """
         Subscribe to a clock and yield clock data and slot.
@@ -494,6 +969,17 @@ class Client:
         else:
             pubkey = self.exchange.program_id
         commitment = commitment or self.connection.commitment
+        if self.subscription_manager is not None:
+            async for notification in self.subscription_manager.logs_subscribe(
+                RpcTransactionLogsFilterMentions(pubkey), commitment
+            ):
+                try:
+                    events, meta = self._parse_event_payload([notification], ignore_third_party_events)
+                    if len(events) > 0 or not meta.is_successful:
+                        yield events, meta
+                except Exception:
+                    self._logger.error(f"Error processing event data: {traceback.format_exc()}")
+            return
         async for ws in connect(self.ws_endpoint):
             try:
                 # Subscribe to logs that mention the margin account
@@ -697,7 +1183,7 @@ class Client:
                 ix_args.append(None)
                 ix_names.append(None)
                 continue
-            data = self.exchange.program.coder.instruction.parse(bytes(ix["data"][1:]))
+            data = self.exchange.coder.instruction.parse(bytes(ix["data"][1:]))
             ix_args.append(data.data)
             ix_names.append(data.name)
 
@@ -782,13 +1268,13 @@ class Client:
 
     # Instructions
 
-    async def deposit(self, amount: float, subaccount_index: int = 0, priority_fee: int = 0):
+    async def deposit(self, amount: float, subaccount_index: Optional[int] = None, priority_fee: int = 0):
         """
         This method is used to deposit a specified amount into the user's margin account.
 
         Args:
             amount (float): The amount to be deposited.
-            subaccount_index (int, optional): The index of the subaccount. Defaults to 0.
+            subaccount_index (int, optional): The index of the subaccount. Defaults to the client's subaccount.
             priority_fee (int): Additional priority fee, in microlamports per CU. Defaults to 0.
 
         Raises:
@@ -839,12 +1325,12 @@ class Client:
             self.exchange.program_id,
         )
 
-    def _init_margin_account_ix(self, subaccount_index: int = 0) -> Instruction:
+    def _init_margin_account_ix(self, subaccount_index: Optional[int] = None) -> Instruction:
         """
         Initialize the margin account instruction.
 
         Args:
-            subaccount_index (int, optional): The index of the subaccount. Defaults to 0.
+            subaccount_index (int, optional): The index of the subaccount. Defaults to the client's subaccount.
 
         Raises:
             Exception: If the margin account address is not loaded.
@@ -855,7 +1341,7 @@ class Client:
         if self._margin_account_address is None or self._margin_account_manager_address is None:
             raise Exception("Margin account address not loaded, cannot deposit")
         return initialize_cross_margin_account(
-            {"subaccount_index": subaccount_index},
+            {"subaccount_index": self.subaccount_index if subaccount_index is None else subaccount_index},
             {
                 "cross_margin_account": self._margin_account_address,
                 "cross_margin_account_manager": self._margin_account_manager_address,
@@ -1027,33 +1513,49 @@ class Client:
             else None
         )
 
-        if asset not in self.exchange.assets:
+        if asset not in self.exchange.markets:
             raise Exception(f"Asset {asset.name} not loaded into client, cannot place order")
         if self._margin_account_address is None:
             raise Exception("Margin account address not loaded, cannot place order")
         if self._open_orders_addresses is None:
             raise Exception("Open orders addresses not loaded, cannot place order")
 
+        fixed_price = utils.convert_decimal_to_fixed_int(price, utils.get_fixed_tick_size(self.exchange.state, asset))
+        fixed_size = utils.convert_decimal_to_fixed_lot(size, utils.get_fixed_min_lot_size(self.exchange.state, asset))
+        data = instruction_data.place_perp_order_v5_data(
+            fixed_price,
+            fixed_size,
+            side,
+            order_opts.order_type,
+            asset,
+            order_opts.client_order_id,
+            order_opts.tag,
+            tif_offset,
+            order_opts.self_trade_behavior,
+        )
+        accounts = self._account_template(
+            "place_perp_order_v5", asset, side, lambda: self._place_order_template(asset, side)
+        )
+        return Instruction(self.exchange.program_id, data, accounts)
+
+    def _place_order_template(self, asset: Asset, side: Side) -> Instruction:
+        """
+        Build a PlacePerpOrderV5 instruction with empty arguments, used as the account template for the asset and
+        side.
+        """
+        assert self._margin_account_address is not None and self._open_orders_addresses is not None
         return place_perp_order_v5(
             {
-                "price": utils.convert_decimal_to_fixed_int(
-                    price, utils.get_fixed_tick_size(self.exchange.state, asset)
-                ),
-                "size": utils.convert_decimal_to_fixed_lot(
-                    size, utils.get_fixed_min_lot_size(self.exchange.state, asset)
-                ),
+                "price": 0,
+                "size": 0,
                 "side": side.to_program_type(),
-                "order_type": order_opts.order_type.to_program_type(),
+                "order_type": OrderType.Limit.to_program_type(),
                 "reduce_only": False,
-                "client_order_id": order_opts.client_order_id,
-                "tif_offset": tif_offset,
-                "tag": order_opts.tag,
+                "client_order_id": None,
+                "tif_offset": None,
+                "tag": None,
                 "asset": asset.to_program_type(),
-                "self_trade_behavior": (
-                    order_opts.self_trade_behavior.to_program_type()
-                    if order_opts.self_trade_behavior is not None
-                    else None
-                ),
+                "self_trade_behavior": None,
             },
             {
                 "authority": self.provider.wallet.public_key,
@@ -1120,57 +1622,53 @@ class Client:
         Returns:
             Instruction: The place order instruction.
         """
-        if asset not in self.exchange.assets:
+        if asset not in self.exchange.markets:
             raise Exception(f"Asset {asset.name} not loaded into client, cannot place order")
         if self._margin_account_address is None:
             raise Exception("Margin account address not loaded, cannot place order")
         if self._open_orders_addresses is None:
             raise Exception("Open orders addresses not loaded, cannot place order")
 
-        bid_orders_program = []
-        ask_orders_program = []
-
         unix_timestamp = int(time.time())
-        for o in bid_orders:
-            tif_offset = (
-                utils.get_tif_offset(
-                    o.expiry_ts,
-                    self.exchange.markets[asset]._market_state.epoch_length,
-                    unix_timestamp,  # self.exchange.clock.account.unix_timestamp,
-                    tif_buffer,
-                )
-                if o.expiry_ts
-                else None
-            )
-
-            p = utils.convert_decimal_to_fixed_int(o.price, utils.get_fixed_tick_size(self.exchange.state, asset))
-            s = utils.convert_decimal_to_fixed_lot(o.size, utils.get_fixed_min_lot_size(self.exchange.state, asset))
-            program_order = ProgramOrderArgs(p, s, o.client_order_id, tif_offset)
-            bid_orders_program.append(program_order)
+        epoch_length = self.exchange.markets[asset]._market_state.epoch_length
+        tick_size = utils.get_fixed_tick_size(self.exchange.state, asset)
+        min_lot_size = utils.get_fixed_min_lot_size(self.exchange.state, asset)
 
-        for o in ask_orders:
+        def to_program_order(o: MultiOrderArgs) -> Tuple[int, int, Optional[int], Optional[int]]:
             tif_offset = (
                 utils.get_tif_offset(
                     o.expiry_ts,
-                    self.exchange.markets[asset]._market_state.epoch_length,
+                    epoch_length,
                     unix_timestamp,  # self.exchange.clock.account.unix_timestamp,
                     tif_buffer,
                 )
                 if o.expiry_ts
                 else None
             )
+            p = utils.convert_decimal_to_fixed_int(o.price, tick_size)
+            s = utils.convert_decimal_to_fixed_lot(o.size, min_lot_size)
+            return p, s, o.client_order_id, tif_offset
+
+        data = instruction_data.place_multi_orders_data(
+            asset,
+            [to_program_order(o) for o in bid_orders],
+            [to_program_order(o) for o in ask_orders],
+            order_type,
+        )
+        accounts = self._account_template(
+            "place_multi_orders", asset, None, lambda: self._place_multi_orders_template(asset)
+        )
+        return Instruction(self.exchange.program_id, data, accounts)
 
-            p = utils.convert_decimal_to_fixed_int(o.price, utils.get_fixed_tick_size(self.exchange.state, asset))
-            s = utils.convert_decimal_to_fixed_lot(o.size, utils.get_fixed_min_lot_size(self.exchange.state, asset))
-            program_order = ProgramOrderArgs(p, s, o.client_order_id, tif_offset)
-            ask_orders_program.append(program_order)
-
+    def _place_multi_orders_template(self, asset: Asset) -> Instruction:
+        """Build a PlaceMultiOrders instruction with empty arguments, used as the account template for the asset."""
+        assert self._margin_account_address is not None and self._open_orders_addresses is not None
         return place_multi_orders(
             {
                 "asset": asset.to_program_type(),
-                "bid_orders": bid_orders_program,
-                "ask_orders": ask_orders_program,
-                "order_type": order_type.to_program_type(),
+                "bid_orders": [],
+                "ask_orders": [],
+                "order_type": OrderType.Limit.to_program_type(),
             },
             {
                 "authority": self.provider.wallet.public_key,
@@ -1238,8 +1736,19 @@ class Client:
             raise Exception("Margin account address not loaded, cannot cancel order")
         if self._open_orders_addresses is None:
             raise Exception("Open orders addresses not loaded, cannot cancel order")
+        data = instruction_data.cancel_order_data(side, order_id, asset)
+        accounts = self._account_template("cancel", asset, None, lambda: self._cancel_template(asset))
+        return Instruction(self.exchange.program_id, data, accounts)
+
+    def _cancel_template(self, asset: Asset) -> Instruction:
+        """
+        Build a CancelOrder instruction with empty arguments, used as the account template for the asset.
+
+        CancelOrder, CancelOrderByClientOrderId and CancelAllMarketOrders share the same accounts.
+        """
+        assert self._margin_account_address is not None and self._open_orders_addresses is not None
         return cancel_order(
-            {"side": side.to_program_type(), "order_id": order_id, "asset": asset.to_program_type()},
+            {"side": Side.Bid.to_program_type(), "order_id": 0, "asset": asset.to_program_type()},
             {
                 "authority": self.provider.wallet.public_key,
                 "cancel_accounts": {
@@ -1262,24 +1771,9 @@ class Client:
             raise Exception("Margin account address not loaded, cannot cancel order")
         if self._open_orders_addresses is None:
             raise Exception("Open orders addresses not loaded, cannot cancel order")
-        return cancel_order_by_client_order_id(
-            {"client_order_id": client_order_id, "asset": asset.to_program_type()},
-            {
-                "authority": self.provider.wallet.public_key,
-                "cancel_accounts": {
-                    "state": self.exchange._state_address,
-                    "margin_account": self._margin_account_address,
-                    "dex_program": constants.MATCHING_ENGINE_PID[self.network],
-                    "serum_authority": self.exchange._serum_authority_address,
-                    "open_orders": self._open_orders_addresses[asset],
-                    "market": self.exchange.markets[asset].address,
-                    "bids": self.exchange.markets[asset]._market_state.bids,
-                    "asks": self.exchange.markets[asset]._market_state.asks,
-                    "event_queue": self.exchange.markets[asset]._market_state.event_queue,
-                },
-            },
-            self.exchange.program_id,
-        )
+        data = instruction_data.cancel_order_by_client_order_id_data(client_order_id, asset)
+        accounts = self._account_template("cancel", asset, None, lambda: self._cancel_template(asset))
+        return Instruction(self.exchange.program_id, data, accounts)
 
     async def cancel_order_by_client_order_id(self, asset: Asset, client_order_id: int, priority_fee: int = 0):
         ixs = []
@@ -1306,24 +1800,46 @@ class Client:
             raise Exception("Margin account address not loaded, cannot cancel orders")
         if self._open_orders_addresses is None:
             raise Exception("Open orders addresses not loaded, cannot cancel orders")
-        return cancel_all_market_orders(
-            {"asset": asset.to_program_type()},
-            {
-                "authority": self.provider.wallet.public_key,
-                "cancel_accounts": {
-                    "state": self.exchange._state_address,
-                    "margin_account": self._margin_account_address,
-                    "dex_program": constants.MATCHING_ENGINE_PID[self.network],
-                    "serum_authority": self.exchange._serum_authority_address,
-                    "open_orders": self._open_orders_addresses[asset],
-                    "market": self.exchange.markets[asset].address,
-                    "bids": self.exchange.markets[asset]._market_state.bids,
-                    "asks": self.exchange.markets[asset]._market_state.asks,
-                    "event_queue": self.exchange.markets[asset]._market_state.event_queue,
-                },
-            },
-            self.exchange.program_id,
-        )
+        data = instruction_data.cancel_all_market_orders_data(asset)
+        accounts = self._account_template("cancel", asset, None, lambda: self._cancel_template(asset))
+        return Instruction(self.exchange.program_id, data, accounts)
+
+    def _account_template(
+        self, name: str, asset: Asset, side: Optional[Side], build_template: Callable[[], Instruction]
+    ) -> List[AccountMeta]:
+        """
+        Get the cached account list of an instruction.
+
+        The account list of each (instruction, asset, side) is built once through the codegen builders and reused
+        until the market state or pricing account it was derived from is replaced, e.g. by Exchange.refresh.
+
+        Args:
+            name (str): The name of the template.
+            asset (Asset): The asset of the market.
+            side (Side, optional): The side, for instructions whose accounts depend on it.
+            build_template (Callable[[], Instruction]): Builds an instruction with the right accounts on a miss.
+
+        Returns:
+            List[AccountMeta]: The accounts of the instruction.
+        """
+        market_state = self.exchange.markets[asset]._market_state
+        pricing = self.exchange.pricing
+        key = (name, asset, side)
+        template = self._account_templates.get(key)
+        if template is None or template[0] is not market_state or template[1] is not pricing:
+            template = (market_state, pricing, build_template().accounts)
+            self._account_templates[key] = template
+        return template[2]
+
+    def _warm_account_templates(self) -> None:
+        """Build the account templates of the order placement and cancel instructions for every loaded asset."""
+        for asset in self.exchange.assets:
+            for side in (Side.Bid, Side.Ask):
+                self._account_template(
+                    "place_perp_order_v5", asset, side, lambda: self._place_order_template(asset, side)
+                )
+            self._account_template("place_multi_orders", asset, None, lambda: self._place_multi_orders_template(asset))
+            self._account_template("cancel", asset, None, lambda: self._cancel_template(asset))
 
     async def cancel_orders_for_market(
         self,
@@ -1383,6 +1899,22 @@ class Client:
         Returns:
             Transaction: The transaction of the placed orders.
         """
+        ixs = await self._place_orders_for_market_ixs(
+            asset, orders, pre_instructions, post_instructions, tif_buffer, priority_fee
+        )
+        self._logger.info(f"Placing {len(orders)} orders for {asset}")
+        return await self._send_versioned_transaction(ixs)
+
+    async def _place_orders_for_market_ixs(
+        self,
+        asset: Asset,
+        orders: list[OrderArgs],
+        pre_instructions: Optional[list[Instruction]],
+        post_instructions: Optional[list[Instruction]],
+        tif_buffer: int,
+        priority_fee: int,
+    ) -> list[Instruction]:
+        """Build the instructions of :func:`place_orders_for_market`."""
         # TODO: warn about log truncation above 10 orders
         ixs = []
         if not await self._check_open_orders_account_exists(asset):
@@ -1398,8 +1930,7 @@ class Client:
             ixs.append(self._place_order_ix(asset, order.price, order.size, order.side, order.order_opts, tif_buffer))
         if post_instructions is not None:
             ixs.extend(post_instructions)
-        self._logger.info(f"Placing {len(orders)} orders for {asset}")
-        return await self._send_versioned_transaction(ixs)
+        return ixs
 
     async def place_multi_orders_for_market(
         self,
@@ -1466,6 +1997,29 @@ class Client:
         pre_ixs.extend([self._cancel_orders_for_market_ix(asset)])
         return await self.place_orders_for_market(asset, orders, pre_instructions=pre_ixs)
 
+    async def prepare_replace_orders_for_market(
+        self, asset: Asset, orders: list[OrderArgs], priority_fee: int = 0
+    ) -> PreparedTransaction:
+        """
+        Build and sign a transaction that replaces the orders for a market, without sending it.
+
+        Send it with :func:`send_prepared_transaction` so the critical path does no building, compiling or signing.
+
+        Args:
+            asset (Asset): The asset for which to replace the orders.
+            orders (list[OrderArgs]): The list of new orders to place.
+            priority_fee (int): Additional priority fee, in microlamports per CU. Defaults to 0.
+
+        Returns:
+            PreparedTransaction: The signed transaction of the replaced orders.
+        """
+        pre_ixs = []
+        if priority_fee > 0:
+            pre_ixs.append(set_compute_unit_price(priority_fee))
+        pre_ixs.append(self._cancel_orders_for_market_ix(asset))
+        ixs = await self._place_orders_for_market_ixs(asset, orders, pre_ixs, None, 0, 0)
+        return await self.prepare_transaction(ixs)
+
     # TODO: liquidate
     async def liquidate(self):
         """
@@ -1477,6 +2031,17 @@ class Client:
         raise NotImplementedError
 
     async def send_jito_tx(self, tx: VersionedTransaction, blockhash):
+        # Imported here since grpc and the generated protobufs add noticeably to import time and Jito is opt-in
+        from jito_searcher_client import get_async_searcher_client  # type: ignore
+        from jito_searcher_client.generated.bundle_pb2 import Bundle  # type: ignore
+        from jito_searcher_client.generated.packet_pb2 import (  # type: ignore
+            Meta,
+            Packet,
+        )
+        from jito_searcher_client.generated.searcher_pb2 import (  # type: ignore
+            SendBundleRequest,
+        )
+
         client = await get_async_searcher_client("mainnet.block-engine.jito.wtf", self.provider.wallet.payer)
 
         # The tx to Jito and to RPC needs to be the same exact tx, so we simply add a 2nd tx for the Jito tip to the bundle
@@ -1519,49 +2084,144 @@ class Client:
         except Exception as e:
             print(f"Jito error: {e}")
 
-    async def _send_versioned_transaction(self, ixs: list[Instruction]):
-        """
-        Send a versioned transaction.
+    async def _rpc(self, fn: Callable[[AsyncClient], Awaitable[T]]) -> T:
+        """Make an RPC read on the currently best endpoint if there are several, failing over to the others."""
+        if self.endpoint_pool is None:
+            return await fn(self.connection)
+        return await self.endpoint_pool.call(fn)
 
-        Args:
-            ixs (list[Instruction]): The list of instructions to include in the transaction.
+    async def _get_latest_blockhash(self) -> GetLatestBlockhashResp:
+        """Fetch the latest blockhash, from the currently best endpoint if there are several."""
+        return await self._rpc(lambda connection: connection.get_latest_blockhash(self.connection.commitment))
+
+    async def _get_recent_blockhash(self) -> Tuple[Hash, Optional[int]]:
+        """
+        Get a recent blockhash, using the cache if available.
 
         Returns:
-            str: The signature(s) of the transaction(s).
+            Tuple[Hash, Optional[int]]: The blockhash and its last valid block height, if known.
         """
-        # Prefetch blockhash, using cache if available
         if self.blockhash_cache:
             try:
-                recent_blockhash = self.blockhash_cache.get()
-                last_valid_block_height = None
+                recent_blockhash, last_valid_block_height = self.blockhash_cache.get_with_last_valid_block_height()
                 self._logger.debug(f"Blockhash cache hit, using cached blockhash: {recent_blockhash}")
+                return recent_blockhash, last_valid_block_height
             except ValueError:
-                blockhash_resp = await self.connection.get_latest_blockhash(self.connection.commitment)
+                blockhash_resp = await self._get_latest_blockhash()
                 recent_blockhash = self.connection.parse_recent_blockhash(blockhash_resp)
                 last_valid_block_height = blockhash_resp.value.last_valid_block_height
+                self.blockhash_cache.set(
+                    recent_blockhash, blockhash_resp.context.slot, last_valid_block_height=last_valid_block_height
+                )
                 self._logger.debug(f"Blockhash cache miss, fetched from RPC: {recent_blockhash}")
         else:
-            blockhash_resp = await self.connection.get_latest_blockhash(self.connection.commitment)
+            blockhash_resp = await self._get_latest_blockhash()
             recent_blockhash = self.connection.parse_recent_blockhash(blockhash_resp)
             last_valid_block_height = blockhash_resp.value.last_valid_block_height
             self._logger.debug(f"Blockhash cache not enabled, fetched from RPC: {recent_blockhash}")
+        return recent_blockhash, last_valid_block_height
 
-        msg = MessageV0.try_compile(
-            self.provider.wallet.public_key, ixs, constants.ZETA_LUT[self.network], recent_blockhash
+    def _compile_message(self, ixs: list[Instruction], recent_blockhash: Hash) -> MessageV0:
+        """
+        Compile a message against the Zeta lookup table, reusing the compiled layout of earlier messages.
+
+        Compiling deduplicates the account keys and resolves them against the lookup table, which only depends on the
+        program and accounts of each instruction. That layout is compiled once per instruction shape, and messages of
+        the same shape only patch in their instruction data and blockhash.
+
+        Args:
+            ixs (list[Instruction]): The instructions of the message.
+            recent_blockhash (Hash): The blockhash of the message.
+
+        Returns:
+            MessageV0: The compiled message.
+        """
+        key = tuple((ix.program_id, tuple(ix.accounts)) for ix in ixs)
+        template = self._message_templates.get(key)
+        if template is None:
+            msg = MessageV0.try_compile(
+                self.provider.wallet.public_key, ixs, constants.ZETA_LUT[self.network], recent_blockhash
+            )
+            if len(self._message_templates) >= constants.MAX_MESSAGE_TEMPLATES:
+                self._message_templates.clear()
+            self._message_templates[key] = (
+                msg.header,
+                msg.account_keys,
+                msg.address_table_lookups,
+                [(ix.program_id_index, ix.accounts) for ix in msg.instructions],
+            )
+            return msg
+        header, account_keys, address_table_lookups, compiled_ixs = template
+        return MessageV0(
+            header,
+            account_keys,
+            recent_blockhash,
+            [
+                CompiledInstruction(program_id_index, ix.data, accounts)
+                for ix, (program_id_index, accounts) in zip(ixs, compiled_ixs)
+            ],
+            address_table_lookups,
         )
-        tx = VersionedTransaction(msg, [self.provider.wallet.payer])
 
+    async def prepare_transaction(self, ixs: list[Instruction]) -> PreparedTransaction:
+        """
+        Compile, sign and serialize a transaction ahead of sending it with :func:`send_prepared_transaction`.
+
+        The transaction uses a blockhash from the blockhash cache if enabled, so it can be sent until that blockhash
+        expires, e.g. to have the next requote ready before it is needed.
+
+        Args:
+            ixs (list[Instruction]): The list of instructions to include in the transaction.
+
+        Returns:
+            PreparedTransaction: The signed transaction.
+        """
+        recent_blockhash, last_valid_block_height = await self._get_recent_blockhash()
+        tx = VersionedTransaction(self._compile_message(ixs, recent_blockhash), [self.provider.wallet.payer])
+        return PreparedTransaction(tx, bytes(tx), recent_blockhash, last_valid_block_height)
+
+    @staticmethod
+    async def _send_raw_transaction(connection: AsyncClient, raw: bytes, opts: TxOpts) -> Signature:
+        resp = await connection.send_raw_transaction(raw, opts=opts)
+        return resp.value
+
+    async def send_prepared_transaction(self, prepared: PreparedTransaction):
+        """
+        Send a transaction prepared by :func:`prepare_transaction`.
+
+        With a :attr:`confirmation_tracker`, this returns once the transaction is submitted and the tracker confirms it
+        in the background, see :func:`confirmation`.
+
+        Args:
+            prepared (PreparedTransaction): The signed transaction.
+
+        Returns:
+            str: The signature(s) of the transaction(s).
+        """
         try:
-            opts = self.provider.opts._replace(last_valid_block_height=last_valid_block_height)
+            opts = self.provider.opts._replace(last_valid_block_height=prepared.last_valid_block_height)
+            if self.confirmation_tracker is not None:
+                opts = opts._replace(skip_confirmation=True)
             if len(self.double_down_providers) > 0:
-                tasks = []
-                if self.double_down_jito:
-                    tasks.append(self.send_jito_tx(tx, recent_blockhash))
-                for provider in self.double_down_providers:
-                    tasks.append(provider.send(tx, opts))
-                signature = await asyncio.gather(*tasks)
+                pool = self.endpoint_pool
+                connections = [provider.connection for provider in self.double_down_providers]
+
+                def send(connection: AsyncClient) -> Awaitable[Signature]:
+                    return self._send_raw_transaction(connection, prepared.raw, opts)
+
+                if self.race_double_downs and pool is not None:
+                    if self.double_down_jito:
+                        pool.detach(self.send_jito_tx(prepared.transaction, prepared.blockhash))
+                    signature = [await pool.race(send, connections)]
+                else:
+                    tasks: list[Awaitable[Any]] = []
+                    if self.double_down_jito:
+                        tasks.append(self.send_jito_tx(prepared.transaction, prepared.blockhash))
+                    for connection in connections:
+                        tasks.append(send(connection) if pool is None else pool.measure(connection, send))
+                    signature = await asyncio.gather(*tasks)
             else:
-                signature = [await self.provider.send(tx, opts)]
+                signature = [await self._send_raw_transaction(self.provider.connection, prepared.raw, opts)]
         except RPCException as exc:
             # This won't work on zDEX errors
             # TODO: add ZDEX error parsing
@@ -1570,4 +2230,169 @@ class Client:
             if parsed is not None:
                 raise parsed from exc
             raise exc
+        if self.confirmation_tracker is not None:
+            self.confirmation_tracker.track(prepared.transaction.signatures[0], prepared.last_valid_block_height)
         return signature
+
+    async def send_with_rebroadcast(
+        self, prepared: PreparedTransaction, interval: float = 0.5, commitment: Optional[Commitment] = None
+    ) -> TransactionConfirmation:
+        """
+        Send a transaction prepared by :func:`prepare_transaction` to the primary and double-down endpoints, and keep
+        resending the same signed transaction until it lands or its blockhash expires.
+
+        The first submission is preflighted as per the tx options, and raises like any other send if every endpoint
+        rejects it, e.g. because the transaction fails simulation. Resends skip preflight, and their errors are only
+        counted. Every interval each endpoint is asked for the transaction status, and
+        resending stops as soon as any of them reports it at the commitment level. Land rate and time to land per
+        endpoint are recorded in :attr:`rebroadcast_stats`, crediting each landing to the endpoint that reported it
+        first.
+
+        Args:
+            prepared (PreparedTransaction): The signed transaction.
+            interval (float, optional): Seconds between resends. Defaults to 0.5.
+            commitment (Commitment, optional): The commitment level the transaction must reach. Defaults to the
+                commitment of the connection.
+
+        Returns:
+            TransactionConfirmation: The landed slot and error of the transaction, or that it expired.
+        """
+        if commitment is None:
+            commitment = self.connection.commitment
+        signature = prepared.transaction.signatures[0]
+        providers = [self.provider, *self.double_down_providers]
+        stats = [self._endpoint_stats(provider) for provider in providers]
+        for endpoint_stats in stats:
+            endpoint_stats.transactions += 1
+        first_sent: list[Optional[float]] = [None] * len(providers)
+
+        last_valid_block_height = prepared.last_valid_block_height
+        if last_valid_block_height is None:
+            # Upper bound, as the blockhash is at most as recent as the current block
+            block_height = (await self._rpc(lambda connection: connection.get_block_height(commitment))).value
+            last_valid_block_height = block_height + constants.MAX_PROCESSING_AGE
+        opts = self.provider.opts._replace(
+            skip_confirmation=True, max_retries=0, last_valid_block_height=last_valid_block_height
+        )
+
+        await self._broadcast(providers, stats, first_sent, prepared.raw, opts, raise_if_rejected=True)
+        opts = opts._replace(skip_preflight=True)
+        while True:
+            await asyncio.sleep(interval)
+            # Read the block height before the statuses, so a transaction that lands in between is not reported expired
+            block_height = (await self._rpc(lambda connection: connection.get_block_height(commitment))).value
+            confirmed = await self._first_confirmation(providers, signature, commitment)
+            if confirmed is not None:
+                index, status = confirmed
+                stats[index].first_to_confirm += 1
+                # Every endpoint was sent the same signed bytes, so the landing is credited to the one that saw it
+                # land first, as long as it had accepted a submission
+                sent_at = first_sent[index]
+                if sent_at is not None:
+                    stats[index].landed += 1
+                    stats[index].total_time_to_land += time.monotonic() - sent_at
+                return TransactionConfirmation(signature, status.slot, status.err)
+            if block_height > last_valid_block_height:
+                self._logger.info(f"Blockhash expired before transaction {signature} landed")
+                return TransactionConfirmation(signature, None, expired=True)
+            await self._broadcast(providers, stats, first_sent, prepared.raw, opts)
+
+    def _endpoint_stats(self, provider: Provider) -> EndpointStats:
+        endpoint = provider.connection._provider.endpoint_uri
+        if endpoint not in self.rebroadcast_stats:
+            self.rebroadcast_stats[endpoint] = EndpointStats(endpoint)
+        return self.rebroadcast_stats[endpoint]
+
+    async def _broadcast(
+        self,
+        providers: list[Provider],
+        stats: list[EndpointStats],
+        first_sent: list[Optional[float]],
+        raw: bytes,
+        opts: TxOpts,
+        raise_if_rejected: bool = False,
+    ) -> None:
+        """Submit a raw transaction to every provider, recording the submissions and the time of the first accepted
+        one. With raise_if_rejected, raises the first error if no provider accepted the transaction."""
+        sent_at = time.monotonic()
+        results = await asyncio.gather(
+            *[self._send_raw_transaction(provider.connection, raw, opts) for provider in providers],
+            return_exceptions=True,
+        )
+        for i, result in enumerate(results):
+            stats[i].sends += 1
+            if isinstance(result, BaseException):
+                stats[i].send_errors += 1
+                self._logger.debug(f"Error sending to {stats[i].endpoint}: {result}")
+            elif first_sent[i] is None:
+                first_sent[i] = sent_at
+        # A single lagging endpoint failing preflight doesn't stop the others landing the transaction
+        if not raise_if_rejected or not all(isinstance(result, BaseException) for result in results):
+            return
+        for result in results:
+            if isinstance(result, RPCException):
+                parsed = from_tx_error(result)
+                self._logger.error(parsed)
+                if parsed is not None:
+                    raise parsed from result
+                raise result
+        raise cast(BaseException, results[0])
+
+    @staticmethod
+    async def _first_confirmation(
+        providers: list[Provider], signature: Signature, commitment: Commitment
+    ) -> Optional[Tuple[int, TransactionStatus]]:
+        """Ask every provider for the status of a transaction, returning the first to report it committed."""
+
+        async def get_status(index: int, provider: Provider) -> Tuple[int, Optional[TransactionStatus]]:
+            try:
+                resp = await provider.connection.get_signature_statuses([signature])
+            except Exception:
+                return index, None
+            return index, resp.value[0]
+
+        tasks = [asyncio.create_task(get_status(i, provider)) for i, provider in enumerate(providers)]
+        try:
+            for task in asyncio.as_completed(tasks):
+                index, status = await task
+                if status is not None and is_committed(status, commitment):
+                    return index, status
+        finally:
+            for task in tasks:
+                task.cancel()
+        return None
+
+    def confirmation(self, signature: Signature) -> asyncio.Future:
+        """
+        Get the confirmation of a transaction sent by this client.
+
+        Args:
+            signature (Signature): The transaction signature.
+
+        Raises:
+            Exception: If the client does not confirm transactions in the background, or the transaction is not in
+                flight and not among the recently resolved ones.
+
+        Returns:
+            asyncio.Future: Resolves to the :class:`~zetamarkets_py.confirmations.TransactionConfirmation` of the
+                transaction.
+        """
+        if self.confirmation_tracker is None:
+            raise Exception("Client does not confirm in the background, cannot track confirmation")
+        future = self.confirmation_tracker.get(signature)
+        if future is None:
+            raise Exception(f"Transaction {signature} is not tracked, cannot get confirmation")
+        return future
+
+    async def _send_versioned_transaction(self, ixs: list[Instruction]):
+        """
+        Send a versioned transaction.
+
+        Args:
+            ixs (list[Instruction]): The list of instructions to include in the transaction.
+
+        Returns:
+            str: The signature(s) of the transaction(s).
+        """
+        prepared = await self.prepare_transaction(ixs)
+        return await self.send_prepared_transaction(prepared)
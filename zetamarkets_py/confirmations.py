@@ -0,0 +1,272 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.commitment import Commitment, Confirmed, Finalized, Processed
+from solders.signature import Signature
+from solders.transaction_status import (
+    TransactionConfirmationStatus,
+    TransactionErrorType,
+    TransactionStatus,
+)
+
+from zetamarkets_py import utils
+
+# getSignatureStatuses accepts at most this many signatures per call
+MAX_SIGNATURES_PER_STATUS_REQUEST = 256
+
+# Number of resolved transactions whose outcome a tracker remembers, so they can still be looked up after resolving
+MAX_RECENT_CONFIRMATIONS = 4096
+
+# Same order as the integer values of TransactionConfirmationStatus
+_COMMITMENT_RANKS = {
+    Processed: int(TransactionConfirmationStatus.Processed),
+    Confirmed: int(TransactionConfirmationStatus.Confirmed),
+    Finalized: int(TransactionConfirmationStatus.Finalized),
+}
+
+
+def is_committed(status: TransactionStatus, commitment: Commitment) -> bool:
+    """Whether a transaction status has reached a commitment level.
+
+    Args:
+        status (TransactionStatus): The status from ``getSignatureStatuses``.
+        commitment (Commitment): The commitment level.
+
+    Returns:
+        bool: True if the transaction is at least at the commitment level.
+    """
+    if status.confirmation_status is not None:
+        rank = int(status.confirmation_status)
+    else:
+        # Older nodes only report the number of confirmations, which is None once the slot is rooted
+        rank = _COMMITMENT_RANKS[Finalized] if status.confirmations is None else _COMMITMENT_RANKS[Confirmed]
+    return rank >= _COMMITMENT_RANKS[commitment]
+
+
+@dataclass
+class TransactionConfirmation:
+    """The outcome of a tracked transaction.
+
+    Attributes:
+        signature (Signature): The transaction signature.
+        slot (Optional[int]): The slot the transaction landed in, None if it expired.
+        err (Optional[TransactionErrorType]): The error of a landed transaction that failed, None if it succeeded.
+        expired (bool): Whether the blockhash expired before the transaction landed.
+    """
+
+    signature: Signature
+    slot: Optional[int]
+    err: Optional[TransactionErrorType] = None
+    expired: bool = False
+
+    @property
+    def is_success(self) -> bool:
+        """Whether the transaction landed without error."""
+        return not self.expired and self.err is None
+
+
+@dataclass
+class _Pending:
+    future: asyncio.Future
+    last_valid_block_height: Optional[int]
+
+
+class ConfirmationTracker:
+    """Confirms sent transactions in the background.
+
+    Every in-flight signature is checked in one batched ``getSignatureStatuses`` call per poll, so confirming hundreds
+    of transactions costs one coroutine and a few RPC calls a poll instead of one waiting coroutine per transaction.
+    Each tracked signature resolves a future with its :class:`TransactionConfirmation`, once it reaches the commitment
+    or its blockhash expires.
+
+    Example:
+        Send without waiting, then check on the transaction later::
+
+            tracker = ConfirmationTracker(connection)
+            future = tracker.track(signature, last_valid_block_height)
+            ...
+            confirmation = await future
+    """
+
+    def __init__(
+        self,
+        connection: AsyncClient,
+        commitment: Commitment = Confirmed,
+        poll_interval: float = 0.4,
+        on_confirmation: Optional[Callable[[TransactionConfirmation], None]] = None,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        """Initializes the tracker. Polling starts with the first tracked signature and stops when none are left.
+
+        Args:
+            connection (AsyncClient): The connection to poll.
+            commitment (Commitment, optional): The commitment a transaction must reach. Defaults to Confirmed.
+            poll_interval (float, optional): Seconds between polls. Defaults to 0.4.
+            on_confirmation (Callable[[TransactionConfirmation], None], optional): Called with the outcome of every
+                tracked transaction. Defaults to None.
+            logger (logging.Logger, optional): The logger for poll errors.
+        """
+        self.connection = connection
+        self.commitment = commitment
+        self.poll_interval = poll_interval
+        self.on_confirmation = on_confirmation
+        self._logger = logger if logger is not None else utils.create_logger(f"{__name__}.{type(self).__name__}")
+        self._pending: dict[Signature, _Pending] = {}
+        self._recent: OrderedDict[Signature, TransactionConfirmation] = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def track(self, signature: Signature, last_valid_block_height: Optional[int] = None) -> asyncio.Future:
+        """Start tracking a sent transaction.
+
+        Tracking a signature that is already in flight returns its existing future, and tracking one that recently
+        resolved returns a future that is already done.
+
+        Args:
+            signature (Signature): The transaction signature.
+            last_valid_block_height (int, optional): The last valid block height of the transaction blockhash. Without
+                it the transaction is tracked until it lands or :func:`untrack` is called. Defaults to None.
+
+        Returns:
+            asyncio.Future: Resolves to the :class:`TransactionConfirmation` of the transaction.
+        """
+        existing = self.get(signature)
+        if existing is not None:
+            return existing
+        pending = self._pending.get(signature)
+        if pending is None:
+            pending = _Pending(asyncio.get_running_loop().create_future(), last_valid_block_height)
+            self._pending[signature] = pending
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return pending.future
+
+    def get(self, signature: Signature) -> Optional[asyncio.Future]:
+        """Look up a transaction that is tracked or recently resolved, without starting to track it.
+
+        Args:
+            signature (Signature): The transaction signature.
+
+        Returns:
+            Optional[asyncio.Future]: Resolves to the :class:`TransactionConfirmation` of the transaction, None if the
+            signature is unknown or resolved longer ago than the last :data:`MAX_RECENT_CONFIRMATIONS` transactions.
+        """
+        pending = self._pending.get(signature)
+        if pending is not None:
+            return pending.future
+        confirmation = self._recent.get(signature)
+        if confirmation is None:
+            return None
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(confirmation)
+        return future
+
+    def untrack(self, signature: Signature) -> None:
+        """Stop tracking a transaction, cancelling its future.
+
+        Args:
+            signature (Signature): The transaction signature.
+        """
+        pending = self._pending.pop(signature, None)
+        if pending is not None:
+            pending.future.cancel()
+
+    async def close(self) -> None:
+        """Stop polling and cancel the futures of every tracked transaction."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for signature in list(self._pending):
+            self.untrack(signature)
+
+    async def _run(self) -> None:
+        while self._pending:
+            try:
+                await self.poll()
+            except Exception as e:
+                self._logger.warning(f"Error polling signature statuses: {e}")
+            if self._pending:
+                await asyncio.sleep(self.poll_interval)
+
+    async def poll(self) -> None:
+        """Check every tracked transaction once, resolving the ones that landed or expired."""
+        signatures = list(self._pending)
+        # Read the block height before the statuses, so a transaction that lands in between is not marked expired
+        block_height = None
+        if any(self._pending[signature].last_valid_block_height is not None for signature in signatures):
+            block_height = (await self.connection.get_block_height(self.commitment)).value
+        responses = await asyncio.gather(
+            *[
+                self.connection.get_signature_statuses(signatures[i : i + MAX_SIGNATURES_PER_STATUS_REQUEST])
+                for i in range(0, len(signatures), MAX_SIGNATURES_PER_STATUS_REQUEST)
+            ]
+        )
+        statuses = [status for response in responses for status in response.value]
+        for signature, status in zip(signatures, statuses):
+            pending = self._pending.get(signature)
+            if pending is None:
+                continue
+            if status is not None and is_committed(status, self.commitment):
+                self._resolve(signature, TransactionConfirmation(signature, status.slot, status.err))
+            elif (
+                status is None
+                and block_height is not None
+                and pending.last_valid_block_height is not None
+                and block_height > pending.last_valid_block_height
+            ):
+                self._resolve(signature, TransactionConfirmation(signature, None, expired=True))
+
+    def _resolve(self, signature: Signature, confirmation: TransactionConfirmation) -> None:
+        pending = self._pending.pop(signature)
+        self._recent[signature] = confirmation
+        if len(self._recent) > MAX_RECENT_CONFIRMATIONS:
+            self._recent.popitem(last=False)
+        if not pending.future.done():
+            pending.future.set_result(confirmation)
+        if self.on_confirmation is not None:
+            try:
+                self.on_confirmation(confirmation)
+            except Exception as e:
+                self._logger.error(f"Error in confirmation callback: {e}")
+
+
+@dataclass
+class EndpointStats:
+    """Rebroadcast metrics of one RPC endpoint.
+
+    Attributes:
+        endpoint (str): The RPC endpoint.
+        transactions (int): Transactions rebroadcast through the endpoint.
+        sends (int): Submissions to the endpoint, including resends.
+        send_errors (int): Submissions the endpoint rejected or failed.
+        landed (int): Landed transactions credited to the endpoint, i.e. it accepted at least one submission and was
+            first to report the transaction as confirmed.
+        first_to_confirm (int): Landed transactions the endpoint was first to report as confirmed, whether or not it
+            accepted a submission.
+        total_time_to_land (float): Seconds from the first accepted submission to the endpoint until landing, summed
+            over the transactions credited to it.
+    """
+
+    endpoint: str
+    transactions: int = 0
+    sends: int = 0
+    send_errors: int = 0
+    landed: int = 0
+    first_to_confirm: int = 0
+    total_time_to_land: float = 0.0
+
+    @property
+    def land_rate(self) -> Optional[float]:
+        """The share of transactions rebroadcast through the endpoint that were credited to it, None before any."""
+        return self.landed / self.transactions if self.transactions else None
+
+    @property
+    def mean_time_to_land(self) -> Optional[float]:
+        """The mean seconds from first accepted submission until landing, None before any landing was credited."""
+        return self.total_time_to_land / self.landed if self.landed else None
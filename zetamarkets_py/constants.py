@@ -141,6 +141,12 @@ BPS_DENOMINATOR = 10_000
 
 DEFAULT_MICRO_LAMPORTS_PER_CU_FEE = 1000
 
+# Number of blocks a blockhash stays valid for after the block that produced it
+MAX_PROCESSING_AGE = 150
+
+# Number of compiled transaction message layouts a client keeps before starting over
+MAX_MESSAGE_TEMPLATES = 256
+
 # DEX
 BASE_MINT_DECIMALS = 0
 QUOTE_MINT_DECIMALS = 6
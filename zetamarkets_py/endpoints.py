@@ -0,0 +1,217 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional, Sequence, TypeVar
+
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.core import RPCException
+from solders.rpc.errors import (
+    InternalErrorMessage,
+    InvalidParamsMessage,
+    InvalidRequestMessage,
+    MethodNotFoundMessage,
+    ParseErrorMessage,
+)
+
+T = TypeVar("T")
+
+# Floor on the success rate in the score, so an endpoint that only errored still ranks by its latency
+_MIN_SUCCESS_RATE = 0.05
+
+# Generic JSON-RPC errors that solana-py returns as the response instead of raising
+_RPC_ERROR_MESSAGES = (
+    InternalErrorMessage,
+    InvalidParamsMessage,
+    InvalidRequestMessage,
+    MethodNotFoundMessage,
+    ParseErrorMessage,
+)
+
+
+@dataclass
+class EndpointScore:
+    """Exponentially weighted latency and error rate of one RPC endpoint.
+
+    Attributes:
+        endpoint (str): The RPC endpoint.
+        latency (Optional[float]): The weighted latency of calls in seconds, None before the first call.
+        error_rate (float): The weighted share of calls that failed.
+        calls (int): The number of calls measured.
+    """
+
+    endpoint: str
+    latency: Optional[float] = None
+    error_rate: float = 0.0
+    calls: int = 0
+
+    @property
+    def score(self) -> float:
+        """The expected seconds per successful call, lower is better. Unmeasured endpoints score 0 so they get tried."""
+        if self.latency is None:
+            return 0.0
+        return self.latency / max(1 - self.error_rate, _MIN_SUCCESS_RATE)
+
+    def record(self, latency: float, ok: bool, alpha: float) -> None:
+        """Add a measured call to the averages.
+
+        Args:
+            latency (float): The call latency in seconds.
+            ok (bool): Whether the call succeeded.
+            alpha (float): The weight of the new call.
+        """
+        self.latency = latency if self.latency is None else alpha * latency + (1 - alpha) * self.latency
+        self.error_rate = alpha * (0.0 if ok else 1.0) + (1 - alpha) * self.error_rate
+        self.calls += 1
+
+
+class EndpointPool:
+    """A set of RPC connections ranked by their measured latency and error rate.
+
+    Calls made through the pool are timed and update the score of the connection that served them. :func:`call`
+    routes to the currently best connection and fails over to the next best, and :func:`race` runs on several
+    connections at once and returns the first success.
+
+    Example:
+        Race a transaction to every endpoint and read from the fastest one::
+
+            pool = EndpointPool([AsyncClient(endpoint) for endpoint in endpoints])
+            resp = await pool.race(lambda connection: connection.send_raw_transaction(raw, opts))
+            resp = await pool.call(lambda connection: connection.get_latest_blockhash())
+    """
+
+    def __init__(self, connections: Sequence[AsyncClient], alpha: float = 0.2) -> None:
+        """Initializes the pool with no measurements.
+
+        Args:
+            connections (Sequence[AsyncClient]): The connections, one per endpoint.
+            alpha (float, optional): The weight of each new measurement in the averages. Defaults to 0.2.
+
+        Raises:
+            Exception: If no connection is given.
+        """
+        if len(connections) == 0:
+            raise Exception("No connections, cannot create endpoint pool")
+        self.connections = list(connections)
+        self.alpha = alpha
+        self.scores = [EndpointScore(connection._provider.endpoint_uri) for connection in self.connections]
+        self._detached: set[asyncio.Future] = set()
+
+    def ranked(self) -> list[AsyncClient]:
+        """The connections, best score first."""
+        order = sorted(range(len(self.connections)), key=lambda i: self.scores[i].score)
+        return [self.connections[i] for i in order]
+
+    def best(self) -> AsyncClient:
+        """The connection with the best score."""
+        return min(zip(self.connections, self.scores), key=lambda item: item[1].score)[0]
+
+    async def measure(self, connection: AsyncClient, fn: Callable[[AsyncClient], Awaitable[T]]) -> T:
+        """Run a call on a given connection, updating its score.
+
+        Args:
+            connection (AsyncClient): One of the pool's connections.
+            fn (Callable[[AsyncClient], Awaitable[T]]): Makes the call on the connection.
+
+        Raises:
+            RPCException: If the endpoint answered with a JSON-RPC error.
+
+        Returns:
+            T: The result of the call.
+        """
+        score = self.scores[self.connections.index(connection)]
+        start = time.monotonic()
+        try:
+            result = await fn(connection)
+            if isinstance(result, _RPC_ERROR_MESSAGES):
+                raise RPCException(result)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            score.record(time.monotonic() - start, False, self.alpha)
+            raise
+        score.record(time.monotonic() - start, True, self.alpha)
+        return result
+
+    async def call(self, fn: Callable[[AsyncClient], Awaitable[T]]) -> T:
+        """Run a call on the best connection, failing over to the next best ones on errors.
+
+        Args:
+            fn (Callable[[AsyncClient], Awaitable[T]]): Makes the call on a connection.
+
+        Raises:
+            Exception: The error of the last connection, if the call failed on all of them.
+
+        Returns:
+            T: The result of the call.
+        """
+        connections = self.ranked()
+        for connection in connections[:-1]:
+            try:
+                return await self.measure(connection, fn)
+            except Exception:
+                continue
+        return await self.measure(connections[-1], fn)
+
+    async def race(
+        self,
+        fn: Callable[[AsyncClient], Awaitable[T]],
+        connections: Optional[Sequence[AsyncClient]] = None,
+        cancel_pending: bool = False,
+    ) -> T:
+        """Run a call on several connections at once and return the first success.
+
+        Args:
+            fn (Callable[[AsyncClient], Awaitable[T]]): Makes the call on a connection.
+            connections (Sequence[AsyncClient], optional): The connections to race, all of the pool's by default.
+            cancel_pending (bool, optional): Cancel the calls still running once one succeeds, e.g. for reads. By
+                default they are left to finish in the background, so every endpoint still receives a submission and
+                gets its latency measured. Defaults to False.
+
+        Raises:
+            Exception: The error of the first connection to fail, if the call failed on all of them.
+
+        Returns:
+            T: The result of the first successful call.
+        """
+        if connections is None:
+            connections = self.connections
+        tasks = [asyncio.create_task(self.measure(connection, fn)) for connection in connections]
+        first_error: Optional[BaseException] = None
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Among calls finishing together, prefer the connections in the given order
+                for task in sorted(done, key=tasks.index):
+                    error = task.exception()
+                    if error is None:
+                        return task.result()
+                    if first_error is None:
+                        first_error = error
+        finally:
+            for task in pending:
+                if cancel_pending:
+                    task.cancel()
+                else:
+                    self.detach(task)
+        raise first_error if first_error is not None else Exception("No connections to race")
+
+    def detach(self, aw: Awaitable) -> asyncio.Future:
+        """Leave an awaitable to finish in the background, keeping a reference to it until it does.
+
+        Args:
+            aw (Awaitable): The coroutine or task.
+
+        Returns:
+            asyncio.Future: The background task.
+        """
+        task = asyncio.ensure_future(aw)
+        self._detached.add(task)
+        task.add_done_callback(self._detach_done)
+        return task
+
+    def _detach_done(self, task: asyncio.Future) -> None:
+        self._detached.discard(task)
+        # Retrieve the outcome so failed background calls aren't reported as never retrieved
+        if not task.cancelled():
+            task.exception()
@@ -1,22 +1,58 @@
 from __future__ import annotations
 
+import asyncio
+import functools
 import logging
 import os
+import traceback
 from dataclasses import dataclass
+from typing import Optional, cast
 
-from anchorpy import EventParser, Idl, Program, Provider, Wallet
+from anchorpy import Coder, EventParser, Idl, Program, Provider, Wallet
+from anchorpy.utils.rpc import get_multiple_accounts
 from solana.rpc.async_api import AsyncClient
 from solders.pubkey import Pubkey
 
 from zetamarkets_py import constants, pda, utils
 from zetamarkets_py.market import Market
+from zetamarkets_py.serum_client.accounts.market_state import MarketState
+from zetamarkets_py.snapshot import ExchangeSnapshot
 from zetamarkets_py.types import Asset, Network
 from zetamarkets_py.zeta_client.accounts.pricing import Pricing
 from zetamarkets_py.zeta_client.accounts.state import State
 
 idl_path = os.path.join(os.path.dirname(__file__), "idl/zeta.json")
-with open(idl_path, "r") as f:
-    idl = Idl.from_json(f.read())
+
+
+@functools.cache
+def get_idl() -> Idl:
+    """
+    Parse the bundled Zeta IDL on first use and cache it for the lifetime of the process.
+
+    Returns:
+        Idl: The parsed IDL.
+    """
+    with open(idl_path, "r") as f:
+        return Idl.from_json(f.read())
+
+
+@functools.cache
+def get_coder() -> Coder:
+    """
+    Build the anchorpy instruction, account and event coder on first use and cache it for the lifetime of the
+    process. Building the layouts is the expensive part of loading the IDL, so every Exchange shares one coder.
+
+    Returns:
+        Coder: The Zeta program coder.
+    """
+    return Coder(get_idl())
+
+
+def __getattr__(name: str):
+    # Backwards compatible ``exchange.idl`` without parsing the IDL at import time
+    if name == "idl":
+        return get_idl()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 @dataclass
@@ -36,8 +72,6 @@ class Exchange:
     """The connection to the Solana network."""
     program_id: Pubkey
     """The public key of the Zeta program."""
-    program: Program
-    """The Zeta program."""
     state: State
     """The state account of the Zeta program."""
     pricing: Pricing
@@ -45,8 +79,6 @@ class Exchange:
     markets: dict[Asset, Market]
     """A dictionary mapping assets to their respective markets."""
 
-    _event_parser: EventParser
-
     _state_address: Pubkey
     _pricing_address: Pubkey
     _serum_authority_address: Pubkey
@@ -54,6 +86,9 @@ class Exchange:
 
     _logger: logging.Logger
 
+    _snapshot: Optional[ExchangeSnapshot] = None
+    _refresh_task: Optional[asyncio.Task] = None
+
     @classmethod
     async def load(
         cls,
@@ -61,6 +96,7 @@ class Exchange:
         connection: AsyncClient,
         assets: list[Asset] = Asset.all(),
         log_level: int = logging.CRITICAL,
+        snapshot_path: Optional[str] = None,
     ) -> "Exchange":
         """
         Asynchronously load the Zeta Exchange.
@@ -70,6 +106,9 @@ class Exchange:
             connection (AsyncClient): The connection to the Solana network.
             assets (list[Asset], optional): The list of assets to load. Defaults to all assets.
             log_level (int, optional): The logging level. Defaults to logging.CRITICAL.
+            snapshot_path (str, optional): A file to cache exchange metadata in between runs. When it holds every
+                requested asset the exchange loads with a single RPC call for Pricing and the rest is refreshed in
+                the background. Defaults to None.
 
         Returns:
             Exchange: The loaded Zeta Exchange.
@@ -78,49 +117,192 @@ class Exchange:
             Exception: If the state or pricing is not found at their respective addresses.
         """
         program_id = constants.ZETA_PID[network]
-        provider = Provider(connection, Wallet.dummy())
-        program = Program(idl, program_id, provider)
-        _event_parser = EventParser(program_id, program.coder)
 
-        # Accounts
-        state_address = pda.get_state_address(program_id)
-        state = await State.fetch(connection, state_address, connection.commitment, program_id=program_id)
-        if state is None:
-            raise Exception(f"State not found at {state_address}")
+        logger = utils.create_logger(f"{__name__}.{cls.__name__}", log_level)
 
-        pricing_address = pda.get_pricing_address(program_id)
-        pricing = await Pricing.fetch(connection, pricing_address, connection.commitment, program_id=program_id)
-        if pricing is None:
-            raise Exception(f"Pricing not found at {pricing_address}")
+        snapshot = ExchangeSnapshot.load(snapshot_path, network, program_id)
 
         # Addresses
-        _serum_authority_address = pda.get_serum_authority_address(program_id)
-        _mint_authority_address = pda.get_mint_authority_address(program_id)
+        state_address = snapshot.address("state", lambda: pda.get_state_address(program_id))
+        pricing_address = snapshot.address("pricing", lambda: pda.get_pricing_address(program_id))
+        _serum_authority_address = snapshot.address(
+            "serum_authority", lambda: pda.get_serum_authority_address(program_id)
+        )
+        _mint_authority_address = snapshot.address("mint_authority", lambda: pda.get_mint_authority_address(program_id))
+
+        # Accounts
+        from_snapshot = snapshot.has_accounts(assets)
+        if from_snapshot:
+            # Pricing is live data, so even a warm load fetches it before returning
+            (pricing_data,) = await cls._fetch_account_data(connection, [pricing_address], [program_id])
+            pricing = Pricing.decode(pricing_data)
+        else:
+            # State and Pricing in a single round trip
+            state_data, pricing_data = await cls._fetch_account_data(
+                connection, [state_address, pricing_address], [program_id, program_id]
+            )
+            pricing = Pricing.decode(pricing_data)
+
+            # Every market state in one batched call (chunked at the RPC's 100 key limit)
+            market_state_addresses = [pricing.markets[asset.to_index()] for asset in assets]
+            market_states_data = await cls._fetch_account_data(
+                connection, market_state_addresses, [constants.MATCHING_ENGINE_PID[network]] * len(assets)
+            )
+            snapshot.set_accounts(state_data, dict(zip(assets, market_states_data)))
 
         markets = {
-            asset: await Market.load(network, connection, asset, pricing.markets[asset.to_index()]) for asset in assets
+            asset: cls._market_from_snapshot(network, connection, asset, snapshot, program_id) for asset in assets
         }
 
-        # not currently used
-        logger = utils.create_logger(f"{__name__}.{cls.__name__}", log_level)
-
         instance = cls(
             connection=connection,
             program_id=program_id,
-            program=program,
-            state=state,
+            state=State.decode(cast(bytes, snapshot.state)),
             pricing=pricing,
             markets=markets,
-            _event_parser=_event_parser,
             _state_address=state_address,
             _pricing_address=pricing_address,
             _serum_authority_address=_serum_authority_address,
             _mint_authority_address=_mint_authority_address,
             _logger=logger,
+            _snapshot=snapshot,
         )
+        snapshot.save()
+
+        if from_snapshot:
+            instance._refresh_task = asyncio.create_task(instance._refresh_in_background())
 
         return instance
 
+    @staticmethod
+    async def _fetch_account_data(
+        connection: AsyncClient, addresses: list[Pubkey], owners: list[Pubkey]
+    ) -> list[bytes]:
+        infos = await get_multiple_accounts(connection, addresses, commitment=connection.commitment)
+        data = []
+        for address, owner, info in zip(addresses, owners, infos):
+            if info is None or info.account.owner != owner:
+                raise Exception(f"Account not found at {address}")
+            data.append(info.account.data)
+        return data
+
+    @staticmethod
+    def _market_from_snapshot(
+        network: Network, connection: AsyncClient, asset: Asset, snapshot: ExchangeSnapshot, program_id: Pubkey
+    ) -> Market:
+        market_state = MarketState.decode(snapshot.market_states[asset])
+        return Market.from_market_state(
+            network,
+            connection,
+            asset,
+            market_state,
+            base_zeta_vault_address=snapshot.address(
+                f"zeta_vault:{market_state.base_mint}",
+                lambda: pda.get_zeta_vault_address(program_id, market_state.base_mint),
+            ),
+            quote_zeta_vault_address=snapshot.address(
+                f"zeta_vault:{market_state.quote_mint}",
+                lambda: pda.get_zeta_vault_address(program_id, market_state.quote_mint),
+            ),
+        )
+
+    async def refresh(self) -> list[Asset]:
+        """
+        Refetch State, Pricing and every loaded MarketState in a single batched call.
+
+        Every market gets the freshly fetched MarketState in place. The snapshot file is rewritten if a market's
+        configuration (addresses, mints, vaults, lot sizes etc.) or epoch changed.
+
+        Returns:
+            list[Asset]: The assets whose market configuration changed.
+
+        Raises:
+            Exception: If the exchange was not created with :func:`load`.
+        """
+        if self._snapshot is None:
+            raise Exception("Exchange has no snapshot, use Exchange.load to create it")
+        snapshot = self._snapshot
+        network = snapshot.network
+        matching_engine_program_id = constants.MATCHING_ENGINE_PID[network]
+
+        assets = self.assets
+        market_state_addresses = [self.markets[asset].address for asset in assets]
+        state_data, pricing_data, *market_states_data = await self._fetch_account_data(
+            self.connection,
+            [self._state_address, self._pricing_address, *market_state_addresses],
+            [self.program_id, self.program_id] + [matching_engine_program_id] * len(assets),
+        )
+        pricing = Pricing.decode(pricing_data)
+        market_states = dict(zip(assets, market_states_data))
+
+        # A market that moved to a new account is rare enough to pay for a second round trip
+        moved = [
+            asset
+            for asset, address in zip(assets, market_state_addresses)
+            if pricing.markets[asset.to_index()] != address
+        ]
+        if len(moved) > 0:
+            moved_data = await self._fetch_account_data(
+                self.connection,
+                [pricing.markets[asset.to_index()] for asset in moved],
+                [matching_engine_program_id] * len(moved),
+            )
+            market_states.update(zip(moved, moved_data))
+
+        changed = snapshot.set_accounts(state_data, market_states)
+        self.state = State.decode(state_data)
+        self.pricing = pricing
+        for asset in assets:
+            if asset in changed:
+                self._logger.info(f"Market state for {asset} changed on-chain, snapshot invalidated")
+            market = self._market_from_snapshot(network, self.connection, asset, snapshot, self.program_id)
+            # Update in place so that anything holding the market (e.g. subscriptions) sees the new state
+            self.markets[asset]._market_state = market._market_state
+            self.markets[asset]._base_zeta_vault_address = market._base_zeta_vault_address
+            self.markets[asset]._quote_zeta_vault_address = market._quote_zeta_vault_address
+        snapshot.save()
+        return changed
+
+    async def close(self) -> None:
+        """Stop the background snapshot refresh, if it is still running."""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    async def _refresh_in_background(self) -> None:
+        try:
+            await self.refresh()
+        except Exception:
+            self._logger.error(f"Error refreshing exchange snapshot: {traceback.format_exc()}")
+
+    @functools.cached_property
+    def program(self) -> Program:
+        """
+        The Zeta program, built on first access. Parsing and decoding only need :attr:`coder`.
+
+        Returns:
+            Program: The anchorpy program.
+        """
+        return Program(get_idl(), self.program_id, Provider(self.connection, Wallet.dummy()))
+
+    @property
+    def coder(self) -> Coder:
+        """
+        The Zeta program coder, shared between all exchanges in the process.
+
+        Returns:
+            Coder: The anchorpy coder.
+        """
+        return get_coder()
+
+    @functools.cached_property
+    def _event_parser(self) -> EventParser:
+        return EventParser(self.program_id, self.coder)
+
     @property
     def endpoint(self) -> str:
         """
@@ -0,0 +1,125 @@
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+from solders.pubkey import Pubkey
+
+from zetamarkets_py import constants
+from zetamarkets_py.types import Asset, anchor_decimals_to_floats
+from zetamarkets_py.zeta_client.accounts.cross_margin_account import CrossMarginAccount
+from zetamarkets_py.zeta_client.accounts.pricing import Pricing
+
+
+@dataclass
+class FundingSnapshot:
+    """Unrealized funding of every tracked account at one slot.
+
+    Attributes:
+        slot (int): The slot of the update that produced the snapshot.
+        unrealized_funding (np.ndarray): Funding PnL accrued but not yet applied, in USDC, of shape
+            (num_accounts, num_assets). Positive values are owed to the account.
+    """
+
+    slot: int
+    unrealized_funding: np.ndarray
+
+    @property
+    def total(self) -> np.ndarray:
+        """Unrealized funding of every account summed over assets, of shape (num_accounts,)."""
+        return self.unrealized_funding.sum(axis=-1)
+
+
+class FundingTracker:
+    """Funding accrued but not yet applied to the positions of a set of margin accounts.
+
+    A position accrues ``-size * (pricing funding delta - margin account last funding delta)`` until funding is
+    applied to it, at which point the account's last funding delta catches up with the pricing account. Every update
+    recomputes all accounts and assets in a few array operations and, once every account has been received, appends a
+    :class:`FundingSnapshot` to :attr:`history`.
+
+    Attributes:
+        addresses (list[Pubkey]): The tracked margin account addresses, one row each.
+        history (deque[FundingSnapshot]): The most recent snapshots, oldest first.
+    """
+
+    def __init__(self, addresses: Sequence[Pubkey], history_length: int = 1000) -> None:
+        """Initializes a tracker with no accounts received yet.
+
+        Args:
+            addresses (Sequence[Pubkey]): The margin account addresses to track.
+            history_length (int, optional): The number of snapshots to keep. Defaults to 1000.
+        """
+        self.addresses = list(addresses)
+        self.history: deque[FundingSnapshot] = deque(maxlen=history_length)
+        self._rows = {address: i for i, address in enumerate(self.addresses)}
+        self._size = np.zeros((len(self.addresses), len(Asset.all())))
+        self._last_funding_deltas = np.zeros((len(self.addresses), len(Asset.all())))
+        self._funding_deltas: Optional[np.ndarray] = None
+        self._margin_account_slots: list[Optional[int]] = [None] * len(self.addresses)
+        self._pricing_slot: Optional[int] = None
+
+    @property
+    def is_ready(self) -> bool:
+        """Whether the pricing account and every margin account have been received."""
+        return self._funding_deltas is not None and all(slot is not None for slot in self._margin_account_slots)
+
+    @property
+    def unrealized_funding(self) -> Optional[np.ndarray]:
+        """The latest unrealized funding in USDC, of shape (num_accounts, num_assets), or None before any update."""
+        return self.history[-1].unrealized_funding if self.history else None
+
+    def update_margin_account(self, address: Pubkey, margin_account: CrossMarginAccount, slot: int) -> bool:
+        """Applies a new margin account.
+
+        Only ``product_ledgers`` and ``last_funding_deltas`` are read, so a partially decoded account from
+        ``account_data.AccountFieldDecoder`` works too.
+
+        Args:
+            address (Pubkey): The margin account address.
+            margin_account (CrossMarginAccount): The new margin account.
+            slot (int): The slot of the margin account.
+
+        Returns:
+            bool: True if the funding was updated, False if the account is older than the one already held.
+        """
+        row = self._rows[address]
+        last_slot = self._margin_account_slots[row]
+        if last_slot is not None and slot < last_slot:
+            return False
+        self._size[row] = [ledger.position.size for ledger in margin_account.product_ledgers]
+        self._last_funding_deltas[row] = anchor_decimals_to_floats(margin_account.last_funding_deltas)
+        self._margin_account_slots[row] = slot
+        self._snapshot(slot)
+        return True
+
+    def update_pricing(self, pricing: Pricing, slot: int) -> bool:
+        """Applies a new pricing account.
+
+        Only ``funding_deltas`` is read, so a partially decoded account from ``account_data.AccountFieldDecoder``
+        works too.
+
+        Args:
+            pricing (Pricing): The new pricing account.
+            slot (int): The slot of the pricing account.
+
+        Returns:
+            bool: True if the funding was updated, False if the account is older than the one already held.
+        """
+        if self._pricing_slot is not None and slot < self._pricing_slot:
+            return False
+        self._funding_deltas = np.array(anchor_decimals_to_floats(pricing.funding_deltas))
+        self._pricing_slot = slot
+        self._snapshot(slot)
+        return True
+
+    def _snapshot(self, slot: int) -> None:
+        if self._funding_deltas is None or not self.is_ready:
+            return
+        # Sizes are in lots and funding deltas in fixed point USDC per unit of the asset
+        unrealized_funding = (
+            -self._size
+            * (self._funding_deltas - self._last_funding_deltas)
+            / 10 ** (constants.POSITION_PRECISION + constants.PLATFORM_PRECISION)
+        )
+        self.history.append(FundingSnapshot(slot, unrealized_funding))
@@ -0,0 +1,179 @@
+import hashlib
+import struct
+from typing import Optional, Sequence, Tuple
+
+from zetamarkets_py.types import Asset, OrderType, SelfTradeBehaviorZeta, Side
+
+# Hand-rolled borsh encoders for the instruction data of the hot trading instructions. They produce the exact
+# bytes of the codegen builders in zeta_client.instructions, without going through construct, so that requoting
+# only costs a few struct.pack calls. Account lists for the same instructions are cached by the Client.
+
+
+def _sighash(name: str) -> bytes:
+    return hashlib.sha256(f"global:{name}".encode()).digest()[:8]
+
+
+PLACE_PERP_ORDER_V5_DISCRIMINATOR = _sighash("place_perp_order_v5")
+PLACE_MULTI_ORDERS_DISCRIMINATOR = _sighash("place_multi_orders")
+CANCEL_ORDER_DISCRIMINATOR = _sighash("cancel_order")
+CANCEL_ORDER_BY_CLIENT_ORDER_ID_DISCRIMINATOR = _sighash("cancel_order_by_client_order_id")
+CANCEL_ALL_MARKET_ORDERS_DISCRIMINATOR = _sighash("cancel_all_market_orders")
+
+_ASSET_INDEX = {asset: asset.to_program_type().discriminator for asset in Asset}
+_ORDER_TYPE_INDEX = {order_type: order_type.to_program_type().discriminator for order_type in OrderType}
+_SIDE_INDEX = {side: side.to_program_type().discriminator for side in Side}
+_SELF_TRADE_BEHAVIOR_INDEX = {behavior: behavior.to_program_type().discriminator for behavior in SelfTradeBehaviorZeta}
+
+_U8 = struct.Struct("<B")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_U64 = struct.Struct("<Q")
+_PRICE_SIZE = struct.Struct("<QQ")
+_NONE = b"\x00"
+_SOME = b"\x01"
+
+
+def _option_u64(value: Optional[int]) -> bytes:
+    return _NONE if value is None else _SOME + _U64.pack(value)
+
+
+def _option_u16(value: Optional[int]) -> bytes:
+    return _NONE if value is None else _SOME + _U16.pack(value)
+
+
+def _option_string(value: Optional[str]) -> bytes:
+    if value is None:
+        return _NONE
+    encoded = value.encode()
+    return _SOME + _U32.pack(len(encoded)) + encoded
+
+
+def _order_args(orders: Sequence[Tuple[int, int, Optional[int], Optional[int]]]) -> bytes:
+    return _U32.pack(len(orders)) + b"".join(
+        _PRICE_SIZE.pack(price, size) + _option_u64(client_order_id) + _option_u16(tif_offset)
+        for price, size, client_order_id, tif_offset in orders
+    )
+
+
+def place_perp_order_v5_data(
+    price: int,
+    size: int,
+    side: Side,
+    order_type: OrderType,
+    asset: Asset,
+    client_order_id: Optional[int] = None,
+    tag: Optional[str] = None,
+    tif_offset: Optional[int] = None,
+    self_trade_behavior: Optional[SelfTradeBehaviorZeta] = None,
+    reduce_only: bool = False,
+) -> bytes:
+    """
+    Encode the data of a PlacePerpOrderV5 instruction.
+
+    Args:
+        price (int): The fixed point price.
+        size (int): The fixed point size.
+        side (Side): The side of the order.
+        order_type (OrderType): The type of the order.
+        asset (Asset): The asset of the market.
+        client_order_id (int, optional): The client order id. Defaults to None.
+        tag (str, optional): The order tag. Defaults to None.
+        tif_offset (int, optional): The time in force offset. Defaults to None.
+        self_trade_behavior (SelfTradeBehaviorZeta, optional): The self trade behavior. Defaults to None.
+        reduce_only (bool, optional): Whether the order is reduce only. Defaults to False.
+
+    Returns:
+        bytes: The instruction data.
+    """
+    return b"".join(
+        (
+            PLACE_PERP_ORDER_V5_DISCRIMINATOR,
+            _PRICE_SIZE.pack(price, size),
+            _U8.pack(_SIDE_INDEX[side]),
+            _U8.pack(_ORDER_TYPE_INDEX[order_type]),
+            _U8.pack(reduce_only),
+            _option_u64(client_order_id),
+            _option_string(tag),
+            _option_u16(tif_offset),
+            _U8.pack(_ASSET_INDEX[asset]),
+            _NONE if self_trade_behavior is None else _SOME + _U8.pack(_SELF_TRADE_BEHAVIOR_INDEX[self_trade_behavior]),
+        )
+    )
+
+
+def place_multi_orders_data(
+    asset: Asset,
+    bid_orders: Sequence[Tuple[int, int, Optional[int], Optional[int]]],
+    ask_orders: Sequence[Tuple[int, int, Optional[int], Optional[int]]],
+    order_type: OrderType,
+) -> bytes:
+    """
+    Encode the data of a PlaceMultiOrders instruction.
+
+    Args:
+        asset (Asset): The asset of the market.
+        bid_orders (Sequence[Tuple[int, int, Optional[int], Optional[int]]]): Fixed point
+            (price, size, client_order_id, tif_offset) of each bid.
+        ask_orders (Sequence[Tuple[int, int, Optional[int], Optional[int]]]): Fixed point
+            (price, size, client_order_id, tif_offset) of each ask.
+        order_type (OrderType): The type of all the orders.
+
+    Returns:
+        bytes: The instruction data.
+    """
+    return b"".join(
+        (
+            PLACE_MULTI_ORDERS_DISCRIMINATOR,
+            _U8.pack(_ASSET_INDEX[asset]),
+            _order_args(bid_orders),
+            _order_args(ask_orders),
+            _U8.pack(_ORDER_TYPE_INDEX[order_type]),
+        )
+    )
+
+
+def cancel_order_data(side: Side, order_id: int, asset: Asset) -> bytes:
+    """
+    Encode the data of a CancelOrder instruction.
+
+    Args:
+        side (Side): The side of the order.
+        order_id (int): The 128-bit order id.
+        asset (Asset): The asset of the market.
+
+    Returns:
+        bytes: The instruction data.
+    """
+    return (
+        CANCEL_ORDER_DISCRIMINATOR
+        + _U8.pack(_SIDE_INDEX[side])
+        + order_id.to_bytes(16, "little")
+        + _U8.pack(_ASSET_INDEX[asset])
+    )
+
+
+def cancel_order_by_client_order_id_data(client_order_id: int, asset: Asset) -> bytes:
+    """
+    Encode the data of a CancelOrderByClientOrderId instruction.
+
+    Args:
+        client_order_id (int): The client order id.
+        asset (Asset): The asset of the market.
+
+    Returns:
+        bytes: The instruction data.
+    """
+    return CANCEL_ORDER_BY_CLIENT_ORDER_ID_DISCRIMINATOR + _U64.pack(client_order_id) + _U8.pack(_ASSET_INDEX[asset])
+
+
+def cancel_all_market_orders_data(asset: Asset) -> bytes:
+    """
+    Encode the data of a CancelAllMarketOrders instruction.
+
+    Args:
+        asset (Asset): The asset of the market.
+
+    Returns:
+        bytes: The instruction data.
+    """
+    return CANCEL_ALL_MARKET_ORDERS_DISCRIMINATOR + _U8.pack(_ASSET_INDEX[asset])
@@ -1,22 +1,25 @@
 from __future__ import annotations
 
 import asyncio
-import itertools
 import logging
 import time
+from collections.abc import AsyncIterator
 from dataclasses import dataclass
 from typing import Optional, Tuple
 
 from solana.rpc.async_api import AsyncClient
+from solana.rpc.commitment import Commitment
 from solders.pubkey import Pubkey
 
 from zetamarkets_py import constants, pda, utils
 from zetamarkets_py.constants import Asset
-from zetamarkets_py.orderbook import Orderbook
+from zetamarkets_py.orderbook import LiveBook, Orderbook
 from zetamarkets_py.serum_client.accounts.market_state import MarketState
+from zetamarkets_py.serum_client.accounts.open_orders import OpenOrders
 from zetamarkets_py.serum_client.accounts.orderbook import OrderbookAccount
 from zetamarkets_py.serum_client.accounts.queue import EventQueue
 from zetamarkets_py.serum_client.types.queue import Event
+from zetamarkets_py.subscriptions import SubscriptionManager
 from zetamarkets_py.types import FilledOrder, Network, Order, OrderInfo, Side
 
 
@@ -74,8 +77,6 @@ class Market:
         Returns:
             Market: An instance of the Market class.
         """
-        # Initialize
-        zeta_program_id = constants.ZETA_PID[network]
         matching_engine_program_id = constants.MATCHING_ENGINE_PID[network]
 
         # Load Market State
@@ -85,9 +86,44 @@ class Market:
         if _market_state is None:
             raise Exception(f"Market state not found at {market_state_address}")
 
+        return cls.from_market_state(network, connection, asset, _market_state, log_level)
+
+    @classmethod
+    def from_market_state(
+        cls,
+        network: Network,
+        connection: AsyncClient,
+        asset: Asset,
+        market_state: MarketState,
+        log_level: int = logging.CRITICAL,
+        base_zeta_vault_address: Optional[Pubkey] = None,
+        quote_zeta_vault_address: Optional[Pubkey] = None,
+    ):
+        """Build the Market from an already fetched market state, without any RPC calls.
+
+        Args:
+            network (Network): The network to connect to.
+            connection (AsyncClient): The connection to the Solana network.
+            asset (Asset): The asset being traded on the market.
+            market_state (MarketState): The decoded market state account.
+            log_level (int, optional): The logging level. Defaults to logging.CRITICAL.
+            base_zeta_vault_address (Pubkey, optional): The base vault address, derived if not given.
+            quote_zeta_vault_address (Pubkey, optional): The quote vault address, derived if not given.
+
+        Returns:
+            Market: An instance of the Market class.
+        """
+        # Initialize
+        zeta_program_id = constants.ZETA_PID[network]
+        matching_engine_program_id = constants.MATCHING_ENGINE_PID[network]
+
         # Addresses
-        _base_zeta_vault_address = pda.get_zeta_vault_address(zeta_program_id, _market_state.base_mint)
-        _quote_zeta_vault_address = pda.get_zeta_vault_address(zeta_program_id, _market_state.quote_mint)
+        _base_zeta_vault_address = base_zeta_vault_address or pda.get_zeta_vault_address(
+            zeta_program_id, market_state.base_mint
+        )
+        _quote_zeta_vault_address = quote_zeta_vault_address or pda.get_zeta_vault_address(
+            zeta_program_id, market_state.quote_mint
+        )
 
         # not currently used
         logger = utils.create_logger(f"{__name__}.{cls.__name__}.{asset.name}", log_level)
@@ -97,7 +133,7 @@ class Market:
             zeta_program_id=zeta_program_id,
             matching_engine_program_id=matching_engine_program_id,
             asset=asset,
-            _market_state=_market_state,
+            _market_state=market_state,
             _base_zeta_vault_address=_base_zeta_vault_address,
             _quote_zeta_vault_address=_quote_zeta_vault_address,
             _logger=logger,
@@ -252,6 +288,50 @@ class Market:
             return None
         return orderbook._get_l2(depth, clock_ts)
 
+    async def subscribe_live_book(
+        self,
+        ws_endpoint: str,
+        commitment: Optional[Commitment] = None,
+        tif_buffer: int = 10,
+        subscription_manager: Optional[SubscriptionManager] = None,
+    ) -> AsyncIterator[Tuple[LiveBook, Side, int]]:
+        """
+        Subscribe to both sides of the orderbook over a single websocket and maintain a two-sided book.
+
+        Notifications older than the last applied slot for their side are dropped.
+
+        Args:
+            ws_endpoint (str): The websocket RPC endpoint.
+            commitment (Commitment, optional): The commitment level to use for the subscription. Defaults to the
+                connection commitment.
+            tif_buffer (int, optional): The TIF buffer in seconds used when masking expired orders. Defaults to 10.
+            subscription_manager (SubscriptionManager, optional): A shared websocket multiplexer to subscribe
+                through. Defaults to a private one for ``ws_endpoint``.
+
+        Yields:
+            AsyncIterator[Tuple[LiveBook, Side, int]]: An async iterator that yields the live book, the side that was
+                updated and its slot.
+        """
+        commitment = commitment or self.connection.commitment
+        subscriptions = subscription_manager or SubscriptionManager(ws_endpoint, logger=self._logger)
+        live_book = LiveBook(tif_buffer)
+        try:
+            async for address, account_bytes, slot in subscriptions.accounts_subscribe(
+                [self._market_state.bids, self._market_state.asks], commitment
+            ):
+                side = Side.Bid if address == self._market_state.bids else Side.Ask
+                account = OrderbookAccount.decode_lazy(account_bytes)
+                if not live_book.update(Orderbook(side, account, self._market_state), slot):
+                    continue
+                if side == Side.Bid:
+                    self._bids_last_update_slot = slot
+                else:
+                    self._asks_last_update_slot = slot
+                yield live_book, side, slot
+        finally:
+            if subscription_manager is None:
+                await subscriptions.close()
+
     @staticmethod
     def _parse_orders_for_owner(
         bids: Orderbook, asks: Orderbook, open_orders_account_address: Pubkey
@@ -267,8 +347,37 @@ class Market:
         Returns:
             Optional[list[Order]]: A list of orders for the owner if they exist, None otherwise.
         """
-        all_orders = itertools.chain(bids.orders(), asks.orders())
-        orders = [o for o in all_orders if str(o.open_order_address) == str(open_orders_account_address)]
+        return bids.orders_for_owner(open_orders_account_address) + asks.orders_for_owner(open_orders_account_address)
+
+    @staticmethod
+    def _parse_orders_from_open_orders(
+        bids: Orderbook, asks: Orderbook, open_orders_account_address: Pubkey, open_orders: OpenOrders
+    ) -> list[Order]:
+        """
+        Parse the orders an open orders account lists as resting from the orderbooks.
+
+        The occupied slots of the open orders account give the order ids and sides, so each side of the book is only
+        searched for the owner's leaves, and not at all when the account has no orders on it. Orders the account still
+        lists but which are no longer on the book, e.g. fills not yet cranked, are left out.
+
+        Args:
+            bids (Orderbook): The bid orderbook.
+            asks (Orderbook): The ask orderbook.
+            open_orders_account_address (Pubkey): The public key of the owner's open orders account.
+            open_orders (OpenOrders): The owner's open orders account.
+
+        Returns:
+            list[Order]: The owner's orders, bids first, each side in ascending key order.
+        """
+        bid_ids: set[int] = set()
+        ask_ids: set[int] = set()
+        for slot, order_id in enumerate(open_orders.orders):
+            if open_orders.free_slot_bits >> slot & 1:
+                continue
+            (bid_ids if open_orders.is_bid_bits >> slot & 1 else ask_ids).add(order_id)
+        orders = bids.orders_for_owner(open_orders_account_address, bid_ids) if bid_ids else []
+        if ask_ids:
+            orders += asks.orders_for_owner(open_orders_account_address, ask_ids)
         return orders
 
     def _parse_fills(self, events: list[Event], limit: int) -> list[FilledOrder]:
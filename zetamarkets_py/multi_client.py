@@ -0,0 +1,233 @@
+import logging
+from collections.abc import AsyncIterator, Iterator
+from typing import Optional, Tuple, cast
+
+import anchorpy
+from anchorpy import Wallet
+from anchorpy.provider import DEFAULT_OPTIONS
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.commitment import Commitment, Confirmed
+from solana.rpc.types import TxOpts
+from solders.pubkey import Pubkey
+
+from zetamarkets_py import utils
+from zetamarkets_py.account_data import MARGIN_ACCOUNT_RISK_FIELDS, PRICING_RISK_FIELDS
+from zetamarkets_py.client import Client
+from zetamarkets_py.exchange import Exchange
+from zetamarkets_py.funding import FundingTracker
+from zetamarkets_py.risk import AccountRiskSummary
+from zetamarkets_py.subscriptions import SubscriptionManager
+from zetamarkets_py.types import Asset, Network
+from zetamarkets_py.zeta_client.accounts.cross_margin_account import CrossMarginAccount
+from zetamarkets_py.zeta_client.accounts.pricing import Pricing
+
+
+class MultiClient:
+    """
+    A set of clients for several subaccounts of one wallet.
+
+    Every client shares one connection, one :class:`Exchange`, one set of providers and one subscription manager, so
+    running a strategy per subaccount costs no more sockets or exchange loads than running one. Account fetches for
+    all subaccounts are batched into single ``getMultipleAccounts`` calls.
+
+    Note:
+        Loading is asynchronous, so it is recommended to use :func:`load` to initialize the clients.
+
+    Example:
+        Quote on subaccounts 0 and 1 from the same process::
+
+            clients = await MultiClient.load([0, 1], endpoint=endpoint, wallet=wallet)
+            await clients[0].place_order(...)
+            await clients[1].place_order(...)
+    """
+
+    def __init__(self, clients: dict[int, Client]) -> None:
+        """Initializes the MultiClient from clients sharing the same exchange and connection.
+
+        Args:
+            clients (dict[int, Client]): The clients, by subaccount index.
+        """
+        self.clients = clients
+
+    @classmethod
+    async def load(
+        cls,
+        subaccount_indices: list[int],
+        endpoint: Optional[str] = None,
+        ws_endpoint: Optional[str] = None,
+        double_down_endpoints: Optional[str] = None,
+        commitment: Commitment = Confirmed,
+        wallet: Optional[Wallet] = None,
+        assets: list[Asset] = Asset.all(),
+        tx_opts: TxOpts = DEFAULT_OPTIONS,
+        network: Network = Network.MAINNET,
+        log_level: int = logging.WARNING,
+        blockhash_cache: Optional[utils.BlockhashCache] = None,
+        delegator_pubkey: Optional[Pubkey] = None,
+        multiplex_subscriptions: bool = True,
+        ws_pool_size: int = 1,
+        snapshot_path: Optional[str] = None,
+        blockhash_refresh_interval: Optional[float] = 0.5,
+        confirm_in_background: bool = False,
+        race_double_downs: bool = False,
+    ) -> "MultiClient":
+        """
+        Asynchronously load a client for each subaccount.
+
+        Args:
+            subaccount_indices (list[int]): The subaccount indices to load.
+            endpoint (str, optional): The http(s) RPC endpoint. Defaults to None.
+            ws_endpoint (str, optional): The websocket RPC endpoint. Defaults to None.
+            double_down_endpoints ([str], optional): The http(s) RPC endpoints to use as extra double-downs when
+                sending critical instructions. Defaults to None.
+            commitment (Commitment, optional): The commitment level of the Solana network. Defaults to Confirmed.
+            wallet (Wallet): The wallet used for transactions.
+            assets (list[Asset], optional): The list of assets to be used. Defaults to all available assets.
+            tx_opts (TxOpts, optional): Transaction options. Defaults to DEFAULT_OPTIONS.
+            network (Network, optional): The network of the Zeta program. Defaults to Network.MAINNET.
+            log_level (int, optional): The level of logging. Defaults to logging.WARNING.
+            blockhash_cache (BlockhashCache, optional): The blockhash cache. Disabled by default.
+            delegator_pubkey (Pubkey, optional): If passing in a delegated wallet in the 'wallet' param, this
+                is the delegator account itself.
+            multiplex_subscriptions (bool, optional): Share a small pool of websockets between all subscriptions of
+                all subaccounts. Defaults to True.
+            ws_pool_size (int, optional): The maximum number of websockets in the shared pool. Defaults to 1.
+            snapshot_path (str, optional): A file to cache exchange metadata and derived addresses in between runs.
+                Defaults to None.
+            blockhash_refresh_interval (float, optional): Seconds between background refreshes of the blockhash cache,
+                if one is given. None leaves filling the cache to the caller. Defaults to 0.5.
+            confirm_in_background (bool, optional): Return from sends as soon as the transaction is submitted, and
+                confirm it with one tracker shared by every client instead. Defaults to False.
+            race_double_downs (bool, optional): Return from sends as soon as the first double-down endpoint accepts the
+                transaction, leaving the others to finish in the background. Defaults to False.
+
+        Raises:
+            Exception: If no wallet or no subaccount is given.
+
+        Returns:
+            MultiClient: The clients, by subaccount index.
+        """
+        if wallet is None:
+            raise Exception("Wallet required to load subaccounts")
+        if not subaccount_indices:
+            raise Exception("No subaccounts to load")
+        clients = await Client._load_many(
+            subaccount_indices,
+            endpoint=endpoint,
+            ws_endpoint=ws_endpoint,
+            double_down_endpoints=double_down_endpoints,
+            commitment=commitment,
+            wallet=wallet,
+            assets=assets,
+            tx_opts=tx_opts,
+            network=network,
+            log_level=log_level,
+            blockhash_cache=blockhash_cache,
+            delegator_pubkey=delegator_pubkey,
+            multiplex_subscriptions=multiplex_subscriptions,
+            ws_pool_size=ws_pool_size,
+            snapshot_path=snapshot_path,
+            blockhash_refresh_interval=blockhash_refresh_interval,
+            confirm_in_background=confirm_in_background,
+            race_double_downs=race_double_downs,
+        )
+        return cls({client.subaccount_index: client for client in clients})
+
+    def __getitem__(self, subaccount_index: int) -> Client:
+        return self.clients[subaccount_index]
+
+    def __iter__(self) -> Iterator[Client]:
+        return iter(self.clients.values())
+
+    def __len__(self) -> int:
+        return len(self.clients)
+
+    @property
+    def _client(self) -> Client:
+        return next(iter(self.clients.values()))
+
+    @property
+    def connection(self) -> AsyncClient:
+        """The connection shared by every client."""
+        return self._client.connection
+
+    @property
+    def exchange(self) -> Exchange:
+        """The exchange shared by every client."""
+        return self._client.exchange
+
+    @property
+    def subscription_manager(self) -> Optional[SubscriptionManager]:
+        """The websocket multiplexer shared by every client."""
+        return self._client.subscription_manager
+
+    @property
+    def margin_account_addresses(self) -> dict[int, Pubkey]:
+        """The margin account address of every subaccount."""
+        return {index: cast(Pubkey, client._margin_account_address) for index, client in self.clients.items()}
+
+    async def close(self) -> None:
+        """Stop the background tasks and close the connections shared by every client, see :func:`Client.close`."""
+        await self._client.close()
+
+    async def refresh_margin_accounts(self) -> dict[int, Optional[CrossMarginAccount]]:
+        """
+        Fetch the margin account of every subaccount in one batched call and store it on its client.
+
+        Returns:
+            dict[int, Optional[CrossMarginAccount]]: The margin accounts by subaccount index, None if one does not
+                exist yet.
+        """
+        addresses = self.margin_account_addresses
+        infos = await anchorpy.utils.rpc.get_multiple_accounts(self.connection, list(addresses.values()))
+        margin_accounts = {}
+        for (index, client), info in zip(self.clients.items(), infos):
+            if info is not None and info.account.owner != self.exchange.program_id:
+                raise ValueError("Account does not belong to this program")
+            client.margin_account = None if info is None else CrossMarginAccount.decode(info.account.data)
+            margin_accounts[index] = client.margin_account
+        return margin_accounts
+
+    async def get_account_risk_summaries(self) -> dict[int, AccountRiskSummary]:
+        """
+        Get the risk summary of every subaccount, from one batched fetch of the margin accounts and pricing.
+
+        Raises:
+            Exception: If a margin account does not exist.
+
+        Returns:
+            dict[int, AccountRiskSummary]: The risk summaries by subaccount index.
+        """
+        addresses = [*self.margin_account_addresses.values(), self.exchange._pricing_address]
+        infos = await anchorpy.utils.rpc.get_multiple_accounts(self.connection, addresses)
+        datas = []
+        for info in infos:
+            if info is None:
+                raise Exception("Margin account does not exist, cannot compute risk")
+            datas.append(info.account.data)
+        pricing = cast(Pricing, PRICING_RISK_FIELDS.decode(datas[-1]))
+        return {
+            index: AccountRiskSummary.from_margin_and_pricing_accounts(
+                cast(CrossMarginAccount, MARGIN_ACCOUNT_RISK_FIELDS.decode(data)), pricing
+            )
+            for index, data in zip(self.clients, datas)
+        }
+
+    async def subscribe_funding(
+        self, commitment: Optional[Commitment] = None, history_length: int = 1000
+    ) -> AsyncIterator[Tuple[FundingTracker, int]]:
+        """
+        Subscribe to the unrealized funding of every subaccount over one subscription.
+
+        Args:
+            commitment (Commitment, optional): The commitment level to use for the subscription. Defaults to None.
+            history_length (int, optional): The number of funding snapshots to keep. Defaults to 1000.
+
+        Yields:
+            AsyncIterator[Tuple[FundingTracker, int]]: An async iterator that yields the funding tracker, with one row
+                per subaccount in the order of :attr:`clients`, and the slot of the update.
+        """
+        async for tracker, slot in self._client.subscribe_funding(
+            list(self.margin_account_addresses.values()), commitment, history_length
+        ):
+            yield tracker, slot
@@ -1,6 +1,8 @@
 import time
-from typing import Iterable, Optional, Union
+from dataclasses import dataclass
+from typing import Collection, Iterable, Optional, Union
 
+import numpy as np
 from solana.rpc.async_api import AsyncClient
 from solana.rpc.commitment import Commitment
 from solders.pubkey import Pubkey
@@ -8,8 +10,40 @@ from solders.pubkey import Pubkey
 from zetamarkets_py import constants, utils
 from zetamarkets_py.serum_client.accounts.market_state import MarketState
 from zetamarkets_py.serum_client.accounts.orderbook import OrderbookAccount
-from zetamarkets_py.serum_client.types.slab import SlabInnerNode, SlabLeafNode
-from zetamarkets_py.types import Network, Order, OrderInfo, Side
+from zetamarkets_py.serum_client.types.slab import (
+    SlabInnerNode,
+    SlabLeafNode,
+    SlabView,
+    leaf_array_from_nodes,
+)
+from zetamarkets_py.types import (
+    DeltaType,
+    LevelDelta,
+    Network,
+    Order,
+    OrderbookDelta,
+    OrderDelta,
+    OrderInfo,
+    Side,
+)
+
+
+@dataclass
+class OrderbookArrays:
+    """Columnar view of the resting orders on one side of the book, sorted by ascending order key.
+
+    All values are in native units (fixed point price and lots), one contiguous array per field.
+    """
+
+    price: np.ndarray
+    quantity: np.ndarray
+    seq_num: np.ndarray
+    tif_offset: np.ndarray
+    owner_slot: np.ndarray
+    fee_tier: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.price)
 
 
 class Orderbook:
@@ -35,6 +69,9 @@ class Orderbook:
         self.side = side
         self._slab = orderbook.slab
         self._market_state = market_state
+        self._arrays: Optional[OrderbookArrays] = None
+        self._leaves: Optional[np.ndarray] = None
+        self._owners: Optional[dict[bytes, np.ndarray]] = None
 
     @classmethod
     async def load(
@@ -166,6 +203,95 @@ class Orderbook:
             for price_lots, size_lots in levels
         ]
 
+    def _leaf_array(self) -> np.ndarray:
+        """The resting leaves as a structured array of ``SLAB_LEAF_NODE_DTYPE`` sorted by ascending key, cached."""
+        if self._leaves is None:
+            self._leaves = (
+                self._slab.leaf_array() if isinstance(self._slab, SlabView) else leaf_array_from_nodes(self._slab)
+            )
+        return self._leaves
+
+    def to_numpy(self) -> OrderbookArrays:
+        """Returns the resting orders as contiguous NumPy arrays sorted by ascending order key.
+
+        The arrays are computed once per orderbook snapshot and cached.
+
+        Returns:
+            OrderbookArrays: The price, quantity, sequence number, TIF offset, owner slot and fee tier arrays.
+        """
+        if self._arrays is None:
+            leaves = self._leaf_array()
+            key_lo = leaves["key_lo"]
+            self._arrays = OrderbookArrays(
+                price=np.ascontiguousarray(leaves["key_hi"]),
+                quantity=np.ascontiguousarray(leaves["quantity"]),
+                # Bid keys store the bitwise NOT of the sequence number in the lower 64 bits
+                seq_num=np.invert(key_lo) if self.side == Side.Bid else np.ascontiguousarray(key_lo),
+                tif_offset=np.ascontiguousarray(leaves["tif_offset"]),
+                owner_slot=np.ascontiguousarray(leaves["owner_slot"]),
+                fee_tier=np.ascontiguousarray(leaves["fee_tier"]),
+            )
+        return self._arrays
+
+    def get_l2(self, depth: int, clock_ts: Optional[int] = None, tif_buffer: int = 10) -> list[OrderInfo]:
+        """Gets the Level 2 market information, vectorized over :meth:`to_numpy`.
+
+        Equivalent to :meth:`_get_l2`, but masks expired orders and aggregates levels with array operations
+        instead of walking the book one leaf at a time.
+
+        Args:
+            depth (int): The depth.
+            clock_ts (int, optional): The clock timestamp. Defaults to the current time.
+            tif_buffer (int, optional): The TIF buffer in seconds. Defaults to 10.
+
+        Returns:
+            list[OrderInfo]: The Level 2 market information, best price first.
+        """
+        price, size = self._get_l2_native(depth, clock_ts, tif_buffer)
+        return [
+            OrderInfo(
+                price=utils.convert_fixed_int_to_decimal(price_lots),
+                size=utils.convert_fixed_lot_to_decimal(size_lots),
+            )
+            for price_lots, size_lots in zip(price.tolist(), size.tolist())
+        ]
+
+    def _get_l2_native(
+        self, depth: int, clock_ts: Optional[int] = None, tif_buffer: int = 10
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Gets the Level 2 prices and sizes in native units, best price first.
+
+        Args:
+            depth (int): The depth.
+            clock_ts (int, optional): The clock timestamp. Defaults to the current time.
+            tif_buffer (int, optional): The TIF buffer in seconds. Defaults to 10.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The fixed point level prices and their sizes in lots.
+        """
+        if clock_ts is None:
+            clock_ts = int(time.time())
+        arrays = self.to_numpy()
+        price, quantity, seq_num, tif_offset = arrays.price, arrays.quantity, arrays.seq_num, arrays.tif_offset
+        if self.side == Side.Bid:
+            price, quantity, seq_num, tif_offset = price[::-1], quantity[::-1], seq_num[::-1], tif_offset[::-1]
+
+        # Same expiry rule as _is_order_expired
+        epoch_length = self._market_state.epoch_length
+        epoch_start_ts = (clock_ts + tif_buffer) - (clock_ts + tif_buffer) % epoch_length
+        tif_offset = tif_offset.astype(np.int64)
+        expired = (tif_offset > 0) & (
+            (epoch_start_ts + tif_offset + tif_buffer < clock_ts) | (seq_num <= self._market_state.start_epoch_seq_num)
+        )
+        price = price[~expired]
+        quantity = quantity[~expired]
+        if len(price) == 0 or depth <= 0:
+            return price[:0], quantity[:0]
+
+        level_starts = np.flatnonzero(np.concatenate(([True], price[1:] != price[:-1])))
+        level_sizes = np.add.reduceat(quantity, level_starts)[:depth]
+        return price[level_starts[:depth]], level_sizes
+
     def __iter__(self) -> Iterable[Order]:
         """Returns an iterator over the orders.
 
@@ -181,19 +307,263 @@ class Orderbook:
             Order: The order.
         """
         for node in self._slab.items():
-            price = self._get_price_from_slab(node)
-            open_orders_address = node.owner
-
-            yield Order(
-                order_id=node.key,
-                client_id=node.client_order_id,
-                open_order_address=open_orders_address,
-                fee_tier=node.fee_tier,
-                info=OrderInfo(
-                    price=utils.convert_fixed_int_to_decimal(price),
-                    size=utils.convert_fixed_lot_to_decimal(node.quantity),
-                ),
-                side=self.side,
-                open_order_slot=node.owner_slot,
-                tif_offset=node.tif_offset,
+            yield self._order_from_leaf(node)
+
+    def _owner_index(self) -> dict[bytes, np.ndarray]:
+        """Positions in the leaf array of every owner's leaves, in ascending key order, by owner address bytes.
+
+        Built in one pass over the leaf array and cached per orderbook snapshot, like :meth:`to_numpy`.
+        """
+        if self._owners is None:
+            leaves = self._leaf_array()
+            owners, inverse, counts = np.unique(leaves["owner"], return_inverse=True, return_counts=True)
+            positions = np.split(np.argsort(inverse, kind="stable"), np.cumsum(counts)[:-1])
+            self._owners = {owner.tobytes(): rows for owner, rows in zip(owners, positions)}
+        return self._owners
+
+    def orders_for_owner(self, owner: Pubkey, order_ids: Optional[Collection[int]] = None) -> list[Order]:
+        """Gets the orders of one open orders account, in ascending key order.
+
+        The owner's leaves are looked up in the owner index, so only they are decoded into orders.
+
+        Args:
+            owner (Pubkey): The open orders account address.
+            order_ids (Collection[int], optional): Only return these order ids, e.g. the ones the open orders account
+                lists on this side. Defaults to all of the owner's orders.
+
+        Returns:
+            list[Order]: The owner's orders.
+        """
+        rows = self._owner_index().get(bytes(owner))
+        if rows is None:
+            return []
+        leaves = self._leaf_array()[rows]
+        orders = []
+        for _, owner_slot, fee_tier, tif_offset, key_lo, key_hi, _, quantity, client_order_id in leaves.tolist():
+            key = (key_hi << 64) | key_lo
+            if order_ids is not None and key not in order_ids:
+                continue
+            node = SlabLeafNode(
+                owner_slot=owner_slot,
+                fee_tier=fee_tier,
+                tif_offset=tif_offset,
+                key=key,
+                owner=owner,
+                quantity=quantity,
+                client_order_id=client_order_id,
+            )
+            orders.append(self._order_from_leaf(node))
+        return orders
+
+    def orders_for_owners(self, owners: list[Pubkey]) -> dict[Pubkey, list[Order]]:
+        """Gets the orders of several open orders accounts, e.g. our own and those of competitors.
+
+        Args:
+            owners (list[Pubkey]): The open orders account addresses.
+
+        Returns:
+            dict[Pubkey, list[Order]]: The orders of each owner in ascending key order, empty for owners without
+                orders on this side.
+        """
+        return {owner: self.orders_for_owner(owner) for owner in owners}
+
+    def _order_from_leaf(self, node: SlabLeafNode) -> Order:
+        """Converts a slab leaf into an order on this side of the book.
+
+        Args:
+            node (SlabLeafNode): The slab leaf node.
+
+        Returns:
+            Order: The order.
+        """
+        price = self._get_price_from_slab(node)
+        return Order(
+            order_id=node.key,
+            client_id=node.client_order_id,
+            open_order_address=node.owner,
+            fee_tier=node.fee_tier,
+            info=OrderInfo(
+                price=utils.convert_fixed_int_to_decimal(price),
+                size=utils.convert_fixed_lot_to_decimal(node.quantity),
+            ),
+            side=self.side,
+            open_order_slot=node.owner_slot,
+            tif_offset=node.tif_offset,
+        )
+
+    def _level_size(self, price: int) -> int:
+        """Total resting quantity at a price, in lots, ignoring order expiry.
+
+        Args:
+            price (int): The fixed point price.
+
+        Returns:
+            int: The total quantity at the price.
+        """
+        arrays = self.to_numpy()
+        start, end = np.searchsorted(arrays.price, [price, price + 1])
+        return int(arrays.quantity[start:end].sum())
+
+    def diff(self, previous: Optional["Orderbook"]) -> OrderbookDelta:
+        """Computes the order-by-order and level-by-level changes from a previous snapshot of the same side.
+
+        When both snapshots are backed by a :class:`SlabView`, only node slots whose raw bytes differ are
+        decoded, and identical snapshots return an empty delta without decoding any leaves. Levels are
+        raw book totals and do not mask expired orders.
+
+        Args:
+            previous (Optional[Orderbook]): The previous snapshot, or None to treat every order as added.
+
+        Returns:
+            OrderbookDelta: The changes, empty if the books are identical.
+        """
+        if previous is None:
+            old_leaves: dict[int, SlabLeafNode] = {}
+            new_leaves = {leaf.key: leaf for leaf in self._slab.items()}
+        elif isinstance(self._slab, SlabView) and isinstance(previous._slab, SlabView):
+            changed = self._slab.changed_nodes(previous._slab)
+            if len(changed) == 0 and self._slab.header == previous._slab.header:
+                return OrderbookDelta(self.side)
+            old_leaves = {leaf.key: leaf for leaf in previous._slab.leaves_at(changed.tolist())}
+            new_leaves = {leaf.key: leaf for leaf in self._slab.leaves_at(changed.tolist())}
+        else:
+            old_leaves = {leaf.key: leaf for leaf in previous._slab.items()}
+            new_leaves = {leaf.key: leaf for leaf in self._slab.items()}
+
+        delta = OrderbookDelta(self.side)
+        for key, leaf in old_leaves.items():
+            if key not in new_leaves:
+                delta.orders.append(
+                    OrderDelta(
+                        DeltaType.Removed,
+                        self._order_from_leaf(leaf),
+                        utils.convert_fixed_lot_to_decimal(leaf.quantity),
+                    )
+                )
+        for key, leaf in new_leaves.items():
+            old_leaf = old_leaves.get(key)
+            if old_leaf is None:
+                delta.orders.append(OrderDelta(DeltaType.Added, self._order_from_leaf(leaf), 0.0))
+            elif old_leaf.quantity != leaf.quantity:
+                delta.orders.append(
+                    OrderDelta(
+                        DeltaType.Changed,
+                        self._order_from_leaf(leaf),
+                        utils.convert_fixed_lot_to_decimal(old_leaf.quantity),
+                    )
+                )
+
+        prices = sorted({d.order.order_id >> 64 for d in delta.orders}, reverse=self.side == Side.Bid)
+        for price in prices:
+            size = self._level_size(price)
+            previous_size = previous._level_size(price) if previous is not None else 0
+            if size == previous_size:
+                continue
+            delta_type = (
+                DeltaType.Added if previous_size == 0 else DeltaType.Removed if size == 0 else DeltaType.Changed
+            )
+            delta.levels.append(
+                LevelDelta(
+                    delta_type,
+                    utils.convert_fixed_int_to_decimal(price),
+                    utils.convert_fixed_lot_to_decimal(size),
+                    utils.convert_fixed_lot_to_decimal(previous_size),
+                )
+            )
+        return delta
+
+
+class LiveBook:
+    """A two-sided book kept up to date from orderbook snapshots of both sides.
+
+    Each update aggregates that side's levels once, so best bid/ask, mid, spread and depth at a price are
+    O(1) lookups afterwards. Expired TIF orders are masked as of the time of the update.
+
+    Attributes:
+        bids (Optional[Orderbook]): The latest bid snapshot.
+        asks (Optional[Orderbook]): The latest ask snapshot.
+        bids_slot (Optional[int]): The slot of the latest bid snapshot.
+        asks_slot (Optional[int]): The slot of the latest ask snapshot.
+    """
+
+    def __init__(self, tif_buffer: int = 10) -> None:
+        """Initializes an empty LiveBook.
+
+        Args:
+            tif_buffer (int, optional): The TIF buffer in seconds used when masking expired orders. Defaults to 10.
+        """
+        self.bids: Optional[Orderbook] = None
+        self.asks: Optional[Orderbook] = None
+        self.bids_slot: Optional[int] = None
+        self.asks_slot: Optional[int] = None
+        self._tif_buffer = tif_buffer
+        self._levels: dict[Side, dict[int, int]] = {Side.Bid: {}, Side.Ask: {}}
+        self._best: dict[Side, Optional[OrderInfo]] = {Side.Bid: None, Side.Ask: None}
+
+    def update(self, orderbook: Orderbook, slot: int, clock_ts: Optional[int] = None) -> bool:
+        """Replaces one side of the book with a newer snapshot.
+
+        Args:
+            orderbook (Orderbook): The new snapshot.
+            slot (int): The slot of the snapshot.
+            clock_ts (int, optional): The clock timestamp used to mask expired orders. Defaults to the current time.
+
+        Returns:
+            bool: True if the book was updated, False if the snapshot is older than the one already held.
+        """
+        last_slot = self.bids_slot if orderbook.side == Side.Bid else self.asks_slot
+        if last_slot is not None and slot < last_slot:
+            return False
+        price, size = orderbook._get_l2_native(len(orderbook.to_numpy()), clock_ts, self._tif_buffer)
+        prices, sizes = price.tolist(), size.tolist()
+        self._levels[orderbook.side] = dict(zip(prices, sizes))
+        self._best[orderbook.side] = (
+            OrderInfo(
+                price=utils.convert_fixed_int_to_decimal(prices[0]),
+                size=utils.convert_fixed_lot_to_decimal(sizes[0]),
             )
+            if prices
+            else None
+        )
+        if orderbook.side == Side.Bid:
+            self.bids, self.bids_slot = orderbook, slot
+        else:
+            self.asks, self.asks_slot = orderbook, slot
+        return True
+
+    @property
+    def best_bid(self) -> Optional[OrderInfo]:
+        """The best bid level, or None if there are no bids."""
+        return self._best[Side.Bid]
+
+    @property
+    def best_ask(self) -> Optional[OrderInfo]:
+        """The best ask level, or None if there are no asks."""
+        return self._best[Side.Ask]
+
+    @property
+    def mid(self) -> Optional[float]:
+        """The mid price, or None unless both sides have a level."""
+        if self.best_bid is None or self.best_ask is None:
+            return None
+        return (self.best_bid.price + self.best_ask.price) / 2
+
+    @property
+    def spread(self) -> Optional[float]:
+        """The best ask minus the best bid, or None unless both sides have a level."""
+        if self.best_bid is None or self.best_ask is None:
+            return None
+        return self.best_ask.price - self.best_bid.price
+
+    def depth_at_price(self, side: Side, price: float) -> float:
+        """Total size resting at a price.
+
+        Args:
+            side (Side): The side of the book.
+            price (float): The price.
+
+        Returns:
+            float: The size at the price, 0 if there is no level.
+        """
+        price_lots = round(price * 10**constants.PLATFORM_PRECISION)
+        return utils.convert_fixed_lot_to_decimal(self._levels[side].get(price_lots, 0))
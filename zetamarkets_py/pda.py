@@ -1,3 +1,9 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple, Optional, Sequence, Tuple
+
 from solders.pubkey import Pubkey
 from spl.token.constants import ASSOCIATED_TOKEN_PROGRAM_ID
 
@@ -6,21 +12,151 @@ from zetamarkets_py.types import Network
 
 TOKEN_PROGRAM_ID = Pubkey.from_string("TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA")
 
+PDA_CACHE_SIZE = 65536
+"""Maximum number of derived addresses kept in the PDA cache."""
+PARALLEL_DERIVATION_THRESHOLD = 4096
+"""Minimum number of uncached derivations before :func:`find_program_addresses` fans out to worker processes."""
+
+
+class PdaCacheInfo(NamedTuple):
+    """Hit and miss counters of the PDA cache, in the shape of :func:`functools.lru_cache`'s cache_info."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+_cache: OrderedDict[Tuple[Tuple[bytes, ...], Pubkey], Tuple[Pubkey, int]] = OrderedDict()
+_cache_lock = threading.Lock()
+_hits = 0
+_misses = 0
+
+
+def _cache_get(key: Tuple[Tuple[bytes, ...], Pubkey]) -> Optional[Tuple[Pubkey, int]]:
+    global _hits, _misses
+    with _cache_lock:
+        result = _cache.get(key)
+        if result is None:
+            _misses += 1
+        else:
+            _hits += 1
+            _cache.move_to_end(key)
+        return result
+
+
+def _cache_put(key: Tuple[Tuple[bytes, ...], Pubkey], result: Tuple[Pubkey, int]) -> None:
+    with _cache_lock:
+        _cache[key] = result
+        _cache.move_to_end(key)
+        while len(_cache) > PDA_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def find_program_address(seeds: Sequence[bytes], program_id: Pubkey) -> Tuple[Pubkey, int]:
+    """
+    Memoized :meth:`Pubkey.find_program_address`.
+
+    Derivations are kept in a bounded LRU cache keyed on (seeds, program_id). All the getters in this
+    module go through it.
+
+    Args:
+        seeds (Sequence[bytes]): The seeds of the program address.
+        program_id (Pubkey): The program that owns the address.
+
+    Returns:
+        Tuple[Pubkey, int]: The program address and its bump seed.
+    """
+    key = (tuple(seeds), program_id)
+    result = _cache_get(key)
+    if result is None:
+        result = Pubkey.find_program_address(list(key[0]), program_id)
+        _cache_put(key, result)
+    return result
+
+
+def _derive_many(seeds_list: list[Tuple[bytes, ...]], program_id: Pubkey) -> list[Tuple[Pubkey, int]]:
+    return [Pubkey.find_program_address(list(seeds), program_id) for seeds in seeds_list]
+
+
+def find_program_addresses(
+    seeds_list: Sequence[Sequence[bytes]],
+    program_id: Pubkey,
+    max_workers: Optional[int] = None,
+) -> list[Pubkey]:
+    """
+    Derive many program addresses at once, e.g. the margin accounts of every authority in a scan.
+
+    Cached addresses are served from the PDA cache. When there are at least
+    :data:`PARALLEL_DERIVATION_THRESHOLD` uncached derivations they are split across a process pool, since
+    the derivation holds the GIL and threads would run it serially. The results are added to the cache.
+
+    Args:
+        seeds_list (Sequence[Sequence[bytes]]): The seeds of each program address.
+        program_id (Pubkey): The program that owns the addresses.
+        max_workers (int, optional): The maximum number of worker processes. Defaults to the CPU count.
+
+    Returns:
+        list[Pubkey]: The program addresses, in the same order as ``seeds_list``.
+    """
+    keys = [(tuple(seeds), program_id) for seeds in seeds_list]
+    results = {key: _cache_get(key) for key in keys}
+    missing = [key[0] for key, result in results.items() if result is None]
+
+    workers = max_workers or os.cpu_count() or 1
+    if len(missing) >= PARALLEL_DERIVATION_THRESHOLD and workers > 1:
+        chunk_size = -(-len(missing) // workers)
+        chunks = [missing[i : i + chunk_size] for i in range(0, len(missing), chunk_size)]
+        with ProcessPoolExecutor(workers) as executor:
+            derived = [
+                result
+                for chunk_results in executor.map(_derive_many, chunks, [program_id] * len(chunks))
+                for result in chunk_results
+            ]
+    else:
+        derived = _derive_many(missing, program_id)
+
+    for seeds, result in zip(missing, derived):
+        key = (seeds, program_id)
+        results[key] = result
+        _cache_put(key, result)
+    return [results[key][0] for key in keys]  # type: ignore
+
+
+def cache_info() -> PdaCacheInfo:
+    """
+    Hit and miss counters of the PDA cache.
+
+    Returns:
+        PdaCacheInfo: The cache statistics.
+    """
+    with _cache_lock:
+        return PdaCacheInfo(_hits, _misses, PDA_CACHE_SIZE, len(_cache))
+
+
+def cache_clear() -> None:
+    """Empty the PDA cache and reset its counters."""
+    global _hits, _misses
+    with _cache_lock:
+        _cache.clear()
+        _hits = 0
+        _misses = 0
+
 
 def get_state_address(program_id: Pubkey) -> Pubkey:
-    return Pubkey.find_program_address([b"state"], program_id)[0]
+    return find_program_address([b"state"], program_id)[0]
 
 
 def get_pricing_address(program_id: Pubkey) -> Pubkey:
-    return Pubkey.find_program_address([b"pricing"], program_id)[0]
+    return find_program_address([b"pricing"], program_id)[0]
 
 
 def get_zeta_group_address(program_id: Pubkey, mint: Pubkey) -> Pubkey:
-    return Pubkey.find_program_address([b"zeta-group", bytes(mint)], program_id)[0]
+    return find_program_address([b"zeta-group", bytes(mint)], program_id)[0]
 
 
 def get_perp_sync_queue_address(program_id: Pubkey, zeta_group: Pubkey) -> Pubkey:
-    return Pubkey.find_program_address([b"perp-sync-queue", bytes(zeta_group)], program_id)[0]
+    return find_program_address([b"perp-sync-queue", bytes(zeta_group)], program_id)[0]
 
 
 def get_margin_account_address(
@@ -28,7 +164,7 @@ def get_margin_account_address(
     authority: Pubkey,
     subaccount_index: int = 0,
 ) -> Pubkey:
-    return Pubkey.find_program_address(
+    return find_program_address(
         [
             b"cross-margin",
             bytes(authority),
@@ -41,63 +177,63 @@ def get_margin_account_address(
 def get_open_orders_address(
     program_id: Pubkey, dex_program_id: Pubkey, market: Pubkey, margin_account: Pubkey
 ) -> Pubkey:
-    return Pubkey.find_program_address(
+    return find_program_address(
         [b"cross-open-orders", bytes(dex_program_id), bytes(market), bytes(margin_account)],
         program_id,
     )[0]
 
 
 def get_cross_margin_account_manager_address(program_id: Pubkey, authority: Pubkey) -> Pubkey:
-    return Pubkey.find_program_address(
+    return find_program_address(
         [b"cross-margin-manager", bytes(authority)],
         program_id,
     )[0]
 
 
 def get_combined_vault_address(program_id: Pubkey) -> Pubkey:
-    return Pubkey.find_program_address(
+    return find_program_address(
         [b"combined-vault"],
         program_id,
     )[0]
 
 
 def get_zeta_vault_address(program_id: Pubkey, mint: Pubkey) -> Pubkey:
-    return Pubkey.find_program_address(
+    return find_program_address(
         [b"zeta-vault", bytes(mint)],
         program_id,
     )[0]
 
 
 def get_combined_socialized_loss_address(program_id: Pubkey) -> Pubkey:
-    return Pubkey.find_program_address(
+    return find_program_address(
         [b"combined-socialized-loss"],
         program_id,
     )[0]
 
 
 def get_associated_token_address(authority: Pubkey, mint: Pubkey) -> Pubkey:
-    return Pubkey.find_program_address(
+    return find_program_address(
         [bytes(authority), bytes(TOKEN_PROGRAM_ID), bytes(mint)],
         ASSOCIATED_TOKEN_PROGRAM_ID,
     )[0]
 
 
 def get_serum_authority_address(program_id: Pubkey) -> Pubkey:
-    return Pubkey.find_program_address(
+    return find_program_address(
         [b"serum"],
         program_id,
     )[0]
 
 
 def get_open_orders_map_address(program_id: Pubkey, open_orders: Pubkey) -> Pubkey:
-    return Pubkey.find_program_address(
+    return find_program_address(
         [b"cross-open-orders-map", bytes(open_orders)],
         program_id,
     )[0]
 
 
 def get_mint_authority_address(program_id: Pubkey) -> Pubkey:
-    return Pubkey.find_program_address(
+    return find_program_address(
         [b"mint-auth"],
         program_id,
     )[0]
@@ -115,14 +251,14 @@ def get_referrer_id_account(program_id: Pubkey, id: str) -> Pubkey:
     def remove_trailing_nulls(s):
         return s.rstrip("\x00")
 
-    return Pubkey.find_program_address(
+    return find_program_address(
         [b"referrer-id-account", bytes(remove_trailing_nulls(id).encode())],
         program_id,
     )[0]
 
 
 def get_referrer_pubkey_account(program_id: Pubkey, authority: Pubkey) -> Pubkey:
-    return Pubkey.find_program_address(
+    return find_program_address(
         [b"referrer-pubkey-account", bytes(authority)],
         program_id,
     )[0]
@@ -1,7 +1,10 @@
 from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple, Union, cast
+
+import numpy as np
 
 from zetamarkets_py import constants, utils
-from zetamarkets_py.types import Asset
+from zetamarkets_py.types import Asset, MultiOrderArgs, OrderArgs, Side
 from zetamarkets_py.zeta_client.accounts.cross_margin_account import CrossMarginAccount
 from zetamarkets_py.zeta_client.accounts.pricing import Pricing
 
@@ -175,3 +178,445 @@ class AccountRiskSummary:
             positions,
             mark_prices,
         )
+
+
+@dataclass
+class _AssetRisk:
+    """One asset's contribution to an account's risk."""
+
+    position: Position
+    mark_price: float
+    unrealized_pnl: float
+    position_value: float
+    initial_margin: float
+    maintenance_margin: float
+
+
+def _ledger_key(ledger) -> Tuple[int, int, int, int]:
+    position, opening_orders = ledger.position, ledger.order_state.opening_orders
+    return position.size, position.cost_of_trades, opening_orders[0], opening_orders[1]
+
+
+def _price_key(mark_price: int, params) -> Tuple[int, int, int]:
+    return mark_price, params.future_margin_initial, params.future_margin_maintenance
+
+
+def _compute_asset_risk(ledger_key: Tuple[int, int, int, int], price_key: Tuple[int, int, int]) -> _AssetRisk:
+    # Same arithmetic as the compute_* functions above, restricted to a single asset
+    size_raw, cost_of_trades_raw, long_lots_raw, short_lots_raw = ledger_key
+    mark_price_raw, initial_raw, maintenance_raw = price_key
+    position = Position(
+        utils.convert_fixed_lot_to_decimal(size_raw), utils.convert_fixed_int_to_decimal(cost_of_trades_raw)
+    )
+    size = position.size
+    mark_price = utils.convert_fixed_int_to_decimal(mark_price_raw)
+
+    upnl = (size * mark_price - position.cost_of_trades) if size > 0 else (size * mark_price + position.cost_of_trades)
+
+    long_lots = utils.convert_fixed_lot_to_decimal(long_lots_raw)
+    short_lots = utils.convert_fixed_lot_to_decimal(short_lots_raw)
+    if size > 0:
+        long_lots += abs(size)
+    elif size < 0:
+        short_lots += abs(size)
+    lots = long_lots if long_lots > short_lots else short_lots
+    initial_margin = abs(lots) * mark_price * (initial_raw / 10**constants.MARGIN_PRECISION)
+    maintenance_margin = abs(size) * mark_price * (maintenance_raw / 10**constants.MARGIN_PRECISION)
+
+    return _AssetRisk(position, mark_price, upnl, abs(size) * mark_price, initial_margin, maintenance_margin)
+
+
+class LiveRisk:
+    """An account risk summary kept up to date from margin account and pricing account updates.
+
+    Each asset's contribution to upnl, position value and margins is cached and only recomputed when that asset's
+    ledger, mark price or margin parameters change, so an update that touches one asset costs one asset's worth of
+    work. Account totals are summed from the cached contributions the first time the summary is read after an update.
+
+    Attributes:
+        margin_account (Optional[CrossMarginAccount]): The latest margin account.
+        pricing (Optional[Pricing]): The latest pricing account.
+        margin_account_slot (Optional[int]): The slot of the latest margin account.
+        pricing_slot (Optional[int]): The slot of the latest pricing account.
+    """
+
+    def __init__(self) -> None:
+        """Initializes an empty LiveRisk."""
+        self.margin_account: Optional[CrossMarginAccount] = None
+        self.pricing: Optional[Pricing] = None
+        self.margin_account_slot: Optional[int] = None
+        self.pricing_slot: Optional[int] = None
+        self._ledger_keys: list[Tuple[int, int, int, int]] = []
+        self._price_keys: list[Tuple[int, int, int]] = []
+        self._assets: list[Optional[_AssetRisk]] = []
+        self._summary: Optional[AccountRiskSummary] = None
+
+    @property
+    def is_ready(self) -> bool:
+        """Whether both the margin account and the pricing account have been received."""
+        return self.margin_account is not None and self.pricing is not None
+
+    def update_margin_account(self, margin_account: CrossMarginAccount, slot: int) -> bool:
+        """Applies a new margin account.
+
+        Only ``balance`` and ``product_ledgers`` are read, so a partially decoded account from
+        ``account_data.AccountFieldDecoder`` works too.
+
+        Args:
+            margin_account (CrossMarginAccount): The new margin account.
+            slot (int): The slot of the margin account.
+
+        Returns:
+            bool: True if the risk was updated, False if the account is older than the one already held.
+        """
+        if self.margin_account_slot is not None and slot < self.margin_account_slot:
+            return False
+        ledger_keys = [_ledger_key(ledger) for ledger in margin_account.product_ledgers]
+        self._invalidate(ledger_keys, self._price_keys)
+        self._ledger_keys = ledger_keys
+        self.margin_account, self.margin_account_slot = margin_account, slot
+        self._summary = None
+        return True
+
+    def update_pricing(self, pricing: Pricing, slot: int) -> bool:
+        """Applies a new pricing account.
+
+        Only ``mark_prices`` and ``margin_parameters`` are read, so a partially decoded account from
+        ``account_data.AccountFieldDecoder`` works too.
+
+        Args:
+            pricing (Pricing): The new pricing account.
+            slot (int): The slot of the pricing account.
+
+        Returns:
+            bool: True if the risk was updated, False if the account is older than the one already held.
+        """
+        if self.pricing_slot is not None and slot < self.pricing_slot:
+            return False
+        price_keys = [_price_key(p, params) for p, params in zip(pricing.mark_prices, pricing.margin_parameters)]
+        self._invalidate(self._ledger_keys, price_keys)
+        self._price_keys = price_keys
+        self.pricing, self.pricing_slot = pricing, slot
+        self._summary = None
+        return True
+
+    def _invalidate(self, ledger_keys: list[Tuple[int, int, int, int]], price_keys: list[Tuple[int, int, int]]) -> None:
+        # Drop the cached contribution of every asset whose inputs differ from the ones it was computed from
+        num_assets = min(len(ledger_keys), len(price_keys))
+        if len(self._assets) != num_assets:
+            self._assets = [None] * num_assets
+            return
+        for i in range(num_assets):
+            if ledger_keys[i] != self._ledger_keys[i] or price_keys[i] != self._price_keys[i]:
+                self._assets[i] = None
+
+    @property
+    def summary(self) -> AccountRiskSummary:
+        """The risk summary as of the latest margin and pricing accounts.
+
+        Raises:
+            Exception: If either account has not been received yet.
+        """
+        if self._summary is not None:
+            return self._summary
+        if self.margin_account is None or self.pricing is None:
+            raise Exception("Margin and pricing accounts not received yet, cannot compute risk")
+        assets = self._assets
+        for i, asset_risk in enumerate(assets):
+            if asset_risk is None:
+                assets[i] = _compute_asset_risk(self._ledger_keys[i], self._price_keys[i])
+        contributions = cast(list[_AssetRisk], assets)
+
+        balance = utils.convert_fixed_int_to_decimal(self.margin_account.balance)
+        upnl = sum(a.unrealized_pnl for a in contributions)
+        equity = balance + upnl
+        position_value = sum(a.position_value for a in contributions)
+        initial_margin = sum(a.initial_margin for a in contributions)
+        maintenance_margin = sum(a.maintenance_margin for a in contributions)
+
+        self._summary = AccountRiskSummary(
+            balance,
+            upnl,
+            equity,
+            position_value,
+            initial_margin,
+            maintenance_margin,
+            maintenance_margin / equity,
+            position_value / equity,
+            {asset: a.position for asset, a in zip(Asset.all(), contributions)},
+            {asset: a.mark_price for asset, a in zip(Asset.all(), contributions)},
+        )
+        return self._summary
+
+
+@dataclass
+class MarginAccountArrays:
+    """Columnar view of the ledgers of N margin accounts, one row per account and one column per asset.
+
+    All values are in native units (fixed point balance and cost of trades, lots for sizes and open orders).
+    """
+
+    balance: np.ndarray
+    size: np.ndarray
+    cost_of_trades: np.ndarray
+    opening_bids: np.ndarray
+    opening_asks: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.balance)
+
+    @classmethod
+    def from_margin_accounts(cls, margin_accounts: Sequence[CrossMarginAccount]) -> "MarginAccountArrays":
+        """Loads the ledgers of decoded margin accounts into arrays.
+
+        Args:
+            margin_accounts (Sequence[CrossMarginAccount]): The margin accounts, one row each.
+
+        Returns:
+            MarginAccountArrays: The balance of shape (N,) and the ledger arrays of shape (N, 25).
+        """
+        ledgers = [ledger for margin_account in margin_accounts for ledger in margin_account.product_ledgers]
+        shape = (len(margin_accounts), -1)
+        return cls(
+            balance=np.array([margin_account.balance for margin_account in margin_accounts], dtype=np.uint64),
+            size=np.array([ledger.position.size for ledger in ledgers], dtype=np.int64).reshape(shape),
+            cost_of_trades=np.array([ledger.position.cost_of_trades for ledger in ledgers], dtype=np.uint64).reshape(
+                shape
+            ),
+            opening_bids=np.array(
+                [ledger.order_state.opening_orders[0] for ledger in ledgers], dtype=np.uint64
+            ).reshape(shape),
+            opening_asks=np.array(
+                [ledger.order_state.opening_orders[1] for ledger in ledgers], dtype=np.uint64
+            ).reshape(shape),
+        )
+
+
+@dataclass
+class PricingArrays:
+    """Columnar view of the mark prices and margin parameters of every asset, one entry per asset."""
+
+    mark_price: np.ndarray
+    initial_margin_ratio: np.ndarray
+    maintenance_margin_ratio: np.ndarray
+
+    @classmethod
+    def from_pricing(cls, pricing_account: Pricing) -> "PricingArrays":
+        """Loads the mark prices and margin parameters of a decoded pricing account into arrays.
+
+        Args:
+            pricing_account (Pricing): The pricing account.
+
+        Returns:
+            PricingArrays: The fixed point mark prices and the margin ratios as fractions, each of shape (25,).
+        """
+        params = pricing_account.margin_parameters
+        return cls(
+            mark_price=np.array(pricing_account.mark_prices, dtype=np.uint64),
+            initial_margin_ratio=np.array([p.future_margin_initial for p in params], dtype=np.float64)
+            / 10**constants.MARGIN_PRECISION,
+            maintenance_margin_ratio=np.array([p.future_margin_maintenance for p in params], dtype=np.float64)
+            / 10**constants.MARGIN_PRECISION,
+        )
+
+
+@dataclass
+class RiskMetrics:
+    """Risk metrics of N accounts, one entry per account, in the same units as :class:`AccountRiskSummary`.
+
+    Accounts with zero equity have an infinite or NaN margin utilization and leverage.
+    """
+
+    balance: np.ndarray
+    unrealized_pnl: np.ndarray
+    equity: np.ndarray
+    position_value: np.ndarray
+    initial_margin: np.ndarray
+    maintenance_margin: np.ndarray
+    margin_utilization: np.ndarray
+    leverage: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.balance)
+
+    @property
+    def available_balance_initial(self) -> np.ndarray:
+        """Equity in excess of the initial margin. Orders that would take this below zero are rejected."""
+        return self.equity - self.initial_margin
+
+
+def compute_risk(margin_accounts: MarginAccountArrays, pricing: PricingArrays) -> RiskMetrics:
+    """
+    Compute the risk metrics of a batch of accounts against one set of prices.
+
+    Vectorized equivalent of :meth:`AccountRiskSummary.from_margin_and_pricing_accounts`. Every ledger is converted
+    from fixed point once and upnl, position value and both margins are computed together, so scoring thousands of
+    accounts is a handful of array operations.
+
+    Args:
+        margin_accounts (MarginAccountArrays): The ledgers of the accounts.
+        pricing (PricingArrays): The mark prices and margin parameters.
+
+    Returns:
+        RiskMetrics: The metrics of every account.
+    """
+    return _compute_risk(
+        margin_accounts.balance / 10**constants.PLATFORM_PRECISION,
+        margin_accounts.size / 10**constants.POSITION_PRECISION,
+        margin_accounts.cost_of_trades / 10**constants.PLATFORM_PRECISION,
+        margin_accounts.opening_bids / 10**constants.POSITION_PRECISION,
+        margin_accounts.opening_asks / 10**constants.POSITION_PRECISION,
+        pricing.mark_price / 10**constants.PLATFORM_PRECISION,
+        pricing.initial_margin_ratio,
+        pricing.maintenance_margin_ratio,
+    )
+
+
+def _compute_risk(
+    balance: np.ndarray,
+    size: np.ndarray,
+    cost_of_trades: np.ndarray,
+    long_lots: np.ndarray,
+    short_lots: np.ndarray,
+    mark_price: np.ndarray,
+    initial_margin_ratio: np.ndarray,
+    maintenance_margin_ratio: np.ndarray,
+) -> RiskMetrics:
+    # Decimal inputs with the asset on the last axis, leading axes broadcast against each other
+    notional = size * mark_price
+    abs_notional = np.abs(notional)
+    upnl = (notional + np.where(size > 0, -cost_of_trades, cost_of_trades)).sum(axis=-1)
+    long_lots = long_lots + np.maximum(size, 0)
+    short_lots = short_lots + np.maximum(-size, 0)
+    initial_margin = (np.maximum(long_lots, short_lots) * mark_price * initial_margin_ratio).sum(axis=-1)
+    maintenance_margin = (abs_notional * maintenance_margin_ratio).sum(axis=-1)
+    position_value = abs_notional.sum(axis=-1)
+    equity = balance + upnl
+    with np.errstate(divide="ignore", invalid="ignore"):
+        margin_utilization = maintenance_margin / equity
+        leverage = position_value / equity
+    return RiskMetrics(
+        balance=np.broadcast_to(balance, equity.shape),
+        unrealized_pnl=upnl,
+        equity=equity,
+        position_value=position_value,
+        initial_margin=initial_margin,
+        maintenance_margin=maintenance_margin,
+        margin_utilization=margin_utilization,
+        leverage=leverage,
+    )
+
+
+class MarginSimulator:
+    """What-if risk of an account under proposed orders and price shocks.
+
+    Proposed orders are added to the account's opening orders, so they count towards initial margin the same way
+    resting orders do in :func:`compute_initial_margin`. Every scenario is evaluated in one vectorized call to the
+    kernel behind :func:`compute_risk`.
+
+    Example:
+        Check a requote fits within the initial margin, then stress the account with +-10% moves in every asset::
+
+            simulator = MarginSimulator(margin_account, pricing_account)
+            simulator.add_multi_orders(Asset.SOL, bid_orders, ask_orders)
+            if simulator.evaluate().available_balance_initial < 0:
+                ...
+            metrics = simulator.evaluate(np.array([[-0.1], [0.1]]))
+    """
+
+    def __init__(self, margin_account: CrossMarginAccount, pricing_account: Pricing) -> None:
+        """Initializes the simulator from decoded margin and pricing accounts.
+
+        Args:
+            margin_account (CrossMarginAccount): The margin account.
+            pricing_account (Pricing): The pricing account.
+        """
+        ledgers = MarginAccountArrays.from_margin_accounts([margin_account])
+        self._balance = ledgers.balance[0] / 10**constants.PLATFORM_PRECISION
+        self._size = ledgers.size[0] / 10**constants.POSITION_PRECISION
+        self._cost_of_trades = ledgers.cost_of_trades[0] / 10**constants.PLATFORM_PRECISION
+        self._long_lots = ledgers.opening_bids[0] / 10**constants.POSITION_PRECISION
+        self._short_lots = ledgers.opening_asks[0] / 10**constants.POSITION_PRECISION
+        pricing = PricingArrays.from_pricing(pricing_account)
+        self._mark_price = pricing.mark_price / 10**constants.PLATFORM_PRECISION
+        self._initial_margin_ratio = pricing.initial_margin_ratio
+        self._maintenance_margin_ratio = pricing.maintenance_margin_ratio
+        self._proposed_long_lots = np.zeros_like(self._long_lots)
+        self._proposed_short_lots = np.zeros_like(self._short_lots)
+
+    @property
+    def mark_prices(self) -> np.ndarray:
+        """The unshocked mark prices of every asset, indexed by ``Asset.to_index()``."""
+        return self._mark_price
+
+    def add_orders(self, asset: Asset, orders: Sequence[OrderArgs]) -> "MarginSimulator":
+        """Adds proposed orders, as passed to ``Client.place_orders_for_market``.
+
+        Args:
+            asset (Asset): The asset of the orders.
+            orders (Sequence[OrderArgs]): The orders.
+
+        Raises:
+            Exception: If an order has no side.
+
+        Returns:
+            MarginSimulator: The simulator, for chaining.
+        """
+        i = asset.to_index()
+        for order in orders:
+            if order.side == Side.Bid:
+                self._proposed_long_lots[i] += order.size
+            elif order.side == Side.Ask:
+                self._proposed_short_lots[i] += order.size
+            else:
+                raise Exception(f"Invalid order side {order.side}")
+        return self
+
+    def add_multi_orders(
+        self, asset: Asset, bid_orders: Sequence[MultiOrderArgs], ask_orders: Sequence[MultiOrderArgs]
+    ) -> "MarginSimulator":
+        """Adds proposed orders, as passed to ``Client.place_multi_orders_for_market``.
+
+        Args:
+            asset (Asset): The asset of the orders.
+            bid_orders (Sequence[MultiOrderArgs]): The bids.
+            ask_orders (Sequence[MultiOrderArgs]): The asks.
+
+        Returns:
+            MarginSimulator: The simulator, for chaining.
+        """
+        i = asset.to_index()
+        self._proposed_long_lots[i] += sum(order.size for order in bid_orders)
+        self._proposed_short_lots[i] += sum(order.size for order in ask_orders)
+        return self
+
+    def clear_orders(self) -> None:
+        """Removes all proposed orders."""
+        self._proposed_long_lots[:] = 0
+        self._proposed_short_lots[:] = 0
+
+    def evaluate(self, shocks: Optional[Union[np.ndarray, Sequence]] = None) -> RiskMetrics:
+        """
+        Compute the risk metrics of the account with the proposed orders under each price shock.
+
+        Args:
+            shocks (Optional[Union[np.ndarray, Sequence]]): Relative mark price moves, e.g. -0.1 for a 10% drop, with
+                the asset on the last axis. Shape (S, num_assets) gives one scenario per row and (S, 1) applies the
+                same move to every asset. Defaults to None, the current mark prices.
+
+        Returns:
+            RiskMetrics: The metrics of every scenario, of shape (S,), or 0-d arrays if no shocks are given.
+        """
+        mark_price = self._mark_price
+        if shocks is not None:
+            mark_price = mark_price * (1 + np.asarray(shocks, dtype=np.float64))
+        return _compute_risk(
+            self._balance,
+            self._size,
+            self._cost_of_trades,
+            self._long_lots + self._proposed_long_lots,
+            self._short_lots + self._proposed_short_lots,
+            mark_price,
+            self._initial_margin_ratio,
+            self._maintenance_margin_ratio,
+        )
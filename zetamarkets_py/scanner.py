@@ -0,0 +1,162 @@
+from dataclasses import dataclass
+from typing import Optional, Sequence, Union
+
+import based58
+import numpy as np
+from anchorpy.coder.accounts import ACCOUNT_DISCRIMINATOR_SIZE
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.commitment import Commitment
+from solana.rpc.types import DataSliceOpts, MemcmpOpts
+from solders.pubkey import Pubkey
+
+from zetamarkets_py import constants
+from zetamarkets_py.risk import MarginAccountArrays
+from zetamarkets_py.types import Asset, Network
+from zetamarkets_py.zeta_client.accounts.cross_margin_account import CrossMarginAccount
+
+# Raw byte layout of a CrossMarginAccount, mirroring CrossMarginAccount.layout up to the end of the product ledgers
+CROSS_MARGIN_ACCOUNT_SIZE = 3517
+CROSS_MARGIN_ACCOUNT_AUTHORITY_OFFSET = ACCOUNT_DISCRIMINATOR_SIZE
+CROSS_MARGIN_ACCOUNT_PRODUCT_LEDGER_DTYPE = np.dtype(
+    [("size", "<i8"), ("cost_of_trades", "<u8"), ("closing_orders", "<u8"), ("opening_orders", "<u8", 2)]
+)
+CROSS_MARGIN_ACCOUNT_SLICE_DTYPE = np.dtype(
+    [
+        ("authority", "u1", 32),
+        ("delegated_pubkey", "u1", 32),
+        ("balance", "<u8"),
+        ("subaccount_index", "u1"),
+        ("nonce", "u1"),
+        ("force_cancel_flag", "u1"),
+        ("account_type", "u1"),
+        ("open_orders_nonces", "u1", 25),
+        ("rebalance_amount", "<i8"),
+        ("last_funding_deltas", "<u4", (25, 4)),
+        ("product_ledgers", CROSS_MARGIN_ACCOUNT_PRODUCT_LEDGER_DTYPE, 25),
+    ]
+)
+"""Dtype of the slice of a CrossMarginAccount from the authority to the end of the product ledgers."""
+
+
+@dataclass
+class MarginAccountTable:
+    """Columnar table of many margin accounts, one row per account.
+
+    Attributes:
+        addresses (list[Pubkey]): The margin account addresses.
+        authorities (list[Pubkey]): The authorities of the margin accounts.
+        arrays (MarginAccountArrays): The balances and product ledgers, ready for :func:`risk.compute_risk`.
+    """
+
+    addresses: list[Pubkey]
+    authorities: list[Pubkey]
+    arrays: MarginAccountArrays
+
+    def __len__(self) -> int:
+        return len(self.addresses)
+
+    def select(self, rows: np.ndarray) -> "MarginAccountTable":
+        """Selects a subset of the accounts.
+
+        Args:
+            rows (np.ndarray): A boolean mask or an array of row indices.
+
+        Returns:
+            MarginAccountTable: The selected accounts, in the order given.
+        """
+        indices = np.flatnonzero(rows) if rows.dtype == np.bool_ else rows
+        return MarginAccountTable(
+            addresses=[self.addresses[i] for i in indices],
+            authorities=[self.authorities[i] for i in indices],
+            arrays=MarginAccountArrays(
+                balance=self.arrays.balance[indices],
+                size=self.arrays.size[indices],
+                cost_of_trades=self.arrays.cost_of_trades[indices],
+                opening_bids=self.arrays.opening_bids[indices],
+                opening_asks=self.arrays.opening_asks[indices],
+            ),
+        )
+
+    def has_position(self, asset: Asset) -> np.ndarray:
+        """Boolean mask of the accounts with a non-zero position in an asset."""
+        return self.arrays.size[:, asset.to_index()] != 0
+
+    def open_interest(self) -> np.ndarray:
+        """Total long position size of every asset in native lots, indexed by ``Asset.to_index()``."""
+        return np.maximum(self.arrays.size, 0).sum(axis=0)
+
+
+def decode_margin_account_slices(data: Sequence[bytes]) -> np.ndarray:
+    """
+    Decode margin account slices into a structured array without going through ``CrossMarginAccount.decode``.
+
+    Args:
+        data (Sequence[bytes]): Account data sliced from the authority to the end of the product ledgers, as returned
+            by :func:`scan_margin_accounts`.
+
+    Returns:
+        np.ndarray: A structured array of ``CROSS_MARGIN_ACCOUNT_SLICE_DTYPE``, one row per account.
+    """
+    return np.frombuffer(b"".join(data), dtype=CROSS_MARGIN_ACCOUNT_SLICE_DTYPE, count=len(data))
+
+
+async def scan_margin_accounts(
+    conn: AsyncClient,
+    authority: Optional[Pubkey] = None,
+    filters: Optional[Sequence[MemcmpOpts]] = None,
+    commitment: Optional[Commitment] = None,
+    program_id: Pubkey = constants.ZETA_PID[Network.MAINNET],
+) -> MarginAccountTable:
+    """
+    Load every cross margin account of the program in one ``getProgramAccounts`` call.
+
+    The RPC filters on the account size and discriminator, and only returns the slice from the authority to the end
+    of the product ledgers, which is under half of each account. The slices are decoded with a single ``np.frombuffer``
+    over all accounts rather than one borsh decode per account.
+
+    Example:
+        Find every account close to liquidation::
+
+            table = await scan_margin_accounts(connection)
+            metrics = compute_risk(table.arrays, PricingArrays.from_pricing(exchange.pricing))
+            at_risk = table.select(metrics.margin_utilization > 0.9)
+
+    Args:
+        conn (AsyncClient): The connection.
+        authority (Optional[Pubkey]): Only load the margin accounts of this authority. Defaults to None.
+        filters (Optional[Sequence[MemcmpOpts]]): Extra memcmp filters, with offsets into the full account data.
+            Defaults to None.
+        commitment (Optional[Commitment]): The commitment. Defaults to None.
+        program_id (Pubkey, optional): The program ID. Defaults to constants.ZETA_PID[Network.MAINNET].
+
+    Returns:
+        MarginAccountTable: The margin accounts.
+    """
+    rpc_filters: list[Union[int, MemcmpOpts]] = [
+        CROSS_MARGIN_ACCOUNT_SIZE,
+        MemcmpOpts(0, based58.b58encode(CrossMarginAccount.discriminator).decode("ascii")),
+    ]
+    if authority is not None:
+        rpc_filters.append(MemcmpOpts(CROSS_MARGIN_ACCOUNT_AUTHORITY_OFFSET, str(authority)))
+    if filters is not None:
+        rpc_filters.extend(filters)
+    resp = await conn.get_program_accounts(
+        program_id,
+        commitment=commitment,
+        encoding="base64",
+        data_slice=DataSliceOpts(CROSS_MARGIN_ACCOUNT_AUTHORITY_OFFSET, CROSS_MARGIN_ACCOUNT_SLICE_DTYPE.itemsize),
+        filters=rpc_filters,
+    )
+    rows = decode_margin_account_slices([keyed_account.account.data for keyed_account in resp.value])
+    ledgers = rows["product_ledgers"]
+    return MarginAccountTable(
+        addresses=[keyed_account.pubkey for keyed_account in resp.value],
+        authorities=[Pubkey.from_bytes(authority_bytes.tobytes()) for authority_bytes in rows["authority"]],
+        arrays=MarginAccountArrays(
+            balance=rows["balance"],
+            size=ledgers["size"],
+            cost_of_trades=ledgers["cost_of_trades"],
+            opening_bids=ledgers["opening_orders"][..., 0],
+            opening_asks=ledgers["opening_orders"][..., 1],
+        ),
+    )
@@ -20,7 +20,7 @@ class OrderbookAccount:
         "slab" / types.slab.Slab.layout,
     )
     account_flags: types.account_flags.AccountFlags
-    slab: types.slab.Slab
+    slab: typing.Union[types.slab.Slab, types.slab.SlabView]
 
     @classmethod
     async def fetch(
@@ -67,3 +67,16 @@ class OrderbookAccount:
             account_flags=types.account_flags.AccountFlags.from_decoded(dec.account_flags),
             slab=types.slab.Slab.from_decoded(dec.slab),
         )
+
+    @classmethod
+    def decode_lazy(cls, data: bytes) -> "OrderbookAccount":
+        """Decode the account flags eagerly and wrap the slab in a zero-copy :class:`SlabView`."""
+        if data[: len(cls.discriminator)] != cls.discriminator:
+            raise AccountInvalidDiscriminator("The discriminator for this account is invalid")
+        flags_offset = len(cls.discriminator)
+        slab_offset = flags_offset + types.account_flags.AccountFlags.layout.sizeof()
+        account_flags = types.account_flags.AccountFlags.layout.parse(data[flags_offset:slab_offset])
+        return cls(
+            account_flags=types.account_flags.AccountFlags.from_decoded(account_flags),
+            slab=types.slab.SlabView(data, slab_offset),
+        )
@@ -1,3 +1,3 @@
 from .account_flags import AccountFlags, AccountFlagsJSON
 from .queue import Event, QueueHeader
-from .slab import Slab
+from .slab import Slab, SlabView
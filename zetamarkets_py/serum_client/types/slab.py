@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import struct
 import typing
 from dataclasses import dataclass
 
 import borsh_construct as borsh
+import numpy as np
 from anchorpy.borsh_extension import BorshPubkey
 from construct import Container, Padding, Switch
 from solders.pubkey import Pubkey
@@ -156,10 +158,10 @@ class Slab:
             ),
         )
 
-    def __iter__(self) -> typing.Iterable[SlabLeafNode]:
+    def __iter__(self) -> typing.Iterator[SlabLeafNode]:
         return self.items(False)
 
-    def items(self, descending=False) -> typing.Iterable[SlabLeafNode]:
+    def items(self, descending=False) -> typing.Iterator[SlabLeafNode]:
         """Depth first traversal of the Binary Tree.
         Parameter descending decides if the price should descending or not.
         """
@@ -180,3 +182,193 @@ class Slab:
                     stack.append(node.children[0])
             else:
                 raise RuntimeError("Neither of leaf node or tree node!")
+
+
+# Raw byte layouts for SlabView, mirroring the construct layouts above.
+SLAB_HEADER_STRUCT = struct.Struct("<I4xI4xIII4x")
+SLAB_NODE_TAG_STRUCT = struct.Struct("<I")
+SLAB_INNER_NODE_STRUCT = struct.Struct("<IQQII")
+SLAB_LEAF_NODE_STRUCT = struct.Struct("<BBHQQ32sQQ")
+SLAB_NODE_SIZE = SLAB_NODE_TAG_STRUCT.size + 68
+
+INNER_NODE_TAG = 1
+LEAF_NODE_TAG = 2
+
+# NumPy view of a 72 byte node slot interpreted as a leaf (only meaningful where tag == LEAF_NODE_TAG).
+SLAB_LEAF_NODE_DTYPE = np.dtype(
+    [
+        ("tag", "<u4"),
+        ("owner_slot", "u1"),
+        ("fee_tier", "u1"),
+        ("tif_offset", "<u2"),
+        ("key_lo", "<u8"),
+        ("key_hi", "<u8"),
+        ("owner", "V32"),
+        ("quantity", "<u8"),
+        ("client_order_id", "<u8"),
+    ]
+)
+
+
+class SlabView:
+    """Zero-copy view over the raw bytes of a slab.
+
+    Only the header is read up front. Nodes are unpacked straight from the underlying buffer when
+    the live tree is walked from ``root``, so free and uninitialized nodes are never decoded.
+    Yields the same leaves as :meth:`Slab.items`.
+    """
+
+    def __init__(self, data: typing.Union[bytes, memoryview], offset: int = 0) -> None:
+        buffer = memoryview(data)[offset:]
+        bump_index, free_list_length, free_list_head, root, leaf_count = SLAB_HEADER_STRUCT.unpack_from(buffer)
+        if SLAB_HEADER_STRUCT.size + bump_index * SLAB_NODE_SIZE > len(buffer):
+            raise ValueError("Slab data is shorter than its bump index")
+        self.header = SlabHeader(
+            bump_index=bump_index,
+            free_list_length=free_list_length,
+            free_list_head=free_list_head,
+            root=root,
+            leaf_count=leaf_count,
+        )
+        self._buffer = buffer
+
+    def _node_offset(self, index: int) -> int:
+        return SLAB_HEADER_STRUCT.size + index * SLAB_NODE_SIZE
+
+    def node(self, index: int) -> SlabNode | SlabInnerNode | SlabLeafNode:
+        """Decode a single node, matching the element at ``Slab.nodes[index]``."""
+        if index >= self.header.bump_index:
+            raise IndexError("Slab node index out of range")
+        offset = self._node_offset(index)
+        (tag,) = SLAB_NODE_TAG_STRUCT.unpack_from(self._buffer, offset)
+        offset += SLAB_NODE_TAG_STRUCT.size
+        if tag == 0:
+            return SlabNode(is_initialized=False, next=NONE_NEXT)
+        elif tag == INNER_NODE_TAG:
+            prefix_len, key_lo, key_hi, left, right = SLAB_INNER_NODE_STRUCT.unpack_from(self._buffer, offset)
+            return SlabInnerNode(prefix_len=prefix_len, key=(key_hi << 64) | key_lo, children=[left, right])
+        elif tag == LEAF_NODE_TAG:
+            return self._leaf(offset)
+        elif tag == 3:
+            (next_,) = SLAB_NODE_TAG_STRUCT.unpack_from(self._buffer, offset)
+            return SlabNode(is_initialized=True, next=next_)
+        elif tag == 4:
+            return SlabNode(is_initialized=True, next=NONE_NEXT)
+        else:
+            raise RuntimeError("Invalid tag!")
+
+    def _leaf(self, offset: int) -> SlabLeafNode:
+        (
+            owner_slot,
+            fee_tier,
+            tif_offset,
+            key_lo,
+            key_hi,
+            owner,
+            quantity,
+            client_order_id,
+        ) = SLAB_LEAF_NODE_STRUCT.unpack_from(self._buffer, offset)
+        return SlabLeafNode(
+            owner_slot=owner_slot,
+            fee_tier=fee_tier,
+            tif_offset=tif_offset,
+            key=(key_hi << 64) | key_lo,
+            owner=Pubkey.from_bytes(owner),
+            quantity=quantity,
+            client_order_id=client_order_id,
+        )
+
+    def leaf_array(self) -> np.ndarray:
+        """All leaves as a structured array of ``SLAB_LEAF_NODE_DTYPE``, sorted by ascending key.
+
+        Freed leaves are retagged as free nodes by the matching engine, so every leaf tagged node below
+        ``bump_index`` is live and the nodes can be filtered in bulk rather than walked. If that does not
+        add up to ``leaf_count`` we fall back to walking the tree.
+        """
+        nodes = np.frombuffer(
+            self._buffer, dtype=SLAB_LEAF_NODE_DTYPE, count=self.header.bump_index, offset=SLAB_HEADER_STRUCT.size
+        )
+        leaves = nodes[nodes["tag"] == LEAF_NODE_TAG]
+        if len(leaves) != self.header.leaf_count:
+            return leaf_array_from_nodes(self.items())
+        return leaves[np.lexsort((leaves["key_lo"], leaves["key_hi"]))]
+
+    def _node_bytes(self) -> np.ndarray:
+        nodes_end = SLAB_HEADER_STRUCT.size + self.header.bump_index * SLAB_NODE_SIZE
+        return np.frombuffer(self._buffer[SLAB_HEADER_STRUCT.size : nodes_end], dtype=np.uint8).reshape(
+            -1, SLAB_NODE_SIZE
+        )
+
+    def changed_nodes(self, other: "SlabView") -> np.ndarray:
+        """Indices of the node slots whose bytes differ from ``other``, including slots only one slab has bumped."""
+        nodes, other_nodes = self._node_bytes(), other._node_bytes()
+        common = min(len(nodes), len(other_nodes))
+        changed = np.flatnonzero(np.any(nodes[:common] != other_nodes[:common], axis=1))
+        return np.concatenate((changed, np.arange(common, max(len(nodes), len(other_nodes)))))
+
+    def leaves_at(self, indices: typing.Iterable[int]) -> list[SlabLeafNode]:
+        """Decode the leaves among the given node slots, skipping slots that are not leaves or not bumped."""
+        leaves = []
+        for index in indices:
+            if index >= self.header.bump_index:
+                continue
+            offset = SLAB_HEADER_STRUCT.size + index * SLAB_NODE_SIZE
+            if SLAB_NODE_TAG_STRUCT.unpack_from(self._buffer, offset)[0] == LEAF_NODE_TAG:
+                leaves.append(self._leaf(offset + SLAB_NODE_TAG_STRUCT.size))
+        return leaves
+
+    def __iter__(self) -> typing.Iterator[SlabLeafNode]:
+        return self.items(False)
+
+    def items(self, descending=False) -> typing.Iterator[SlabLeafNode]:
+        """Depth first traversal of the Binary Tree, reading nodes lazily from the buffer.
+        Parameter descending decides if the price should descending or not.
+        """
+        if self.header.leaf_count == 0:
+            return
+        buffer = self._buffer
+        bump_index = self.header.bump_index
+        tag_size = SLAB_NODE_TAG_STRUCT.size
+        unpack_tag = SLAB_NODE_TAG_STRUCT.unpack_from
+        unpack_inner = SLAB_INNER_NODE_STRUCT.unpack_from
+        stack = [self.header.root]
+        while stack:
+            index = stack.pop()
+            if index >= bump_index:
+                raise RuntimeError("Slab node index out of range")
+            offset = SLAB_HEADER_STRUCT.size + index * SLAB_NODE_SIZE
+            (tag,) = unpack_tag(buffer, offset)
+            if tag == LEAF_NODE_TAG:
+                yield self._leaf(offset + tag_size)
+            elif tag == INNER_NODE_TAG:
+                _, _, _, left, right = unpack_inner(buffer, offset + tag_size)
+                if descending:
+                    stack.append(left)
+                    stack.append(right)
+                else:
+                    stack.append(right)
+                    stack.append(left)
+            else:
+                raise RuntimeError("Neither of leaf node or tree node!")
+
+
+def leaf_array_from_nodes(leaves: typing.Iterable[SlabLeafNode]) -> np.ndarray:
+    """Pack decoded leaves into a structured array of ``SLAB_LEAF_NODE_DTYPE``, sorted by ascending key."""
+    array = np.array(
+        [
+            (
+                LEAF_NODE_TAG,
+                leaf.owner_slot,
+                leaf.fee_tier,
+                leaf.tif_offset,
+                leaf.key & 0xFFFFFFFFFFFFFFFF,
+                leaf.key >> 64,
+                bytes(leaf.owner),
+                leaf.quantity,
+                leaf.client_order_id,
+            )
+            for leaf in leaves
+        ],
+        dtype=SLAB_LEAF_NODE_DTYPE,
+    )
+    return array[np.lexsort((array["key_lo"], array["key_hi"]))]
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import base64
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from solders.pubkey import Pubkey
+
+from zetamarkets_py.serum_client.accounts.market_state import MarketState
+from zetamarkets_py.types import Asset, Network
+
+SNAPSHOT_VERSION = 2
+
+# The MarketState fields that only change when a market is reconfigured. Deposit, fee and rebate totals change on
+# every trade, so they don't count as a change to the snapshot
+MARKET_STATE_STATIC_FIELDS = (
+    "own_address",
+    "vault_signer_nonce",
+    "base_mint",
+    "quote_mint",
+    "base_vault",
+    "quote_vault",
+    "quote_dust_threshold",
+    "request_queue",
+    "event_queue",
+    "bids",
+    "asks",
+    "base_lot_size",
+    "quote_lot_size",
+    "fee_rate_bps",
+    "open_orders_authority",
+    "prune_authority",
+    "consume_events_authority",
+)
+
+# The MarketState fields that move once per epoch. Order expiry is computed from them, so the snapshot is rewritten
+# when they move, though they don't count as a market reconfiguration
+MARKET_STATE_EPOCH_FIELDS = (
+    "epoch_length",
+    "epoch_start_ts",
+    "start_epoch_seq_num",
+)
+
+
+@dataclass
+class ExchangeSnapshot:
+    """
+    Static exchange metadata persisted to a local file so that restarts need no RPC calls or PDA derivation.
+
+    Holds derived addresses and the raw State and MarketState account data. Pricing moves every slot, so it is not
+    cached and is always fetched. Entries are keyed by network and program id, so a single file can serve several
+    deployments. Without a ``path`` the snapshot lives in memory only and :func:`save` is a no-op.
+    """
+
+    path: Optional[str]
+    """The file the snapshot is read from and written to."""
+    network: Network
+    """The network the snapshot was taken on."""
+    program_id: Pubkey
+    """The public key of the Zeta program."""
+    state: Optional[bytes] = None
+    """Raw State account data."""
+    market_states: dict[Asset, bytes] = field(default_factory=dict)
+    """Raw MarketState account data by asset."""
+    addresses: dict[str, Pubkey] = field(default_factory=dict)
+    """Derived addresses by name."""
+
+    _dirty: bool = False
+
+    @property
+    def key(self) -> str:
+        """The entry this snapshot occupies in the file."""
+        return f"{self.network.value}:{self.program_id}"
+
+    @classmethod
+    def load(cls, path: Optional[str], network: Network, program_id: Pubkey) -> "ExchangeSnapshot":
+        """
+        Load the snapshot for a network and program id.
+
+        A missing, unreadable or outdated file gives an empty snapshot, which is then filled in from RPC.
+
+        Args:
+            path (str, optional): The snapshot file. If None the snapshot is kept in memory only.
+            network (Network): The network to connect to.
+            program_id (Pubkey): The public key of the Zeta program.
+
+        Returns:
+            ExchangeSnapshot: The loaded snapshot.
+        """
+        snapshot = cls(path, network, program_id)
+        entry = _read_file(path).get(snapshot.key)
+        if entry is None or entry.get("version") != SNAPSHOT_VERSION:
+            return snapshot
+        try:
+            snapshot.state = base64.b64decode(entry["state"])
+            snapshot.market_states = {
+                Asset[name]: base64.b64decode(data) for name, data in entry["market_states"].items()
+            }
+            snapshot.addresses = {name: Pubkey.from_string(address) for name, address in entry["addresses"].items()}
+        except (KeyError, ValueError):
+            return cls(path, network, program_id)
+        return snapshot
+
+    def has_accounts(self, assets: list[Asset]) -> bool:
+        """
+        Whether the snapshot holds every account needed to load the given assets.
+
+        Args:
+            assets (list[Asset]): The assets to load.
+
+        Returns:
+            bool: True if State and the MarketState of every asset are present.
+        """
+        return bool(self.state) and all(asset in self.market_states for asset in assets)
+
+    def address(self, name: str, derive: Callable[[], Pubkey]) -> Pubkey:
+        """
+        Look up a cached address, deriving and caching it on a miss.
+
+        Args:
+            name (str): The name the address is cached under.
+            derive (Callable[[], Pubkey]): Derives the address on a miss.
+
+        Returns:
+            Pubkey: The address.
+        """
+        address = self.addresses.get(name)
+        if address is None:
+            address = derive()
+            self.addresses[name] = address
+            self._dirty = True
+        return address
+
+    def set_address(self, name: str, address: Pubkey) -> None:
+        """
+        Overwrite a cached address, e.g. after it was found to have changed on-chain.
+
+        Args:
+            name (str): The name the address is cached under.
+            address (Pubkey): The new address.
+        """
+        if self.addresses.get(name) != address:
+            self.addresses[name] = address
+            self._dirty = True
+
+    def set_accounts(self, state: bytes, market_states: dict[Asset, bytes]) -> list[Asset]:
+        """
+        Record freshly fetched account data.
+
+        Args:
+            state (bytes): Raw State account data.
+            market_states (dict[Asset, bytes]): Raw MarketState account data by asset.
+
+        Returns:
+            list[Asset]: The assets whose MarketState differs from the snapshot in any of
+            :data:`MARKET_STATE_STATIC_FIELDS`.
+        """
+        changed = []
+        for asset, data in market_states.items():
+            previous = self.market_states.get(asset)
+            if previous is None:
+                changed.append(asset)
+                continue
+            previous_static, previous_epoch = _tracked_fields(previous)
+            static, epoch = _tracked_fields(data)
+            if static != previous_static:
+                changed.append(asset)
+            elif epoch != previous_epoch:
+                self._dirty = True
+        if changed or state != self.state:
+            self._dirty = True
+        self.state = state
+        self.market_states.update(market_states)
+        return changed
+
+    def save(self) -> None:
+        """Write the snapshot to its file if anything changed since it was loaded or last saved."""
+        if self.path is None or not self._dirty:
+            return
+        entries = _read_file(self.path)
+        entries[self.key] = {
+            "version": SNAPSHOT_VERSION,
+            "state": base64.b64encode(self.state or b"").decode(),
+            "market_states": {
+                asset.name: base64.b64encode(data).decode() for asset, data in self.market_states.items()
+            },
+            "addresses": {name: str(address) for name, address in self.addresses.items()},
+        }
+        # Write-then-rename so a concurrent reader or a crash never sees a partial file
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+
+def _tracked_fields(market_state_data: bytes) -> tuple[tuple, tuple]:
+    market_state = MarketState.decode(market_state_data)
+    return (
+        tuple(getattr(market_state, name) for name in MARKET_STATE_STATIC_FIELDS),
+        tuple(getattr(market_state, name) for name in MARKET_STATE_EPOCH_FIELDS),
+    )
+
+
+def _read_file(path: Optional[str]) -> dict[str, Any]:
+    if path is None:
+        return {}
+    try:
+        with open(path, "r") as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return entries if isinstance(entries, dict) else {}
@@ -0,0 +1,334 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import traceback
+from collections.abc import AsyncGenerator, AsyncIterator
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional, Tuple, Union, cast
+
+import websockets
+import websockets.exceptions
+import websockets.legacy.client
+from solana.rpc.commitment import Commitment, Confirmed, Finalized, Processed
+from solders.account_decoder import UiAccountEncoding
+from solders.commitment_config import CommitmentLevel
+from solders.pubkey import Pubkey
+from solders.rpc.config import (
+    RpcAccountInfoConfig,
+    RpcTransactionLogsConfig,
+    RpcTransactionLogsFilter,
+    RpcTransactionLogsFilterMentions,
+)
+from solders.rpc.requests import (
+    AccountSubscribe,
+    AccountUnsubscribe,
+    LogsSubscribe,
+    LogsUnsubscribe,
+)
+from solders.rpc.responses import (
+    AccountNotification,
+    LogsNotification,
+    SubscriptionError,
+    SubscriptionResult,
+    parse_websocket_message,
+)
+
+from zetamarkets_py import utils
+
+_ACCOUNT_ENCODINGS = {
+    "binary": UiAccountEncoding.Binary,
+    "base58": UiAccountEncoding.Base58,
+    "base64": UiAccountEncoding.Base64,
+    "base64+zstd": UiAccountEncoding.Base64Zstd,
+    "jsonParsed": UiAccountEncoding.JsonParsed,
+}
+
+_COMMITMENT_LEVELS = {
+    Processed: CommitmentLevel.Processed,
+    Confirmed: CommitmentLevel.Confirmed,
+    Finalized: CommitmentLevel.Finalized,
+}
+
+# Put on a subscriber's queue when its socket is closed, ending the subscription
+_CLOSED = object()
+
+
+class SubscriptionFailed(Exception):
+    """Raised in the subscriber when the RPC rejects a subscription request."""
+
+
+@dataclass(eq=False)
+class _Subscription:
+    tag: Any
+    """Opaque value yielded alongside every notification, used to tell subscriptions sharing a queue apart."""
+    build_request: Callable[[int], Any]
+    """Builds the subscribe request for a given request id."""
+    build_unsubscribe: Callable[[int, int], Any]
+    """Builds the unsubscribe request for a given subscription id and request id."""
+    queue: asyncio.Queue
+    subscription_id: Optional[int] = None
+
+
+@dataclass(eq=False)
+class _PooledSocket:
+    """One websocket carrying many subscriptions, resubscribing all of them whenever it reconnects."""
+
+    endpoint: str
+    logger: logging.Logger
+    subscriptions: list[_Subscription] = field(default_factory=list)
+    _pending: dict[int, _Subscription] = field(default_factory=dict)
+    _active: dict[int, _Subscription] = field(default_factory=dict)
+    _request_ids: itertools.count = field(default_factory=lambda: itertools.count(1))
+    _ws: Optional[websockets.legacy.client.WebSocketClientProtocol] = None
+    _task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self.subscriptions)
+
+    async def add(self, subscription: _Subscription) -> None:
+        self.subscriptions.append(subscription)
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        elif self._ws is not None:
+            await self._subscribe(subscription)
+
+    async def remove(self, subscription: _Subscription) -> None:
+        self.subscriptions.remove(subscription)
+        subscription_id = subscription.subscription_id
+        if subscription_id is not None:
+            self._active.pop(subscription_id, None)
+            await self._unsubscribe(subscription, subscription_id)
+        # A subscription still awaiting its id is unsubscribed when the id arrives, see _dispatch
+        if len(self.subscriptions) == 0:
+            await self.close()
+
+    async def close(self) -> None:
+        for subscription in self.subscriptions:
+            subscription.queue.put_nowait((subscription.tag, _CLOSED))
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._ws is not None:
+            await self._ws.close()
+            self._ws = None
+
+    async def _subscribe(self, subscription: _Subscription) -> None:
+        if self._ws is None:
+            return
+        request_id = next(self._request_ids)
+        self._pending[request_id] = subscription
+        await self._ws.send(subscription.build_request(request_id).to_json())
+
+    async def _unsubscribe(self, subscription: _Subscription, subscription_id: int) -> None:
+        if self._ws is None:
+            return
+        try:
+            request = subscription.build_unsubscribe(subscription_id, next(self._request_ids))
+            await self._ws.send(request.to_json())
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
+    async def _run(self) -> None:
+        async for ws in websockets.legacy.client.connect(self.endpoint, max_size=None):
+            self._ws = ws
+            self._pending.clear()
+            self._active.clear()
+            try:
+                for subscription in list(self.subscriptions):
+                    subscription.subscription_id = None
+                    await self._subscribe(subscription)
+                async for raw in ws:
+                    await self._dispatch(cast(str, raw))
+            except websockets.exceptions.ConnectionClosed:
+                self.logger.warning("Websocket closed, reconnecting and resubscribing...")
+            except Exception:
+                self.logger.error(f"Error processing websocket message: {traceback.format_exc()}")
+            finally:
+                self._ws = None
+
+    async def _dispatch(self, raw: str) -> None:
+        try:
+            items = parse_websocket_message(raw)
+        except Exception:
+            # Unsubscribe acknowledgements ({"result": true}) are not parseable by solders
+            self.logger.debug(f"Ignoring websocket message: {raw[:200]}")
+            return
+        for item in items:
+            if isinstance(item, SubscriptionResult):
+                subscription = self._pending.pop(item.id, None)
+                if subscription is None:
+                    continue
+                if subscription not in self.subscriptions:
+                    # Removed while the request was in flight, so drop the subscription the server just created
+                    await self._unsubscribe(subscription, item.result)
+                    continue
+                subscription.subscription_id = item.result
+                self._active[item.result] = subscription
+            elif isinstance(item, SubscriptionError):
+                subscription = self._pending.pop(item.id, None)
+                if subscription is not None:
+                    subscription.queue.put_nowait((subscription.tag, SubscriptionFailed(str(item.error))))
+            else:
+                subscription = self._active.get(item.subscription)
+                if subscription is not None:
+                    subscription.queue.put_nowait((subscription.tag, item))
+
+
+class SubscriptionManager:
+    """
+    Multiplexes account and logs subscriptions over a small, shared pool of websockets.
+
+    Subscriptions are spread over at most ``pool_size`` sockets, opened lazily, and notifications are routed
+    back to their subscriber by subscription id. When a socket reconnects every subscription on it is sent
+    again and the new subscription ids are picked up transparently.
+    """
+
+    def __init__(
+        self,
+        ws_endpoint: str,
+        pool_size: int = 1,
+        log_level: int = logging.WARNING,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        """
+        Initialize the subscription manager.
+
+        Args:
+            ws_endpoint (str): The websocket RPC endpoint.
+            pool_size (int, optional): The maximum number of websockets to open. Defaults to 1.
+            log_level (int, optional): The logging level. Defaults to logging.WARNING.
+            logger (logging.Logger, optional): An existing logger to use instead of creating one. Defaults to None.
+        """
+        if pool_size < 1:
+            raise Exception("pool_size must be at least 1")
+        self.ws_endpoint = ws_endpoint
+        self.pool_size = pool_size
+        self._logger = logger or utils.create_logger(f"{__name__}.{self.__class__.__name__}", log_level)
+        self._sockets: list[_PooledSocket] = []
+
+    @property
+    def num_subscriptions(self) -> int:
+        """The number of live subscriptions across all sockets."""
+        return sum(len(socket) for socket in self._sockets)
+
+    @property
+    def num_sockets(self) -> int:
+        """The number of sockets opened so far."""
+        return len(self._sockets)
+
+    def _pick_socket(self) -> _PooledSocket:
+        if len(self._sockets) < self.pool_size and all(len(socket) > 0 for socket in self._sockets):
+            socket = _PooledSocket(self.ws_endpoint, self._logger)
+            self._sockets.append(socket)
+            return socket
+        return min(self._sockets, key=len)
+
+    async def _subscribe_many(self, subscriptions: list[_Subscription]) -> AsyncIterator[Tuple[Any, Any]]:
+        queue = subscriptions[0].queue
+        placed = []
+        try:
+            for subscription in subscriptions:
+                socket = self._pick_socket()
+                await socket.add(subscription)
+                placed.append((socket, subscription))
+            while True:
+                tag, item = await queue.get()
+                if item is _CLOSED:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield tag, item
+        finally:
+            for socket, subscription in placed:
+                await socket.remove(subscription)
+
+    async def accounts_subscribe(
+        self,
+        addresses: list[Pubkey],
+        commitment: Optional[Commitment] = None,
+        encoding: str = "base64+zstd",
+    ) -> AsyncGenerator[Tuple[Pubkey, bytes, int], None]:
+        """
+        Subscribe to several accounts and yield their updates from a single iterator.
+
+        Args:
+            addresses (list[Pubkey]): The public keys of the accounts to subscribe to.
+            commitment (Commitment, optional): The commitment level to use for the subscription. Defaults to None.
+            encoding (str, optional): The encoding to use for the subscription. Defaults to "base64+zstd".
+
+        Yields:
+            AsyncGenerator[Tuple[Pubkey, bytes, int], None]: An async generator that yields tuples of account
+                address, account data and slot.
+        """
+        config = RpcAccountInfoConfig(
+            encoding=_ACCOUNT_ENCODINGS[encoding],
+            commitment=None if commitment is None else _COMMITMENT_LEVELS[commitment],
+        )
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def subscribe_request(address: Pubkey) -> Callable[[int], AccountSubscribe]:
+            def build(request_id: int) -> AccountSubscribe:
+                return AccountSubscribe(address, config, request_id)
+
+            return build
+
+        subscriptions = [
+            _Subscription(address, subscribe_request(address), AccountUnsubscribe, queue) for address in addresses
+        ]
+        async for address, notification in self._subscribe_many(subscriptions):
+            notification = cast(AccountNotification, notification)
+            yield address, cast(bytes, notification.result.value.data), notification.result.context.slot
+
+    async def account_subscribe(
+        self,
+        address: Pubkey,
+        commitment: Optional[Commitment] = None,
+        encoding: str = "base64+zstd",
+    ) -> AsyncIterator[Tuple[bytes, int]]:
+        """
+        Subscribe to an account and yield account data and slot.
+
+        Args:
+            address (Pubkey): The public key of the account to subscribe to.
+            commitment (Commitment, optional): The commitment level to use for the subscription. Defaults to None.
+            encoding (str, optional): The encoding to use for the subscription. Defaults to "base64+zstd".
+
+        Yields:
+            AsyncIterator[Tuple[bytes, int]]: An async iterator that yields tuples of account data and slot.
+        """
+        async for _, account_bytes, slot in self.accounts_subscribe([address], commitment, encoding):
+            yield account_bytes, slot
+
+    async def logs_subscribe(
+        self,
+        filter_: Union[RpcTransactionLogsFilter, RpcTransactionLogsFilterMentions] = RpcTransactionLogsFilter.All,
+        commitment: Optional[Commitment] = None,
+    ) -> AsyncIterator[LogsNotification]:
+        """
+        Subscribe to transaction logs.
+
+        Args:
+            filter_ (Union[RpcTransactionLogsFilter, RpcTransactionLogsFilterMentions], optional): The filter
+                criteria for the logs. Defaults to all logs.
+            commitment (Commitment, optional): The commitment level to use for the subscription. Defaults to None.
+
+        Yields:
+            AsyncIterator[LogsNotification]: An async iterator that yields log notifications.
+        """
+        config = RpcTransactionLogsConfig(None if commitment is None else _COMMITMENT_LEVELS[commitment])
+        subscription = _Subscription(
+            filter_,
+            lambda request_id: LogsSubscribe(filter_, config, request_id),
+            LogsUnsubscribe,
+            asyncio.Queue(),
+        )
+        async for _, notification in self._subscribe_many([subscription]):
+            yield cast(LogsNotification, notification)
+
+    async def close(self) -> None:
+        """Close every socket in the pool. Live subscriptions end, so their iterators stop."""
+        for socket in self._sockets:
+            await socket.close()
+        self._sockets = []
@@ -1,11 +1,14 @@
+import decimal
 from dataclasses import dataclass, field
 from enum import Enum, IntEnum
-from typing import Optional
+from typing import Iterable, Optional, Union
 
 from solders.hash import Hash
 from solders.pubkey import Pubkey
+from solders.transaction import VersionedTransaction
 
 from zetamarkets_py.zeta_client.types import (
+    anchor_decimal,
     asset,
     order_type,
     self_trade_behavior_zeta,
@@ -218,6 +221,54 @@ class Order:
     tif_offset: int
 
 
+class DeltaType(Enum):
+    """Enum class for the kinds of change between two orderbook snapshots."""
+
+    Added = 0
+    Removed = 1
+    Changed = 2
+
+    def __str__(self) -> str:
+        """Returns the name of the delta type."""
+        return self.name
+
+
+@dataclass
+class OrderDelta:
+    """Data class for a single order that changed between two orderbook snapshots.
+
+    For removed orders, ``order`` is the order as it was in the previous snapshot.
+    """
+
+    delta_type: DeltaType
+    order: Order
+    previous_size: float
+
+
+@dataclass
+class LevelDelta:
+    """Data class for a price level whose total size changed between two orderbook snapshots."""
+
+    delta_type: DeltaType
+    price: float
+    size: float
+    previous_size: float
+
+
+@dataclass
+class OrderbookDelta:
+    """Data class for the order and level changes between two orderbook snapshots."""
+
+    side: Side
+    orders: list[OrderDelta] = field(default_factory=list)
+    levels: list[LevelDelta] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        """Whether nothing changed between the snapshots."""
+        return len(self.orders) == 0
+
+
 @dataclass
 class FilledOrder:
     """Data class for filled order details."""
@@ -249,6 +300,16 @@ class MultiOrderArgs:
     expiry_ts: Optional[int] = None
 
 
+@dataclass
+class PreparedTransaction:
+    """Data class for a transaction compiled and signed ahead of sending."""
+
+    transaction: VersionedTransaction
+    raw: bytes
+    blockhash: Hash
+    last_valid_block_height: Optional[int] = None
+
+
 class AnchorDecimal:
     flags: int
     hi: int
@@ -307,3 +368,68 @@ class Decimal:
 
     def is_unset(self) -> bool:
         return self._hi == 0 and self._mid == 0 and self._lo == 0 and self._flags == 0
+
+
+# rust_decimal scales go up to 28
+_DECIMAL_MAX_SCALE = 28
+_DECIMAL_POWERS_OF_TEN = tuple(10**scale for scale in range(_DECIMAL_MAX_SCALE + 1))
+_DECIMAL_SCALE_MASK = 0x00FF0000
+_DECIMAL_SCALE_SHIFT = 16
+_DECIMAL_SIGN_MASK = 0x80000000
+
+# The converters take decoded codegen decimals as well, e.g. the funding deltas of a Pricing account
+AnyAnchorDecimal = Union[AnchorDecimal, anchor_decimal.AnchorDecimal]
+
+
+def _anchor_decimal_scale(d: AnyAnchorDecimal) -> int:
+    scale = (d.flags & _DECIMAL_SCALE_MASK) >> _DECIMAL_SCALE_SHIFT
+    if scale > _DECIMAL_MAX_SCALE:
+        raise ValueError(f"Scale {scale} is above the maximum of {_DECIMAL_MAX_SCALE}.")
+    return scale
+
+
+def anchor_decimals_to_floats(decimals: Iterable[AnyAnchorDecimal]) -> list[float]:
+    """
+    Convert AnchorDecimals to floats, e.g. the funding deltas or rates of every asset at once.
+
+    Gives the same floats as ``Decimal.to_float``, without assembling the mantissa byte by byte. Unlike
+    ``Decimal.to_float``, a scale of 0 is converted rather than raising, so unset decimals become 0.0.
+
+    Args:
+        decimals (Iterable[AnyAnchorDecimal]): The decimals to convert.
+
+    Raises:
+        ValueError: If a decimal has a scale above 28.
+
+    Returns:
+        list[float]: The converted floats.
+    """
+    floats = []
+    for d in decimals:
+        mantissa = (d.hi << 64) | (d.mid << 32) | d.lo
+        if d.flags & _DECIMAL_SIGN_MASK:
+            mantissa = -mantissa
+        floats.append(mantissa / _DECIMAL_POWERS_OF_TEN[_anchor_decimal_scale(d)])
+    return floats
+
+
+def anchor_decimals_to_decimals(decimals: Iterable[AnyAnchorDecimal]) -> list[decimal.Decimal]:
+    """
+    Convert AnchorDecimals to exact ``decimal.Decimal`` values.
+
+    Args:
+        decimals (Iterable[AnyAnchorDecimal]): The decimals to convert.
+
+    Raises:
+        ValueError: If a decimal has a scale above 28.
+
+    Returns:
+        list[decimal.Decimal]: The converted decimals.
+    """
+    return [
+        decimal.Decimal(
+            f"{'-' if d.flags & _DECIMAL_SIGN_MASK else ''}{(d.hi << 64) | (d.mid << 32) | d.lo}"
+            f"E-{_anchor_decimal_scale(d)}"
+        )
+        for d in decimals
+    ]
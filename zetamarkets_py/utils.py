@@ -1,12 +1,15 @@
+import asyncio
 import collections
 import json
 import logging
 import re
 from statistics import median
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 import colorlog
 from httpx import post
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.commitment import Commitment
 from solana.utils.cluster import cluster_api_url
 from solders.hash import Hash
 
@@ -195,19 +198,30 @@ def get_recent_prio_fees(url: str, accounts: List[str], lookback_slots: int = 20
 
 class BlockhashCache:
     """
-    A recent blockhash cache that expires after a given number of seconds.
+    A recent blockhash cache that expires after a given number of slots, or by block height when the last valid block
+    height of a blockhash is known.
     We grab the oldest cached blockhash in get(), without popping it
 
     Args:
-        ttl: Slots until cached blockhash expires.
+        ttl: Slots until cached blockhash expires, for blockhashes without a last valid block height.
+        min_remaining_blocks: Blocks a blockhash must still be valid for to stay cached, for blockhashes with a last
+            valid block height.
     """
 
-    def __init__(self, ttl: int = 60) -> None:
+    def __init__(self, ttl: int = 60, min_remaining_blocks: int = 90) -> None:
         """Instantiate the cache (you only need to do this once)."""
-        self.ttl_slots = 60
+        self.ttl_slots = ttl
+        self.min_remaining_blocks = min_remaining_blocks
+        self.block_height: Optional[int] = None
         self.blockhashes: collections.deque = collections.deque(maxlen=ttl * 10)
 
-    def set(self, blockhash: Hash, slot: int, used_immediately: bool = False) -> None:
+    def set(
+        self,
+        blockhash: Hash,
+        slot: int,
+        used_immediately: bool = False,
+        last_valid_block_height: Optional[int] = None,
+    ) -> None:
         """
         Update the cache.
 
@@ -215,19 +229,38 @@ class BlockhashCache:
             blockhash: new blockhash value.
             slot: the slot which the blockhash came from.
             (unused) used_immediately: unused param, exists in the solana BlockhashCache and just guarantees syntax compatibility
+            last_valid_block_height: the last block height at which the blockhash is valid, if known.
 
         """
-        self.blockhashes.append({"slot": slot, "blockhash": blockhash})
+        # Polling faster than blocks are produced returns the same blockhash again
+        if len(self.blockhashes) == 0 or self.blockhashes[-1]["blockhash"] != blockhash:
+            self.blockhashes.append(
+                {"slot": slot, "blockhash": blockhash, "last_valid_block_height": last_valid_block_height}
+            )
+        self._evict()
+
+    def set_block_height(self, block_height: int) -> None:
+        """
+        Update the current block height, evicting blockhashes that are about to expire.
 
-        # Keep only N slots of blockhashes
-        pops = 0
-        for item in self.blockhashes:
-            if item["slot"] < slot - self.ttl_slots:
-                pops += 1
-            else:
-                break
+        Args:
+            block_height: the current block height.
 
-        for i in range(pops):
+        """
+        self.block_height = block_height
+        self._evict()
+
+    def _is_expired(self, item: dict, slot: int) -> bool:
+        if item["last_valid_block_height"] is not None and self.block_height is not None:
+            return self.block_height > item["last_valid_block_height"] - self.min_remaining_blocks
+        return item["slot"] < slot - self.ttl_slots
+
+    def _evict(self) -> None:
+        # Keep only unexpired blockhashes, the newest one sets the current slot
+        if len(self.blockhashes) == 0:
+            return
+        slot = self.blockhashes[-1]["slot"]
+        while len(self.blockhashes) > 0 and self._is_expired(self.blockhashes[0], slot):
             self.blockhashes.popleft()
 
     def get(self) -> Hash:
@@ -237,8 +270,87 @@ class BlockhashCache:
         Returns:
             cached blockhash.
 
+        """
+        return self.get_with_last_valid_block_height()[0]
+
+    def get_with_last_valid_block_height(self) -> Tuple[Hash, Optional[int]]:
+        """
+        Get the oldest cached blockhash and its last valid block height without popping
+
+        Returns:
+            cached blockhash, and its last valid block height if known.
+
         """
         if len(self.blockhashes) > 0:
-            return self.blockhashes[0]["blockhash"]
+            item = self.blockhashes[0]
+            return item["blockhash"], item["last_valid_block_height"]
         else:
             raise ValueError
+
+
+class BlockhashFeeder:
+    """
+    Keeps a :class:`BlockhashCache` warm by polling the latest blockhash in the background, so that sending a
+    transaction never waits on a blockhash RPC call.
+
+    Every poll caches the latest blockhash with its last valid block height, and advances the block height of the
+    cache so blockhashes are evicted by how long they have left rather than by their age in slots.
+
+    Args:
+        connection: The connection to poll.
+        cache: The cache to fill.
+        interval: Seconds between polls. Defaults to 0.5.
+        commitment: The commitment to fetch blockhashes at. Defaults to the commitment of the connection.
+        logger: The logger for poll errors.
+    """
+
+    def __init__(
+        self,
+        connection: AsyncClient,
+        cache: BlockhashCache,
+        interval: float = 0.5,
+        commitment: Optional[Commitment] = None,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.connection = connection
+        self.cache = cache
+        self.interval = interval
+        self.commitment = commitment if commitment is not None else connection.commitment
+        self._logger = logger if logger is not None else create_logger(f"{__name__}.{type(self).__name__}")
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the background polling task is running."""
+        return self._task is not None and not self._task.done()
+
+    async def refresh(self) -> None:
+        """Fetch the latest blockhash into the cache."""
+        resp = await self.connection.get_latest_blockhash(self.commitment)
+        last_valid_block_height = resp.value.last_valid_block_height
+        self.cache.set(resp.value.blockhash, resp.context.slot, last_valid_block_height=last_valid_block_height)
+        # The latest blockhash is valid for MAX_PROCESSING_AGE blocks from the current block height
+        self.cache.set_block_height(last_valid_block_height - constants.MAX_PROCESSING_AGE)
+
+    def start(self) -> None:
+        """Start polling in the background, if not already running."""
+        if not self.is_running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop polling."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                self._logger.warning(f"Error refreshing blockhash: {e}")
+            await asyncio.sleep(self.interval)